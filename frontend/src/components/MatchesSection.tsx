@@ -10,7 +10,7 @@ import {
   DialogHeader,
   DialogTitle,
 } from "@/components/ui/dialog";
-import { matches as matchesData, matchScorecards, isWin, type Match, type ScorecardBatter, type ScorecardBowler } from "@/data/stats";
+import { matches as matchesData, matchScorecards, tournaments as tournamentsData, isWin, type Match, type ScorecardBatter, type ScorecardBowler } from "@/data/stats";
 
 interface FalconStar {
   name: string;
@@ -59,91 +59,18 @@ function toSlug(name: string): string {
   return name.toLowerCase().replace(/[^a-z0-9]+/g, "-").replace(/^-|-$/g, "");
 }
 
-function yearFromDate(date: string): string {
-  const yr = date.split("-")[2];
-  return yr ? `20${yr}` : "";
-}
-
-function withYear(name: string, matches: Match[]): string {
-  if (/\d{4}/.test(name)) return name;
-  const year = yearFromDate(matches[0]?.date ?? "");
-  return year ? `${name} ${year}` : name;
-}
-
-function batterImpact(b: ScorecardBatter) {
-  return b.runs + b.sixes * 3 + b.fours + (b.not_out ? 10 : 0);
-}
-
-function bowlerImpact(b: ScorecardBowler) {
-  return b.wickets * 20 + b.maidens * 5 + Math.max(0, (8 - b.economy) * 2);
-}
-
-function falconsOfTournament(ms: Match[]): { bat: FalconStar | null; bowl: FalconStar | null } {
-  const batters: Record<string, number> = {};
-  const bowlers: Record<string, number> = {};
-
-  for (const m of ms) {
-    const mid = m.url?.split("/").pop() ?? "";
-    const sc = mid ? matchScorecards[mid] : null;
-    if (!sc) continue;
-    for (const b of sc.falcon_batters ?? [])
-      batters[b.name] = (batters[b.name] ?? 0) + batterImpact(b);
-    for (const b of sc.falcon_bowlers ?? [])
-      bowlers[b.name] = (bowlers[b.name] ?? 0) + bowlerImpact(b);
-  }
-
-  // Aggregate actual totals for display stat
-  const batTotals: Record<string, number> = {};
-  const bowlTotals: Record<string, number> = {};
-  for (const m of ms) {
-    const mid = m.url?.split("/").pop() ?? "";
-    const sc = mid ? matchScorecards[mid] : null;
-    if (!sc) continue;
-    for (const b of sc.falcon_batters ?? [])
-      batTotals[b.name] = (batTotals[b.name] ?? 0) + b.runs;
-    for (const b of sc.falcon_bowlers ?? [])
-      bowlTotals[b.name] = (bowlTotals[b.name] ?? 0) + b.wickets;
-  }
-
-  const topBat = Object.entries(batters).sort((a, b) => b[1] - a[1])[0];
-  const topBowl = Object.entries(bowlers).sort((a, b) => b[1] - a[1])[0];
-
-  return {
-    bat: topBat ? { name: topBat[0], stat: `${batTotals[topBat[0]] ?? 0} runs` } : null,
-    bowl: topBowl ? { name: topBowl[0], stat: `${bowlTotals[topBowl[0]] ?? 0} wkts` } : null,
-  };
-}
-
-function groupByTournament(matches: Match[]): Tournament[] {
-  const map = new Map<string, Match[]>();
-  for (const match of matches) {
-    const key = match.tournament || "Friendlies";
-    if (!map.has(key)) map.set(key, []);
-    map.get(key)!.push(match);
-  }
-  return Array.from(map.entries())
-    .map(([name, ms]) => ({
-      name: withYear(name, ms),
-      matches: ms,
-      wins: ms.filter(isWin).length,
-      losses: ms.filter((m) => !isWin(m)).length,
-      latestDate: ms[0]?.date ?? "",
-      ...(() => { const f = falconsOfTournament(ms); return { falconBat: f.bat, falconBowl: f.bowl }; })(),
-    }))
-    .sort((a, b) => {
-      const parse = (d: string) => {
-        const months: Record<string, number> = {
-          Jan: 0, Feb: 1, Mar: 2, Apr: 3, May: 4, Jun: 5,
-          Jul: 6, Aug: 7, Sep: 8, Oct: 9, Nov: 10, Dec: 11,
-        };
-        const [day, mon, yr] = d.split("-");
-        return new Date(2000 + parseInt(yr), months[mon], parseInt(day)).getTime();
-      };
-      return parse(b.latestDate) - parse(a.latestDate);
-    });
-}
+const matchById = new Map(matchesData.map((m) => [m.match_id, m]));
 
-const tournaments = groupByTournament(matchesData);
+// Tournament records and Falcons of the Tournament are precomputed by the stats pipeline.
+const tournaments: Tournament[] = tournamentsData.map((t) => ({
+  name: t.name,
+  matches: t.match_ids.map((id) => matchById.get(id)).filter((m): m is Match => Boolean(m)),
+  wins: t.wins,
+  losses: t.losses,
+  latestDate: t.last_date,
+  falconBat: t.falcon_bat,
+  falconBowl: t.falcon_bowl,
+}));
 
 // ── Match Preview Dialog ──────────────────────────────────────────────────────
 
@@ -193,8 +120,7 @@ function MatchPreviewDialog({ match, open, onClose }: { match: Match; open: bool
   const winner = winnerName(match.result);
   const margin = winMargin(match.result);
 
-  const matchId = match.url ? match.url.split("/").pop() ?? "" : "";
-  const sc = matchId ? matchScorecards[matchId] ?? null : null;
+  const sc = matchScorecards[String(match.match_id)] ?? null;
 
   const isFalcons = (name: string) =>
     /falcons|hsc falcons|helenelund/i.test(name);
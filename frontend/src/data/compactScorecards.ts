@@ -0,0 +1,69 @@
+import type { MatchScorecard, ScorecardBatter, ScorecardBowler } from "./stats";
+
+// Decoder for match_scorecards.compact.json (written with
+// CRICHEROES_SCORECARD_OUTPUT=compact, see stats/scripts/compact.py).
+
+type Cell = number | string | null;
+
+interface CompactMatch {
+  batting: Cell[][];
+  bowling: Cell[][];
+  top_batters: number[];
+  top_bowlers: number[];
+  falcon_batters: number[];
+  falcon_bowlers: number[];
+  player_of_match: [number, number, string] | null;
+  falcon_of_match: [number, string, "batting" | "bowling"] | null;
+}
+
+export interface CompactScorecards {
+  version: number;
+  strings: string[];
+  columns: { batting: string[]; bowling: string[] };
+  matches: Record<string, CompactMatch>;
+}
+
+const INTERNED = new Set(["name", "team"]);
+
+export function isCompactScorecards(data: unknown): data is CompactScorecards {
+  return typeof data === "object" && data !== null && "strings" in data && "matches" in data;
+}
+
+function decodeRows(table: Cell[][], columns: string[], strings: string[]): Record<string, unknown>[] {
+  const count = table.length ? table[0].length : 0;
+  const rows: Record<string, unknown>[] = [];
+  for (let position = 0; position < count; position++) {
+    const row: Record<string, unknown> = {};
+    columns.forEach((column, i) => {
+      const value = table[i][position];
+      if (INTERNED.has(column)) row[column] = strings[value as number];
+      else if (column === "not_out") row[column] = Boolean(value);
+      else row[column] = value;
+    });
+    rows.push(row);
+  }
+  return rows;
+}
+
+export function decodeScorecards(compact: CompactScorecards): Record<string, MatchScorecard> {
+  if (compact.version !== 1) {
+    throw new Error(`Unsupported compact scorecard version ${compact.version}`);
+  }
+  const { strings, columns } = compact;
+  const decoded: Record<string, MatchScorecard> = {};
+  for (const [matchId, match] of Object.entries(compact.matches)) {
+    const batting = decodeRows(match.batting, columns.batting, strings) as unknown as ScorecardBatter[];
+    const bowling = decodeRows(match.bowling, columns.bowling, strings) as unknown as ScorecardBowler[];
+    const mom = match.player_of_match;
+    const fotm = match.falcon_of_match;
+    decoded[matchId] = {
+      top_batters: match.top_batters.map((i) => batting[i]),
+      top_bowlers: match.top_bowlers.map((i) => bowling[i]),
+      falcon_batters: match.falcon_batters.map((i) => batting[i]),
+      falcon_bowlers: match.falcon_bowlers.map((i) => bowling[i]),
+      player_of_match: mom ? { name: strings[mom[0]], team: strings[mom[1]], stat: mom[2] } : null,
+      falcon_of_match: fotm ? { name: strings[fotm[0]], stat: fotm[1], type: fotm[2] } : null,
+    };
+  }
+  return decoded;
+}
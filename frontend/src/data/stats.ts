@@ -3,7 +3,9 @@ import matchesData from "@stats/matches.json";
 import teamStatsData from "@stats/team_stats.json";
 import leaderboardData from "@stats/leaderboard.json";
 import playerStatsData from "@stats/player_stats.json";
-import matchScorecardsData from "@stats/match_scorecards.json";
+import matchScorecardsData from "@scorecards";
+import tournamentsData from "@stats/tournaments.json";
+import { decodeScorecards, isCompactScorecards } from "./compactScorecards";
 
 export interface Player {
   player_id: number;
@@ -15,6 +17,7 @@ export interface Player {
 }
 
 export interface Match {
+  match_id: number;
   tournament: string;
   info: string;
   score: string[];
@@ -99,6 +102,7 @@ export interface PlayerStatsEntry {
 
 export interface ScorecardBatter {
   name: string;
+  player_id?: number;
   team: string;
   runs: number;
   balls: number;
@@ -110,6 +114,7 @@ export interface ScorecardBatter {
 
 export interface ScorecardBowler {
   name: string;
+  player_id?: number;
   team: string;
   wickets: number;
   overs: number;
@@ -127,12 +132,38 @@ export interface MatchScorecard {
   falcon_of_match: { name: string; stat: string; type: "batting" | "bowling" } | null;
 }
 
+export interface TournamentLeader {
+  name: string;
+  stat: string;
+  impact: number;
+}
+
+export interface TournamentSummary {
+  name: string;
+  tournament: string;
+  match_ids: number[];
+  matches: number;
+  wins: number;
+  losses: number;
+  ties: number;
+  no_result: number;
+  first_date: string;
+  last_date: string;
+  falcon_bat: TournamentLeader | null;
+  falcon_bowl: TournamentLeader | null;
+  impact: { batting: number; bowling: number };
+}
+
 export const players: Player[] = playersData;
 export const matches: Match[] = matchesData;
 export const teamStats: TeamStat[] = teamStatsData;
 export const leaderboard: Leaderboard = leaderboardData;
 export const playerStats: PlayerStatsEntry[] = playerStatsData;
-export const matchScorecards: Record<string, MatchScorecard> = matchScorecardsData as Record<string, MatchScorecard>;
+const scorecardsData: unknown = matchScorecardsData;
+export const matchScorecards: Record<string, MatchScorecard> = isCompactScorecards(scorecardsData)
+  ? decodeScorecards(scorecardsData)
+  : (scorecardsData as Record<string, MatchScorecard>);
+export const tournaments: TournamentSummary[] = tournamentsData;
 
 export function getPlayerStats(name: string): PlayerStatsEntry | undefined {
   return playerStats.find(
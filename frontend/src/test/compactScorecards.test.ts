@@ -0,0 +1,55 @@
+import { describe, it, expect } from "vitest";
+import { decodeScorecards, isCompactScorecards, type CompactScorecards } from "@/data/compactScorecards";
+
+const compact: CompactScorecards = {
+  version: 1,
+  strings: ["Asha", "Falcons", "Ravi", "Hawks"],
+  columns: {
+    batting: ["name", "player_id", "team", "runs", "balls", "sr", "fours", "sixes", "not_out"],
+    bowling: ["name", "player_id", "team", "wickets", "overs", "runs", "economy", "maidens"],
+  },
+  matches: {
+    "101": {
+      batting: [[0, 2], [7, null], [1, 3], [42, 12], [30, 10], [140, 120], [4, 1], [2, 0], [1, 0]],
+      bowling: [[2], [9], [3], [3], [4], [21], [5.25], [0]],
+      top_batters: [0, 1],
+      top_bowlers: [0],
+      falcon_batters: [0],
+      falcon_bowlers: [],
+      player_of_match: [0, 1, "42 runs"],
+      falcon_of_match: [0, "42 runs", "batting"],
+    },
+  },
+};
+
+describe("decodeScorecards", () => {
+  it("restores the match_scorecards.json layout", () => {
+    const asha = {
+      name: "Asha", player_id: 7, team: "Falcons", runs: 42, balls: 30, sr: 140, fours: 4, sixes: 2, not_out: true,
+    };
+    const ravi = {
+      name: "Ravi", player_id: null, team: "Hawks", runs: 12, balls: 10, sr: 120, fours: 1, sixes: 0, not_out: false,
+    };
+    expect(decodeScorecards(compact)).toEqual({
+      "101": {
+        top_batters: [asha, ravi],
+        top_bowlers: [
+          { name: "Ravi", player_id: 9, team: "Hawks", wickets: 3, overs: 4, runs: 21, economy: 5.25, maidens: 0 },
+        ],
+        falcon_batters: [asha],
+        falcon_bowlers: [],
+        player_of_match: { name: "Asha", team: "Falcons", stat: "42 runs" },
+        falcon_of_match: { name: "Asha", stat: "42 runs", type: "batting" },
+      },
+    });
+  });
+
+  it("tells the compact file from the full one", () => {
+    expect(isCompactScorecards(compact)).toBe(true);
+    expect(isCompactScorecards({ "101": { top_batters: [] } })).toBe(false);
+  });
+
+  it("rejects an unknown version", () => {
+    expect(() => decodeScorecards({ ...compact, version: 2 })).toThrow("version 2");
+  });
+});
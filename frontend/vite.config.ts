@@ -1,8 +1,14 @@
 import { defineConfig } from "vite";
 import react from "@vitejs/plugin-react-swc";
+import fs from "fs";
 import path from "path";
 import { componentTagger } from "lovable-tagger";
 
+const statsDir = path.resolve(__dirname, "../stats/data");
+// Bundle the compact scorecards when the data job publishes them (CRICHEROES_SCORECARD_OUTPUT=compact).
+const compactScorecards = path.join(statsDir, "match_scorecards.compact.json");
+const scorecards = fs.existsSync(compactScorecards) ? compactScorecards : path.join(statsDir, "match_scorecards.json");
+
 // https://vitejs.dev/config/
 export default defineConfig(({ mode }) => ({
   base: mode === "production" ? "/falcons-fly-again/" : "/",
@@ -17,7 +23,8 @@ export default defineConfig(({ mode }) => ({
   resolve: {
     alias: {
       "@": path.resolve(__dirname, "./src"),
-      "@stats": path.resolve(__dirname, "../stats/data"),
+      "@stats": statsDir,
+      "@scorecards": scorecards,
     },
   },
 }));
@@ -0,0 +1,229 @@
+"""Incremental per-player aggregates built from ingested scorecards.
+
+The aggregator keeps running totals for every Falcon who batted or bowled,
+split by season, tournament and opponent, and persists them together with
+the set of matches already applied. Each run only folds in matches it has
+not seen before; if an applied match changes or disappears the totals are
+rebuilt from scratch, which keeps the bookkeeping purely additive.
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from records import to_json
+
+AGGREGATE_VERSION = 1
+
+SPLITS = ("seasons", "tournaments", "opponents")
+ROLE_SUFFIX = re.compile(r"\s*\((?:c|wk|c & wk|wk & c)\)\s*$", re.IGNORECASE)
+
+
+def clean_name(name):
+    return ROLE_SUFFIX.sub("", name or "").strip()
+
+
+def overs_to_balls(overs):
+    whole = int(overs)
+    return whole * 6 + round((overs - whole) * 10)
+
+
+def balls_to_overs(balls):
+    return f"{balls // 6}.{balls % 6}"
+
+
+def player_key(row):
+    return str(row.player_id) if row.player_id else f"name:{clean_name(row.name).lower()}"
+
+
+def empty_totals():
+    return {
+        "matches": 0,
+        "batting": {
+            "innings": 0, "runs": 0, "balls": 0, "not_outs": 0, "fours": 0, "sixes": 0,
+            "ducks": 0, "thirties": 0, "fifties": 0, "hundreds": 0,
+            "highest_score": 0, "highest_score_not_out": False,
+        },
+        "bowling": {
+            "innings": 0, "balls": 0, "runs_conceded": 0, "wickets": 0, "maidens": 0,
+            "three_wickets": 0, "five_wickets": 0, "best_wickets": 0, "best_runs": 0,
+        },
+    }
+
+
+def add_batting(totals, b):
+    bat = totals["batting"]
+    bat["innings"] += 1
+    bat["runs"] += b.runs
+    bat["balls"] += b.balls
+    bat["fours"] += b.fours
+    bat["sixes"] += b.sixes
+    if b.not_out:
+        bat["not_outs"] += 1
+    elif b.runs == 0:
+        bat["ducks"] += 1
+    if b.runs >= 100:
+        bat["hundreds"] += 1
+    elif b.runs >= 50:
+        bat["fifties"] += 1
+    elif b.runs >= 30:
+        bat["thirties"] += 1
+    if b.runs > bat["highest_score"] or (b.runs == bat["highest_score"] and b.not_out):
+        bat["highest_score"] = b.runs
+        bat["highest_score_not_out"] = b.not_out
+
+
+def add_bowling(totals, b):
+    bowl = totals["bowling"]
+    bowl["innings"] += 1
+    bowl["balls"] += overs_to_balls(b.overs)
+    bowl["runs_conceded"] += b.runs
+    bowl["wickets"] += b.wickets
+    bowl["maidens"] += b.maidens
+    if b.wickets >= 5:
+        bowl["five_wickets"] += 1
+    elif b.wickets >= 3:
+        bowl["three_wickets"] += 1
+    best = (bowl["best_wickets"], -bowl["best_runs"])
+    if bowl["innings"] == 1 or (b.wickets, -b.runs) > best:
+        bowl["best_wickets"] = b.wickets
+        bowl["best_runs"] = b.runs
+
+
+def finalize_batting(bat, matches):
+    if not bat["innings"]:
+        return {}
+    dismissals = bat["innings"] - bat["not_outs"]
+    return {
+        "matches": matches,
+        "innings": bat["innings"],
+        "not_outs": bat["not_outs"],
+        "runs": bat["runs"],
+        "highest_score": bat["highest_score"],
+        "highest_score_not_out": "*" if bat["highest_score_not_out"] else "",
+        "average": round(bat["runs"] / dismissals, 2) if dismissals else 0.0,
+        "strike_rate": round(bat["runs"] * 100 / bat["balls"], 2) if bat["balls"] else 0.0,
+        "thirties": bat["thirties"],
+        "fifties": bat["fifties"],
+        "hundreds": bat["hundreds"],
+        "fours": bat["fours"],
+        "sixes": bat["sixes"],
+        "ducks": bat["ducks"],
+    }
+
+
+def finalize_bowling(bowl, matches):
+    if not bowl["innings"]:
+        return {}
+    wickets = bowl["wickets"]
+    return {
+        "matches": matches,
+        "innings": bowl["innings"],
+        "overs": balls_to_overs(bowl["balls"]),
+        "maidens": bowl["maidens"],
+        "wickets": wickets,
+        "runs_conceded": bowl["runs_conceded"],
+        "best_figures": f"{bowl['best_wickets']}/{bowl['best_runs']}",
+        "three_wickets": bowl["three_wickets"],
+        "five_wickets": bowl["five_wickets"],
+        "economy": round(bowl["runs_conceded"] * 6 / bowl["balls"], 2) if bowl["balls"] else 0.0,
+        "strike_rate": round(bowl["balls"] / wickets, 2) if wickets else 0.0,
+        "average": round(bowl["runs_conceded"] / wickets, 2) if wickets else 0.0,
+    }
+
+
+def finalize(totals):
+    return {
+        "batting": finalize_batting(totals["batting"], totals["matches"]),
+        "bowling": finalize_bowling(totals["bowling"], totals["matches"]),
+    }
+
+
+class CareerAggregator:
+    """Running per-player totals, persisted with the ids of the matches they include."""
+
+    def __init__(self, path):
+        self.path = path
+        stored = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                stored = json.load(f)
+        if stored.get("version") != AGGREGATE_VERSION:
+            stored = {}
+        self.applied = stored.get("applied", {})
+        self.players = stored.get("players", {})
+        self.rebuilt = False
+
+    def update(self, matches):
+        """Fold in matches, an iterable of (match_id, context, scorecard).
+
+        context holds "season", "tournament" and "opponent". Returns the
+        number of matches newly applied.
+        """
+        matches = [(str(match_id), context, scorecard) for match_id, context, scorecard in matches]
+        digests = {match_id: self._digest(context, scorecard) for match_id, context, scorecard in matches}
+        stale = any(digests.get(match_id) != digest for match_id, digest in self.applied.items())
+        if stale:
+            self.applied = {}
+            self.players = {}
+            self.rebuilt = True
+        applied = 0
+        for match_id, context, scorecard in matches:
+            if match_id in self.applied:
+                continue
+            self._apply(context, scorecard)
+            self.applied[match_id] = digests[match_id]
+            applied += 1
+        return applied
+
+    def _digest(self, context, scorecard):
+        rows = [context, scorecard.get("falcon_batters", []), scorecard.get("falcon_bowlers", [])]
+        return hashlib.sha256(json.dumps(rows, sort_keys=True, default=to_json).encode("utf-8")).hexdigest()
+
+    def _apply(self, context, scorecard):
+        appearances = {}
+        for b in scorecard.get("falcon_batters", []):
+            appearances.setdefault(player_key(b), [b, [], []])[1].append(b)
+        for b in scorecard.get("falcon_bowlers", []):
+            appearances.setdefault(player_key(b), [b, [], []])[2].append(b)
+        for key, (row, batting, bowling) in appearances.items():
+            player = self.players.setdefault(
+                key,
+                {"player_id": row.player_id, "name": clean_name(row.name), "career": empty_totals()}
+                | {split: {} for split in SPLITS},
+            )
+            buckets = [player["career"]]
+            for split, context_key in zip(SPLITS, ("season", "tournament", "opponent")):
+                label = str(context.get(context_key) or "")
+                if label:
+                    buckets.append(player[split].setdefault(label, empty_totals()))
+            for totals in buckets:
+                totals["matches"] += 1
+                for b in batting:
+                    add_batting(totals, b)
+                for b in bowling:
+                    add_bowling(totals, b)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": AGGREGATE_VERSION, "applied": self.applied, "players": self.players}, f)
+        os.replace(tmp_path, self.path)
+
+    def career(self, player_id):
+        player = self.players.get(str(player_id))
+        return finalize(player["career"]) if player else {"batting": {}, "bowling": {}}
+
+    def export(self):
+        """Finalized career and split stats for every player, sorted by name."""
+        output = []
+        for player in self.players.values():
+            entry = {"player_id": player["player_id"], "name": player["name"]}
+            entry.update(finalize(player["career"]))
+            for split in SPLITS:
+                entry[split] = {label: finalize(totals) for label, totals in sorted(player[split].items())}
+            output.append(entry)
+        output.sort(key=lambda p: (p["name"].lower(), str(p["player_id"])))
+        return output
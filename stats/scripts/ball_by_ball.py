@@ -0,0 +1,339 @@
+"""Streaming parser and phase/partnership analytics for ball-by-ball data.
+
+A match's ball-by-ball payload can be many times the size of its scorecard,
+so it is never decoded whole. iter_balls() scans the response text chunk by
+chunk and yields one Ball at a time from every "balls" array, in order, the
+nth array being the nth innings. analyze() folds those balls into per-match
+results as they stream past, so memory stays flat however long the match:
+
+    {"innings": [{"innings", "team_id", "phases": {...}, "partnerships": [...]}],
+     "players": {"<player id>": {"name", "team_id", "batting": {phase: ...}, "bowling": {phase: ...},
+                                 "partnerships": {...}}}}
+
+merge_players() adds up the per-match player entries of many matches into
+the per-player table. Ball.FIELDS is the only place that knows the payload's
+key names.
+"""
+
+import json
+import re
+from dataclasses import dataclass
+
+from records import Record, identity, safe_bool, safe_int
+
+# Bump when analyze() changes shape, so stored results are rebuilt from the cached payloads.
+ANALYTICS_VERSION = 2
+POWERPLAY_OVERS = 6
+DEATH_OVERS = 4
+PHASES = ("powerplay", "middle", "death")
+# Byes and leg byes are not charged to the bowler; wides and no-balls are not legal deliveries.
+BOWLER_EXTRAS = {"wd", "wide", "nb", "no ball", "noball"}
+NOT_LEGAL = {"wd", "wide", "nb", "no ball", "noball"}
+NOT_FACED = {"wd", "wide"}
+# Dismissals not credited to the bowler.
+NOT_BOWLER_WICKETS = {"run out", "retired hurt", "retired out", "obstructing the field", "timed out"}
+CHUNK_SIZE = 64 * 1024
+
+
+def over_number(value):
+    """Completed overs before a ball numbered like 5.3 (the third ball of the sixth over)."""
+    return safe_int(str(value).split(".")[0])
+
+
+def optional_id(value):
+    return safe_int(value) or None
+
+
+def lower(value):
+    return str(value or "").strip().lower()
+
+
+@dataclass(slots=True, eq=False)
+class Ball(Record):
+    innings: int
+    over: int
+    batting_team_id: int | None
+    bowling_team_id: int | None
+    batter_id: int | None
+    batter: str
+    non_striker_id: int | None
+    non_striker: str
+    bowler_id: int | None
+    bowler: str
+    runs: int
+    extras: int
+    extra_type: str
+    wicket: bool
+    wicket_type: str
+    dismissed_id: int | None
+    FIELDS = (
+        ("innings", None, None, None),
+        ("over", "ball", over_number, "0"),
+        ("batting_team_id", "batting_team_id", optional_id, None),
+        ("bowling_team_id", "bowling_team_id", optional_id, None),
+        ("batter_id", "batsman_id", identity, None),
+        ("batter", "batsman_name", identity, ""),
+        ("non_striker_id", "non_striker_id", identity, None),
+        ("non_striker", "non_striker_name", identity, ""),
+        ("bowler_id", "bowler_id", identity, None),
+        ("bowler", "bowler_name", identity, ""),
+        ("runs", "run", safe_int, None),
+        ("extras", "extra_run", safe_int, None),
+        ("extra_type", "extra_type", lower, ""),
+        ("wicket", "is_out", safe_bool, False),
+        ("wicket_type", "out_type", lower, ""),
+        ("dismissed_id", "out_player_id", identity, None),
+    )
+
+
+def read_chunks(path, size=CHUNK_SIZE):
+    """Text of the file at path, size characters at a time."""
+    with open(path, encoding="utf-8") as f:
+        while True:
+            chunk = f.read(size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def iter_array_items(chunks, key):
+    """Yield (array number, item) for the items of every array stored under key, from JSON text chunks.
+
+    Only the text between arrays and of the item being decoded is held, so a
+    large document is never materialized. Arrays are numbered from 1 in
+    document order.
+    """
+    decoder = json.JSONDecoder()
+    # A quoted key inside a JSON string has escaped quotes, so it cannot match.
+    opening = re.compile(r'"' + re.escape(key) + r'"\s*:\s*\[')
+    keep = len(key) + 64
+    chunks = iter(chunks)
+    buffer = ""
+    pos = 0
+    array = 0
+    inside = False
+    exhausted = False
+    while True:
+        if inside:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer):
+                if buffer[pos] == "]":
+                    inside = False
+                    pos += 1
+                    continue
+                try:
+                    item, end = decoder.raw_decode(buffer, pos)
+                except ValueError:
+                    if exhausted:
+                        raise ValueError(f"truncated or invalid item in {key!r} array {array}") from None
+                else:
+                    pos = end
+                    yield array, item
+                    continue
+        else:
+            match = opening.search(buffer, pos)
+            if match:
+                array += 1
+                inside = True
+                pos = match.end()
+                continue
+            # Keep enough of the tail to find a key split across two chunks.
+            pos = max(pos, len(buffer) - keep)
+        if exhausted:
+            if inside:
+                raise ValueError(f"unterminated {key!r} array {array}")
+            return
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+        else:
+            buffer = buffer[pos:] + chunk
+            pos = 0
+
+
+def iter_balls(chunks):
+    """Ball records, in order, from the text chunks of a ball-by-ball payload."""
+    for innings, raw in iter_array_items(chunks, "balls"):
+        if isinstance(raw, dict):
+            yield Ball.from_raw(raw, innings=innings)
+
+
+def phase(over, overs):
+    if over < POWERPLAY_OVERS:
+        return "powerplay"
+    if over >= (overs or 20) - DEATH_OVERS:
+        return "death"
+    return "middle"
+
+
+def empty_batting():
+    return {"runs": 0, "balls": 0, "dots": 0, "fours": 0, "sixes": 0, "outs": 0}
+
+
+def empty_bowling():
+    return {"balls": 0, "runs": 0, "wickets": 0, "dots": 0}
+
+
+def empty_phase():
+    return {"runs": 0, "balls": 0, "wickets": 0, "dots": 0, "fours": 0, "sixes": 0}
+
+
+def empty_partnerships():
+    return {"count": 0, "runs": 0, "balls": 0, "best": None}
+
+
+def analyze(balls, overs=None):
+    """Phase splits and partnerships of one match, folded from an iterable of Ball records.
+
+    overs is the scheduled length of an innings; the last DEATH_OVERS of it
+    are the death overs. A partnership lasts while the same two batters are
+    at the crease.
+    """
+    innings = {}
+    players = {}
+    current = {}
+
+    def player(player_id, name, team_id):
+        entry = players.get(str(player_id))
+        if entry is None:
+            entry = players[str(player_id)] = {
+                "name": name, "team_id": team_id, "batting": {}, "bowling": {}, "partnerships": empty_partnerships(),
+            }
+        return entry
+
+    def close(number):
+        partnership = current.pop(number, None)
+        if partnership and partnership["balls"] + partnership["runs"]:
+            innings[number]["partnerships"].append(partnership)
+
+    for ball in balls:
+        number = ball.innings
+        if number not in innings:
+            innings[number] = {
+                "innings": number, "team_id": ball.batting_team_id,
+                "phases": {name: empty_phase() for name in PHASES}, "partnerships": [],
+            }
+        name = phase(ball.over, overs)
+        split = innings[number]["phases"][name]
+        legal = ball.extra_type not in NOT_LEGAL
+        total = ball.runs + ball.extras
+        split["runs"] += total
+        split["balls"] += legal
+        split["dots"] += legal and total == 0
+        split["fours"] += ball.runs == 4
+        split["sixes"] += ball.runs == 6
+
+        batters = {str(pid): pid for pid in (ball.batter_id, ball.non_striker_id) if pid}
+        pair = sorted(batters)
+        partnership = current.get(number)
+        if partnership is None or partnership["pair"] != pair:
+            close(number)
+            partnership = current[number] = {
+                "wicket": len(innings[number]["partnerships"]) + 1, "runs": 0, "balls": 0, "pair": pair,
+                "batters": {key: {"player_id": pid, "runs": 0, "balls": 0} for key, pid in batters.items()},
+                "unbeaten": True,
+            }
+        partnership["runs"] += total
+        partnership["balls"] += legal
+
+        if ball.batter_id:
+            batter = player(ball.batter_id, ball.batter, ball.batting_team_id)
+            batting = batter["batting"].setdefault(name, empty_batting())
+            faced = ball.extra_type not in NOT_FACED
+            batting["runs"] += ball.runs
+            batting["balls"] += faced
+            batting["dots"] += faced and ball.runs == 0
+            batting["fours"] += ball.runs == 4
+            batting["sixes"] += ball.runs == 6
+            if str(ball.batter_id) in partnership["batters"]:
+                contribution = partnership["batters"][str(ball.batter_id)]
+                contribution["runs"] += ball.runs
+                contribution["balls"] += faced
+        if ball.bowler_id:
+            bowler = player(ball.bowler_id, ball.bowler, ball.bowling_team_id)
+            bowling = bowler["bowling"].setdefault(name, empty_bowling())
+            conceded = ball.runs + (ball.extras if ball.extra_type in BOWLER_EXTRAS else 0)
+            bowling["balls"] += legal
+            bowling["runs"] += conceded
+            bowling["dots"] += legal and conceded == 0
+            bowling["wickets"] += ball.wicket and ball.wicket_type not in NOT_BOWLER_WICKETS
+        if ball.wicket:
+            split["wickets"] += 1
+            dismissed = ball.dismissed_id or ball.batter_id
+            if dismissed:
+                dismissed_name = ball.batter if dismissed == ball.batter_id else ball.non_striker
+                player(dismissed, dismissed_name, ball.batting_team_id)["batting"] \
+                    .setdefault(name, empty_batting())["outs"] += 1
+            partnership["unbeaten"] = False
+            close(number)
+    for number in list(current):
+        close(number)
+
+    names = {pid: entry["name"] for pid, entry in players.items()}
+    for entry in innings.values():
+        for split in entry["phases"].values():
+            split["run_rate"] = round(split["runs"] / split["balls"] * 6, 2) if split["balls"] else 0.0
+        for partnership in entry["partnerships"]:
+            pair = partnership.pop("pair")
+            partnership["batters"] = [
+                dict(partnership["batters"][pid], name=names.get(pid, "")) for pid in pair
+            ]
+            for pid in pair:
+                totals = players[pid]["partnerships"] if pid in players else None
+                if totals is None:
+                    continue
+                totals["count"] += 1
+                totals["runs"] += partnership["runs"]
+                totals["balls"] += partnership["balls"]
+                best = totals["best"]
+                if best is None or partnership["runs"] > best["runs"]:
+                    partner = next((b for b in partnership["batters"] if str(b["player_id"]) != pid), None)
+                    totals["best"] = {
+                        "runs": partnership["runs"], "balls": partnership["balls"],
+                        "partner": partner["name"] if partner else "",
+                    }
+    return {"innings": [innings[number] for number in sorted(innings)], "players": players}
+
+
+def merge_players(matches, include=None):
+    """Per-player phase splits and partnership totals across matches, a list of (match_id, analyze() result).
+
+    include(player id, match entry) picks the players to keep, e.g. one
+    team's. Rates are added once everything is summed; the best partnership
+    carries its match id.
+    """
+    merged = {}
+    for match_id, analytics in matches:
+        for pid, entry in analytics["players"].items():
+            if include is not None and not include(pid, entry):
+                continue
+            player = merged.setdefault(pid, {
+                "player_id": safe_int(pid, pid), "name": entry["name"], "batting": {}, "bowling": {},
+                "partnerships": empty_partnerships(),
+            })
+            for kind, empty in (("batting", empty_batting), ("bowling", empty_bowling)):
+                for name, stats in entry[kind].items():
+                    totals = player[kind].setdefault(name, empty())
+                    for stat, value in stats.items():
+                        totals[stat] += value
+            partnerships = player["partnerships"]
+            partnerships["count"] += entry["partnerships"]["count"]
+            partnerships["runs"] += entry["partnerships"]["runs"]
+            partnerships["balls"] += entry["partnerships"]["balls"]
+            best = entry["partnerships"]["best"]
+            if best and (partnerships["best"] is None or best["runs"] > partnerships["best"]["runs"]):
+                partnerships["best"] = dict(best, match_id=match_id)
+
+    output = []
+    for player in merged.values():
+        for stats in player["batting"].values():
+            stats["strike_rate"] = round(stats["runs"] / stats["balls"] * 100, 2) if stats["balls"] else 0.0
+        for stats in player["bowling"].values():
+            stats["economy"] = round(stats["runs"] / stats["balls"] * 6, 2) if stats["balls"] else 0.0
+        partnerships = player["partnerships"]
+        count = partnerships["count"]
+        partnerships["average"] = round(partnerships["runs"] / count, 2) if count else 0.0
+        output.append(player)
+    output.sort(key=lambda p: (p["name"].lower(), str(p["player_id"])))
+    return output
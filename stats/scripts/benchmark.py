@@ -0,0 +1,417 @@
+"""Offline end-to-end and per-stage benchmark of the fetch pipeline.
+
+    python scripts/benchmark.py [--fixtures DIR] [--sizes small,season,league]
+    python scripts/benchmark.py --baseline metrics/benchmark-main.json
+
+Each fixture size is served by fake_server.py. The full pipeline runs
+against it twice in a scratch directory: a cold run with empty caches, then
+a warm run. The CPU-bound stages are also timed in-process. Without
+--fixtures, the base set is synthesized from the published JSON in data/.
+--records N also parses N scorecards (the base set, repeated) into slotted
+records and reports time and retained memory against the same rows as plain
+dicts. --league 1000,10000 runs the parsing, ranking and aggregation
+stages in-process over a seeded generated league of each size (see
+fixtures.league) and reports throughput and peak memory per stage, including
+season and tournament rankings through impact.ImpactBatch with and without
+NumPy. Results go to metrics/benchmark.json. With --baseline, the run fails
+when any timing is more than --tolerance slower than the baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from datetime import datetime, timezone
+
+import fake_server
+import fetch_cricheroes
+import fixtures
+import impact
+from aggregate import CareerAggregator
+from records import to_json
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPT_DIR, "..", "data")
+# Fixture sets as multiples of the base set: one team's season, then a league's worth.
+SIZES = {"small": 1, "season": 4, "league": 20}
+PAGE_SIZE = 50
+# 100000 takes several minutes and about 1.5 GB; ask for it with --league 1000,10000,100000.
+LEAGUE_SIZES = "1000,10000"
+# Generated scorecards are parsed this many at a time, so a 100k league never holds all its payloads.
+LEAGUE_CHUNK = 1000
+
+
+def run_pipeline(api_base, work_dir, rps):
+    """Run fetch_cricheroes.py in work_dir against api_base and return its run metrics."""
+    env = dict(
+        os.environ,
+        CRICHEROES_API_BASE=api_base,
+        CRICHEROES_MAX_MATCH_PAGES="100000",
+        CRICHEROES_REQUESTS_PER_SECOND=str(rps),
+        CRICHEROES_METRICS_DIR="metrics",
+    )
+    env.pop("CRICHEROES_RECORD_DIR", None)
+    result = subprocess.run(
+        [sys.executable, os.path.join(SCRIPT_DIR, "fetch_cricheroes.py")],
+        cwd=work_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f"pipeline failed in {work_dir}: {result.stderr.strip()}")
+    with open(os.path.join(work_dir, "metrics", "run_metrics.json"), encoding="utf-8") as f:
+        report = json.load(f)
+    return {
+        "wall_seconds": report["wall_seconds"],
+        "requests": report["totals"]["requests"],
+        "stages_seconds": report["stages_seconds"],
+    }
+
+
+def load_inputs(fixture_dir, team_ids):
+    """Raw matches, scorecard payloads and per-team leaderboards from a fixture set."""
+    matches = []
+    for team_id in team_ids:
+        matches.extend(fixtures.collect_pages(fixture_dir, f"team/get-team-match/{team_id}")[0])
+    scorecards = []
+    for m in matches:
+        body = fixtures.read_fixture(fixture_dir, f"scorecard/get-scorecard/{m['match_id']}")
+        if body is not None:
+            scorecards.append(json.loads(body).get("data", {}))
+    leaderboards = {
+        category: [
+            fixtures.collect_pages(fixture_dir, f"leaderboard/get-team-{category}-leaderboard/{team_id}")[0]
+            for team_id in team_ids
+        ]
+        for category in ("batting", "bowling", "fielding")
+    }
+    return matches, scorecards, leaderboards
+
+
+def time_call(fn, items, repeat):
+    """Best-of-repeat seconds for one call of fn, plus microseconds per input item."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    seconds = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {
+        "seconds": round(seconds, 6),
+        "items": items,
+        "per_item_us": round(seconds / items * 1e6, 2) if items else 0.0,
+    }
+
+
+def time_stages(fixture_dir, repeat):
+    team_ids = (fetch_cricheroes.TEAM_ID, fetch_cricheroes.LEGACY_TEAM_ID)
+    matches, scorecards, leaderboards = load_inputs(fixture_dir, team_ids)
+    entries = sum(len(items) for pages in leaderboards.values() for items in pages)
+
+    def merge_leaderboards():
+        for category, (current, legacy) in leaderboards.items():
+            fetch_cricheroes.build_leaderboard(category, fetch_cricheroes.merge_leaderboard(current, legacy))
+
+    return {
+        "build_match": time_call(lambda: [fetch_cricheroes.build_match(m) for m in matches], len(matches), repeat),
+        "build_team_stats": time_call(
+            lambda: fetch_cricheroes.build_team_stats(matches, set(team_ids)), len(matches), repeat
+        ),
+        "parse_scorecard": time_call(
+            lambda: [fetch_cricheroes.parse_scorecard(data, set(team_ids)) for data in scorecards],
+            len(scorecards),
+            repeat,
+        ),
+        "leaderboard_merge": time_call(merge_leaderboards, entries, repeat),
+    }
+
+
+def retained_bytes(build):
+    """Memory still allocated by what build() returns, and the result."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        return tracemalloc.get_traced_memory()[0] - before, result
+    finally:
+        tracemalloc.stop()
+
+
+def measure_records(fixture_dir, count, repeat):
+    """Parse count scorecards into records; time, retained memory and the same rows as dicts."""
+    team_ids = (fetch_cricheroes.TEAM_ID, fetch_cricheroes.LEGACY_TEAM_ID)
+    _, scorecards, _ = load_inputs(fixture_dir, team_ids)
+    payloads = [scorecards[i % len(scorecards)] for i in range(count)]
+
+    def parse():
+        return [fetch_cricheroes.scorecard_rows(data) for data in payloads]
+
+    def parse_as_dicts():
+        return [
+            dict(rows, batting=[b.to_dict() for b in rows["batting"]], bowling=[b.to_dict() for b in rows["bowling"]])
+            for rows in parse()
+        ]
+
+    seconds = min(timeit.repeat(parse, repeat=repeat, number=1))
+    record_bytes, parsed = retained_bytes(parse)
+    dict_bytes, _ = retained_bytes(parse_as_dicts)
+    rows = sum(len(r["batting"]) + len(r["bowling"]) for r in parsed)
+    started = time.perf_counter()
+    json.dumps(parsed, default=to_json)
+    serialize_seconds = time.perf_counter() - started
+    result = {
+        "scorecards": count,
+        "rows": rows,
+        "parse_seconds": round(seconds, 4),
+        "parse_us_per_scorecard": round(seconds / count * 1e6, 2),
+        "serialize_seconds": round(serialize_seconds, 4),
+        "records_bytes": record_bytes,
+        "dicts_bytes": dict_bytes,
+        "bytes_per_row": {"records": round(record_bytes / rows, 1), "dicts": round(dict_bytes / rows, 1)},
+    }
+    print(
+        f"records  {count:>6} scorecards  {rows} rows  parse {seconds:.3f}s "
+        f"({result['parse_us_per_scorecard']:.1f} us/scorecard)  serialize {serialize_seconds:.3f}s  "
+        f"memory {record_bytes / 1e6:.1f} MB as records vs {dict_bytes / 1e6:.1f} MB as dicts"
+    )
+    return result
+
+
+def league_stages(match_count, seed, work_dir, traced):
+    """Run the in-process stages over a generated league; {stage: {"seconds", "items", "peak_bytes"}}.
+
+    With traced, tracemalloc is running: peak_bytes is the highest memory a
+    stage held above what was allocated when it started, and retained_bytes
+    what is still allocated after it. Untraced runs give the timings. Parsing
+    runs in chunks; its figures cover all of them, generated payloads
+    included.
+    """
+    team_ids = {fixtures.DEFAULT_TEAM_ID}
+    stages = {}
+    bases = {}
+
+    def run(name, fn, items):
+        if traced:
+            tracemalloc.reset_peak()
+            bases.setdefault(name, tracemalloc.get_traced_memory()[0])
+        started = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - started
+        stage = stages.setdefault(name, {"seconds": 0.0, "items": 0, "peak_bytes": 0, "retained_bytes": 0})
+        stage["seconds"] += seconds
+        stage["items"] += items
+        if traced:
+            current, peak = tracemalloc.get_traced_memory()
+            stage["peak_bytes"] = max(stage["peak_bytes"], peak - bases[name])
+            stage["retained_bytes"] = current - bases[name]
+        return result
+
+    matches = []
+    parsed = []
+    payloads = fixtures.league(match_count, seed)
+    generate_seconds = 0.0
+    while True:
+        started = time.perf_counter()
+        chunk = [pair for _, pair in zip(range(LEAGUE_CHUNK), payloads)]
+        generate_seconds += time.perf_counter() - started
+        if not chunk:
+            break
+        matches.extend(match for match, _ in chunk)
+        parsed.extend(run("parse", lambda: [fetch_cricheroes.scorecard_rows(data) for _, data in chunk], len(chunk)))
+        del chunk
+    rows = sum(len(r["batting"]) + len(r["bowling"]) for r in parsed)
+
+    match_scorecards = run(
+        "rank",
+        lambda: {
+            str(m["match_id"]): fetch_cricheroes.build_scorecard(r, team_ids) for m, r in zip(matches, parsed)
+        },
+        len(matches),
+    )
+    run("team_stats", lambda: fetch_cricheroes.build_team_stats(matches, team_ids), len(matches))
+    run("tournaments", lambda: fetch_cricheroes.build_tournaments(matches, match_scorecards, team_ids), len(matches))
+    aggregator = CareerAggregator(os.path.join(work_dir, f"aggregates-{match_count}.json"))
+    run(
+        "aggregate",
+        lambda: fetch_cricheroes.aggregate_scorecards(aggregator, matches, match_scorecards, team_ids),
+        len(matches),
+    )
+    del aggregator, match_scorecards
+
+    modes = [("loop", False)] + ([("numpy", True)] if impact.numpy is not None else [])
+    for group_by in ("season", "tournament"):
+        labels = [
+            str(fetch_cricheroes.parse_match_year(m)) if group_by == "season" else m["tournament_name"] for m in matches
+        ]
+        for mode, vectorized in modes:
+            def rank():
+                batch = impact.ImpactBatch(vectorized)
+                for label, r in zip(labels, parsed):
+                    batch.add(label, r["batting"], r["bowling"])
+                return batch.leaders(10)
+
+            run(f"rank_{group_by}s_{mode}", rank, rows)
+    for stage in stages.values():
+        stage["seconds"] = round(stage["seconds"], 4)
+    return {"matches": len(matches), "rows": rows, "generate_seconds": round(generate_seconds, 3), "stages": stages}
+
+
+def measure_league(match_count, seed, work_dir):
+    """Timings (untraced run) and peak memory (traced run) of the league stages at one size."""
+    result = league_stages(match_count, seed, work_dir, traced=False)
+    tracemalloc.start()
+    try:
+        traced = league_stages(match_count, seed, work_dir, traced=True)
+    finally:
+        tracemalloc.stop()
+    print(
+        f"league   {match_count:>6} matches  {result['rows']} rows  generated in {result['generate_seconds']:.2f}s"
+    )
+    for name, stage in result["stages"].items():
+        stage["per_second"] = round(stage["items"] / stage["seconds"]) if stage["seconds"] else 0
+        stage["peak_bytes"] = traced["stages"][name]["peak_bytes"]
+        stage["retained_bytes"] = traced["stages"][name]["retained_bytes"]
+        print(
+            f"         {name:<24} {stage['seconds'] * 1000:10.1f} ms  {stage['per_second']:>10} items/s  "
+            f"peak {stage['peak_bytes'] / 1e6:8.1f} MB  retained {stage['retained_bytes'] / 1e6:8.1f} MB"
+        )
+    return result
+
+
+def benchmark_size(name, fixture_dir, work_root, args):
+    fake = fake_server.FakeCricHeroes(fixture_dir, latency_ms=args.latency_ms, page_size=PAGE_SIZE)
+    server, api_base = fake_server.start(fake)
+    try:
+        work_dir = os.path.join(work_root, f"run-{name}")
+        os.makedirs(work_dir)
+        pipeline = {"cold": run_pipeline(api_base, work_dir, args.rps)}
+        pipeline["warm"] = run_pipeline(api_base, work_dir, args.rps)
+    finally:
+        server.shutdown()
+    stages = time_stages(fixture_dir, args.repeat)
+    result = {
+        "matches": stages["build_match"]["items"],
+        "scorecards": stages["parse_scorecard"]["items"],
+        "server": fake.stats(),
+        "pipeline": pipeline,
+        "stages": stages,
+    }
+    print(
+        f"{name:<8} {result['matches']:>6} matches  "
+        f"cold {pipeline['cold']['wall_seconds']:.2f}s ({pipeline['cold']['requests']} requests)  "
+        f"warm {pipeline['warm']['wall_seconds']:.2f}s ({pipeline['warm']['requests']} requests)"
+    )
+    for stage, timing in stages.items():
+        print(f"         {stage:<18} {timing['seconds'] * 1000:9.3f} ms  {timing['per_item_us']:8.2f} us/item")
+    return result
+
+
+def timings(report):
+    """Flatten a benchmark report into {"size/metric": seconds}."""
+    flat = {}
+    for size, result in report["sizes"].items():
+        for run, pipeline in result["pipeline"].items():
+            flat[f"{size}/pipeline_{run}"] = pipeline["wall_seconds"]
+        for stage, timing in result["stages"].items():
+            flat[f"{size}/{stage}"] = timing["seconds"]
+    if "records" in report:
+        flat["records/parse"] = report["records"]["parse_seconds"]
+        flat["records/serialize"] = report["records"]["serialize_seconds"]
+    for count, result in report.get("league", {}).items():
+        for stage, timing in result["stages"].items():
+            flat[f"league-{count}/{stage}"] = timing["seconds"]
+    return flat
+
+
+def regressions(report, baseline, tolerance):
+    current = timings(report)
+    found = []
+    for key, before in timings(baseline).items():
+        after = current.get(key)
+        if after is not None and before > 0 and after > before * (1 + tolerance):
+            found.append(f"{key}: {before:.4f}s -> {after:.4f}s (+{(after / before - 1) * 100:.0f}%)")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CricHeroes fetch pipeline offline.")
+    parser.add_argument("--fixtures", help="recorded fixture directory (default: synthesized from data/)")
+    parser.add_argument("--sizes", default=",".join(SIZES), help="comma-separated subset of " + ", ".join(SIZES))
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated API latency per request")
+    parser.add_argument("--rps", type=float, default=0, help="request rate limit for the pipeline (0 = none)")
+    parser.add_argument("--repeat", type=int, default=5, help="repeats per in-process stage timing")
+    parser.add_argument("--records", type=int, default=10000, help="scorecards to parse into records (0 = skip)")
+    parser.add_argument(
+        "--league", default=LEAGUE_SIZES, help="comma-separated generated league sizes in matches (empty = skip)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the generated leagues")
+    parser.add_argument("--output", default=os.path.join(fetch_cricheroes.METRICS_DIR, "benchmark.json"))
+    parser.add_argument("--baseline", help="earlier benchmark.json to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against --baseline")
+    parser.add_argument("--keep", action="store_true", help="keep the scratch directory")
+    args = parser.parse_args()
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+    try:
+        league_sizes = [int(size) for size in args.league.split(",") if size.strip() and int(size) > 0]
+    except ValueError:
+        parser.error(f"--league takes match counts, not {args.league!r}")
+
+    work_root = tempfile.mkdtemp(prefix="cricheroes-bench-")
+    try:
+        base_dir = args.fixtures
+        if not base_dir:
+            base_dir = os.path.join(work_root, "fixtures-small")
+            fixtures.synthesize(
+                DATA_DIR, base_dir, fetch_cricheroes.TEAM_ID, fetch_cricheroes.LEGACY_TEAM_ID,
+                fetch_cricheroes.LEGACY_YEAR,
+            )
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "latency_ms": args.latency_ms,
+            "sizes": {},
+        }
+        for size in sizes:
+            fixture_dir = base_dir
+            if SIZES[size] > 1:
+                fixture_dir = os.path.join(work_root, f"fixtures-{size}")
+                fixtures.scale(
+                    base_dir, fixture_dir, SIZES[size], (fetch_cricheroes.TEAM_ID, fetch_cricheroes.LEGACY_TEAM_ID)
+                )
+            report["sizes"][size] = benchmark_size(size, fixture_dir, work_root, args)
+        if args.records:
+            report["records"] = measure_records(base_dir, args.records, min(args.repeat, 3))
+        if league_sizes:
+            report["league"] = {
+                str(count): measure_league(count, args.seed, work_root) for count in league_sizes
+            }
+            report["league_numpy"] = impact.numpy is not None
+    finally:
+        if args.keep:
+            print(f"Scratch files kept in {work_root}")
+        else:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            found = regressions(report, json.load(f), args.tolerance)
+        if found:
+            print(f"❌ {len(found)} timings regressed by more than {args.tolerance:.0%}:")
+            for line in found:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Compact, string-interned columnar encoding of match_scorecards.json.
+
+Player and team names go into one shared string table. Each match keeps its
+batting and bowling rows once, as column arrays (names and teams as string
+table indices, not_out as 0/1). top_batters, falcon_batters and the other
+lists refer to those rows by index instead of repeating them:
+
+    {"version": 1, "strings": [...], "columns": {"batting": [...], "bowling": [...]},
+     "matches": {"<match id>": {"batting": [[...], ...], "top_batters": [0, 3], ...}}}
+
+player_of_match is [name, team, stat] and falcon_of_match [name, stat, type],
+with names and teams as string indices. decode() restores the regular
+layout.
+The file is always written minified, since indentation would put every
+array element on its own line.
+"""
+
+from records import BattingInnings, BowlingSpell
+
+COMPACT_VERSION = 1
+COLUMNS = {"batting": BattingInnings.__slots__, "bowling": BowlingSpell.__slots__}
+LISTS = {
+    "top_batters": "batting",
+    "falcon_batters": "batting",
+    "top_bowlers": "bowling",
+    "falcon_bowlers": "bowling",
+}
+INTERNED = ("name", "team")
+
+
+def encode(match_scorecards):
+    strings = []
+    string_index = {}
+
+    def intern(value):
+        if value not in string_index:
+            string_index[value] = len(strings)
+            strings.append(value)
+        return string_index[value]
+
+    def cell(column, value):
+        if column in INTERNED:
+            return intern(value or "")
+        if column == "not_out":
+            return int(bool(value))
+        return value
+
+    matches = {}
+    for match_id, scorecard in match_scorecards.items():
+        encoded = {}
+        tables = {kind: [] for kind in COLUMNS}
+        positions = {kind: {} for kind in COLUMNS}
+        for list_name, kind in LISTS.items():
+            refs = []
+            for row in scorecard.get(list_name) or []:
+                values = tuple(cell(column, getattr(row, column)) for column in COLUMNS[kind])
+                if values not in positions[kind]:
+                    positions[kind][values] = len(tables[kind])
+                    tables[kind].append(values)
+                refs.append(positions[kind][values])
+            encoded[list_name] = refs
+        for kind, rows in tables.items():
+            encoded[kind] = [list(column) for column in zip(*rows)] if rows else [[] for _ in COLUMNS[kind]]
+        mom = scorecard.get("player_of_match")
+        encoded["player_of_match"] = [intern(mom["name"]), intern(mom.get("team", "")), mom["stat"]] if mom else None
+        fotm = scorecard.get("falcon_of_match")
+        encoded["falcon_of_match"] = [intern(fotm["name"]), fotm["stat"], fotm["type"]] if fotm else None
+        matches[match_id] = encoded
+    return {
+        "version": COMPACT_VERSION,
+        "strings": strings,
+        "columns": {kind: list(columns) for kind, columns in COLUMNS.items()},
+        "matches": matches,
+    }
+
+
+def decode(compact):
+    """Inverse of encode(): the same dicts match_scorecards.json holds, player_id None included."""
+    strings = compact["strings"]
+    columns = compact["columns"]
+    decoded = {}
+    for match_id, encoded in compact["matches"].items():
+        rows = {}
+        for kind, names in columns.items():
+            table = encoded[kind]
+            rows[kind] = []
+            for position in range(len(table[0]) if table else 0):
+                row = {}
+                for column, values in zip(names, table):
+                    value = values[position]
+                    if column in INTERNED:
+                        value = strings[value]
+                    elif column == "not_out":
+                        value = bool(value)
+                    row[column] = value
+                rows[kind].append(row)
+        scorecard = {list_name: [rows[kind][i] for i in encoded[list_name]] for list_name, kind in LISTS.items()}
+        mom = encoded["player_of_match"]
+        scorecard["player_of_match"] = (
+            {"name": strings[mom[0]], "team": strings[mom[1]], "stat": mom[2]} if mom else None
+        )
+        fotm = encoded["falcon_of_match"]
+        scorecard["falcon_of_match"] = {"name": strings[fotm[0]], "stat": fotm[1], "type": fotm[2]} if fotm else None
+        decoded[match_id] = scorecard
+    return decoded
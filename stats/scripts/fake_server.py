@@ -0,0 +1,226 @@
+"""Local stand-in for the CricHeroes API that replays a fixture directory.
+
+    python scripts/fake_server.py FIXTURE_DIR --port 8765 --latency-ms 40
+    CRICHEROES_API_BASE=http://127.0.0.1:8765/api/v1 python scripts/fetch_cricheroes.py
+
+Paths without a fixture answer like the real API does for unknown ids
+({"status": false, "error": {"message": "No data found"}}). Latency,
+re-pagination, 429s and failures can be injected to exercise the fetcher's
+retry, backoff and pagination paths offline. GET /__stats returns request
+counts.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fixtures
+
+NO_DATA = json.dumps({"status": False, "error": {"message": "No data found"}}).encode("utf-8")
+PAGE_PARAM = "fake_page"
+
+
+class FailureRule:
+    """Answer requests whose path matches pattern with status, at most count times (0 = always)."""
+
+    def __init__(self, spec):
+        pattern, _, rest = spec.rpartition("=")
+        status, _, count = rest.partition(":")
+        self.pattern = re.compile(pattern)
+        self.status = int(status)
+        self.remaining = int(count) if count else None
+
+    def matches(self, path):
+        if not self.pattern.search(path) or self.remaining == 0:
+            return False
+        if self.remaining is not None:
+            self.remaining -= 1
+        return True
+
+
+class FakeCricHeroes:
+    """Replay settings and counters shared by every request handler thread."""
+
+    def __init__(self, fixture_dir, prefix="/api/v1/", latency_ms=0.0, jitter_ms=0.0, page_size=0,
+                 rate_limit_every=0, retry_after=1, fail=(), fail_rate=0.0, etag=False, seed=0):
+        self.fixture_dir = fixture_dir
+        self.prefix = prefix
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.page_size = page_size
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.rules = [FailureRule(spec) for spec in fail]
+        self.fail_rate = fail_rate
+        self.etag = etag
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "served": 0, "no_data": 0, "not_modified": 0, "injected": {}}
+        self.page_cache = {}
+
+    def delay(self):
+        with self.lock:
+            jitter = self.random.uniform(0, self.jitter) if self.jitter else 0.0
+        return self.latency + jitter
+
+    def injected_status(self, path):
+        """Status code to fail this request with, or None to serve it."""
+        with self.lock:
+            self.counts["requests"] += 1
+            status = None
+            if self.rate_limit_every and self.counts["requests"] % self.rate_limit_every == 0:
+                status = 429
+            for rule in self.rules:
+                if status is None and rule.matches(path):
+                    status = rule.status
+            if status is None and self.fail_rate and self.random.random() < self.fail_rate:
+                status = 503
+            if status is not None:
+                key = str(status)
+                self.counts["injected"][key] = self.counts["injected"].get(key, 0) + 1
+            return status
+
+    def body(self, path, base_url):
+        """Response body for an API path, applying re-pagination and link rewriting."""
+        parts = urllib.parse.urlsplit(path)
+        query = urllib.parse.parse_qs(parts.query)
+        if self.page_size and (PAGE_PARAM in query or self.paginated(path)):
+            return self.page_body(parts, query, base_url)
+        raw = fixtures.read_fixture(self.fixture_dir, path)
+        if raw is None:
+            return None
+        payload = json.loads(raw)
+        next_url = (payload.get("page") or {}).get("next") if isinstance(payload, dict) else None
+        if not next_url:
+            return raw
+        # Recorded links point at the live API (or are relative); keep clients on this server.
+        payload["page"]["next"] = f"{base_url}{fixtures.relative_path(next_url, self.prefix)}"
+        return json.dumps(payload).encode("utf-8")
+
+    def paginated(self, path):
+        raw = fixtures.read_fixture(self.fixture_dir, path)
+        return raw is not None and b'"page"' in raw and isinstance(json.loads(raw).get("data"), list)
+
+    def page_body(self, parts, query, base_url):
+        base_path = parts.path.lstrip("/")
+        with self.lock:
+            items = self.page_cache.get(base_path)
+        if items is None:
+            items, _ = fixtures.collect_pages(self.fixture_dir, base_path)
+            with self.lock:
+                self.page_cache[base_path] = items
+        page = int(query.get(PAGE_PARAM, ["1"])[0])
+        start = (page - 1) * self.page_size
+        chunk = items[start:start + self.page_size]
+        has_next = start + self.page_size < len(items)
+        next_url = f"{base_url}{base_path}?{PAGE_PARAM}={page + 1}" if has_next else None
+        return json.dumps({"status": True, "data": chunk, "page": {"next": next_url}}).encode("utf-8")
+
+    def count(self, key):
+        with self.lock:
+            self.counts[key] += 1
+
+    def stats(self):
+        with self.lock:
+            return json.loads(json.dumps(self.counts))
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Small JSON replies otherwise sit in Nagle's buffer waiting for the client's ACK.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        fake = self.server.fake
+        if self.path == "/__stats":
+            return self.reply(200, json.dumps(fake.stats()).encode("utf-8"))
+        parts = urllib.parse.urlsplit(self.path)
+        path = parts.path.split(fake.prefix, 1)[-1].lstrip("/")
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        time.sleep(fake.delay())
+        status = fake.injected_status(path)
+        if status is not None:
+            headers = {"Retry-After": str(fake.retry_after)} if status == 429 else {}
+            return self.reply(status, b"", headers)
+        base_url = f"http://{self.headers.get('Host')}{fake.prefix}"
+        body = fake.body(path, base_url)
+        if body is None:
+            fake.count("no_data")
+            return self.reply(200, NO_DATA)
+        headers = {}
+        if fake.etag:
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            if self.headers.get("If-None-Match") == etag:
+                fake.count("not_modified")
+                return self.reply(304, b"", {"ETag": etag})
+            headers["ETag"] = etag
+        fake.count("served")
+        self.reply(200, body, headers)
+
+    def reply(self, status, body, headers=None):
+        self.send_response(status)
+        headers = dict(headers or {})
+        if body and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        if status == 200:
+            headers["Content-Type"] = "application/json"
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start(fake, host="127.0.0.1", port=0):
+    """Serve fake on a daemon thread; returns (server, API base URL). Stop with server.shutdown()."""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.fake = fake
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}{fake.prefix.rstrip('/')}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded CricHeroes fixtures over HTTP.")
+    parser.add_argument("fixture_dir")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="random extra delay, up to this much")
+    parser.add_argument("--page-size", type=int, default=0, help="re-paginate list endpoints with this page size")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--fail", action="append", default=[], metavar="REGEX=STATUS[:COUNT]",
+                        help="fail matching paths with STATUS, at most COUNT times")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--etag", action="store_true", help="send ETags and answer If-None-Match with 304")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    fake = FakeCricHeroes(
+        args.fixture_dir, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, page_size=args.page_size,
+        rate_limit_every=args.rate_limit_every, retry_after=args.retry_after, fail=args.fail,
+        fail_rate=args.fail_rate, etag=args.etag, seed=args.seed,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.fake = fake
+    print(f"Serving {args.fixture_dir} at http://{args.host}:{args.port}{fake.prefix.rstrip('/')}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,43 @@
+import argparse
+import contextlib
+import cProfile
+import gzip
+import hashlib
+import http.client
 import json
 import os
+import random
+import re
 import sys
+import threading
 import time
+import urllib.error
 import urllib.parse
-import urllib.request
-from datetime import datetime
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from email.utils import parsedate_to_datetime
+
+import ball_by_ball
+import compact
+import fixtures
+import impact
+from aggregate import CareerAggregator
+from metrics import RunMetrics
+from records import (
+    BattingInnings, BowlingSpell, CareerBatting, CareerBowling, CareerFielding, Match, Player, safe_int,
+    to_json,
+)
+from scheduler import Stage, critical_path, run_stages
+from store import Store
+from writer import JsonWriter
 
 TEAM_ID = int(os.environ.get("CRICHEROES_TEAM_ID", "12228002"))
 LEGACY_TEAM_ID = int(os.environ.get("CRICHEROES_LEGACY_TEAM_ID", "6984017"))
 LEGACY_YEAR = int(os.environ.get("CRICHEROES_LEGACY_YEAR", "2025"))
+# JSON file listing several teams to ingest in one run (see teams.example.json);
+# when unset, the single team above is ingested into OUTPUT_DIR.
+TEAMS_CONFIG = os.environ.get("CRICHEROES_TEAMS_CONFIG", "")
 OUTPUT_DIR = "data"
 
 API_BASE = os.environ.get("CRICHEROES_API_BASE", "https://api.cricheroes.in/api/v1")
@@ -17,6 +46,78 @@ DEVICE_TYPE = os.environ.get("CRICHEROES_DEVICE_TYPE", "Android")
 UDID = os.environ.get("CRICHEROES_UDID", "ab7905ae4e2ddf11cc91ca0e05241cfc")
 MAX_MATCH_PAGES = int(os.environ.get("CRICHEROES_MAX_MATCH_PAGES", "10"))
 REQUEST_TIMEOUT = int(os.environ.get("CRICHEROES_TIMEOUT_SECONDS", "30"))
+CACHE_DIR = os.environ.get("CRICHEROES_CACHE_DIR", ".cache")
+# Save every API response body as a fixture under this directory (see fixtures.py).
+# Caches are bypassed while recording so every endpoint actually gets hit.
+RECORD_DIR = os.environ.get("CRICHEROES_RECORD_DIR", "")
+REFRESH_SCORECARDS = os.environ.get("CRICHEROES_REFRESH_SCORECARDS", "") == "1" or bool(RECORD_DIR)
+CONCURRENCY = max(1, int(os.environ.get("CRICHEROES_CONCURRENCY", "4")))
+REQUESTS_PER_SECOND = float(os.environ.get("CRICHEROES_REQUESTS_PER_SECOND", "4"))
+HTTP_CACHE_ENABLED = os.environ.get("CRICHEROES_HTTP_CACHE", "1") != "0" and not RECORD_DIR
+HTTP_CACHE_MAX_BYTES = int(float(os.environ.get("CRICHEROES_HTTP_CACHE_MAX_MB", "50")) * 1024 * 1024)
+# Raw responses and normalized tables every output is exported from (see store.py).
+STORE_PATH = os.environ.get("CRICHEROES_DB", os.path.join(CACHE_DIR, "cricheroes.db"))
+# Output files are written with sorted keys; minified and/or with precompressed
+# .gz siblings with CRICHEROES_PRECOMPRESS=gz.
+JSON_MINIFY = os.environ.get("CRICHEROES_JSON_MINIFY", "") == "1"
+PRECOMPRESS = [kind.strip() for kind in os.environ.get("CRICHEROES_PRECOMPRESS", "").split(",") if kind.strip()]
+CHECKPOINT_MAX_AGE_HOURS = float(os.environ.get("CRICHEROES_CHECKPOINT_MAX_AGE_HOURS", "12"))
+# Comma-separated: "monolithic" writes match_scorecards.json, "sharded" writes
+# scorecards/ plus a manifest, "compact" writes the string-interned columnar
+# match_scorecards.compact.json (see compact.py); "both" is monolithic,sharded.
+# Shards hold one match or one tournament each.
+SCORECARD_OUTPUT = {
+    kind
+    for part in os.environ.get("CRICHEROES_SCORECARD_OUTPUT", "both").split(",")
+    for kind in (("monolithic", "sharded") if part.strip() == "both" else (part.strip(),))
+}
+SCORECARD_SHARD_BY = os.environ.get("CRICHEROES_SCORECARD_SHARD_BY", "tournament")
+SCORECARD_SHARD_DIR = "scorecards"
+# Lookup indexes for the frontend (player slug, match, opponent, venue, season).
+INDEX_DIR = "indexes"
+# Set to 1 to ingest each match's ball-by-ball feed (see ball_by_ball.py) and
+# write ball_by_ball_matches.json and ball_by_ball_players.json; {match_id} in
+# the path is replaced by the match id.
+BALL_BY_BALL = os.environ.get("CRICHEROES_BALL_BY_BALL", "") == "1"
+BALL_BY_BALL_PATH = os.environ.get("CRICHEROES_BALL_BY_BALL_PATH", "scorecard/get-commentary/{match_id}")
+# Streamed bodies shorter than this are decoded to look for an API error.
+RAW_ERROR_MAX_BYTES = 4096
+STREAM_CHUNK_BYTES = 64 * 1024
+# Set to 0 to build player_stats.json from locally aggregated scorecards
+# instead of one player/get-player-statistic call per roster player.
+CAREER_STATS_FROM_API = os.environ.get("CRICHEROES_CAREER_STATS", "1") != "0"
+METRICS_DIR = os.environ.get("CRICHEROES_METRICS_DIR", "metrics")
+PROFILE = os.environ.get("CRICHEROES_PROFILE", "") == "1"
+RETRY_BASE_SECONDS = float(os.environ.get("CRICHEROES_RETRY_BASE_SECONDS", "1"))
+RETRY_MAX_SECONDS = float(os.environ.get("CRICHEROES_RETRY_MAX_SECONDS", "30"))
+RETRY_AFTER_MAX_SECONDS = float(os.environ.get("CRICHEROES_RETRY_AFTER_MAX_SECONDS", "120"))
+BREAKER_THRESHOLD = int(os.environ.get("CRICHEROES_BREAKER_THRESHOLD", "5"))
+BREAKER_COOLDOWN_SECONDS = float(os.environ.get("CRICHEROES_BREAKER_COOLDOWN_SECONDS", "60"))
+# --watch polls every WATCH_LIVE_SECONDS while a scorecard keeps changing, backs off to
+# four times that during lulls in a live match, and to WATCH_IDLE_SECONDS with nothing live.
+WATCH_LIVE_SECONDS = float(os.environ.get("CRICHEROES_WATCH_LIVE_SECONDS", "60"))
+WATCH_IDLE_SECONDS = float(os.environ.get("CRICHEROES_WATCH_IDLE_SECONDS", "900"))
+
+# Scorecards of matches in these states never change, so they are served from disk.
+COMPLETED_MATCH_STATUSES = {"past", "completed", "resulted", "abandoned"}
+LIVE_MATCH_STATUSES = {"live", "running", "in_progress"}
+
+# Names the default team has played under; only consulted when a payload carries no team id.
+FALCON_NAMES = {"falcons", "hsc falcons", "helenelund cricket club"}
+
+# Endpoint families kept in the HTTP cache, with how long (seconds) a stored
+# response is served without asking the server. Expired entries are
+# revalidated with ETag/Last-Modified when the server sent them.
+HTTP_CACHE_TTLS = {
+    "team/get-team-players/": 6 * 3600,
+    "team/get-team-match/": 0,
+    "leaderboard/": 6 * 3600,
+    "player/get-player-statistic/": 12 * 3600,
+}
+
+# Bump whenever parse_career_* or parse_scorecard change shape, so derived
+# results cached against unchanged payloads are rebuilt.
+DERIVED_CACHE_VERSION = 3
 
 HEADERS = {
     "api-key": API_KEY,
@@ -24,14 +125,485 @@ HEADERS = {
     "udid": UDID,
     "user-agent": "Mozilla/5.0",
     "accept": "application/json",
+    "accept-encoding": "gzip",
 }
 
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+# Error classes from classify_error() worth another attempt. "no_data" (a
+# status:false payload or a 4xx other than 429) is an answer, not a failure.
+RETRYABLE_ERRORS = {"rate_limited", "server", "timeout", "network"}
+
+
+def save_json(filename, data, verbose=True, output_dir=OUTPUT_DIR, minify=None):
+    """Write an output file through WRITER; returns False when the content was unchanged."""
+    written = WRITER.save(output_dir, filename, data, minify)
+    if written and verbose:
+        print(f"Saved {os.path.join(output_dir, filename)}")
+    return written
+
+
+def load_json_file(path, default):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def write_json_file(path, data):
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, default=to_json)
+    os.replace(tmp_path, path)
+
+
+class TokenBucket:
+    """Thread-safe token bucket; every outgoing API request takes one token."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def pause(self, seconds):
+        """Hold back every caller for seconds, e.g. after the server answered 429."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.rate <= 0:
+                    return
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+RATE_LIMITER = TokenBucket(REQUESTS_PER_SECOND)
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Per-endpoint-family breaker that fails fast once an endpoint keeps failing.
+
+    After threshold consecutive retryable failures the family is open and
+    calls raise CircuitOpenError without touching the network. Once the
+    cooldown passes a single trial request is let through; success closes
+    the breaker, failure opens it again.
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.families = {}
+        self.lock = threading.Lock()
+
+    def check(self, family):
+        if self.threshold <= 0:
+            return
+        with self.lock:
+            state = self.families.get(family)
+            if not state or state["opened_at"] is None:
+                return
+            if time.monotonic() - state["opened_at"] < self.cooldown or state["trial"]:
+                raise CircuitOpenError(f"circuit open for {family} after {state['failures']} failures")
+            state["trial"] = True
+
+    def success(self, family):
+        with self.lock:
+            self.families.pop(family, None)
+
+    def release(self, family):
+        """End a trial request that was neither a success nor a failure, so a later call can try again."""
+        with self.lock:
+            state = self.families.get(family)
+            if state:
+                state["trial"] = False
+
+    def failure(self, family):
+        with self.lock:
+            state = self.families.setdefault(family, {"failures": 0, "opened_at": None, "trial": False})
+            state["failures"] += 1
+            if state["failures"] >= self.threshold:
+                state["opened_at"] = time.monotonic()
+                state["trial"] = False
+
+    def open_families(self):
+        with self.lock:
+            return sorted(family for family, state in self.families.items() if state["opened_at"] is not None)
+
+
+BREAKER = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_COOLDOWN_SECONDS)
+
+SKIPPED_UNITS = []
+SKIPPED_LOCK = threading.Lock()
+
+
+def record_skipped(unit, error):
+    with SKIPPED_LOCK:
+        SKIPPED_UNITS.append({"unit": unit, "reason": classify_error(error), "error": str(error)})
+
+
+def classify_error(error):
+    """Return "no_data", "rate_limited", "server", "timeout", "network" or "circuit_open"."""
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, urllib.error.HTTPError):
+        if error.code == 429:
+            return "rate_limited"
+        if error.code >= 500:
+            return "server"
+        return "no_data"
+    if isinstance(error, RuntimeError):
+        return "no_data"
+    if isinstance(error, TimeoutError):
+        return "timeout"
+    if isinstance(error, ValueError):
+        # Truncated or non-JSON body from a struggling backend.
+        return "server"
+    return "network"
+
+
+def retry_after_seconds(headers):
+    value = headers.get("retry-after") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
 
-def save_json(filename, data):
-    path = os.path.join(OUTPUT_DIR, filename)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-    print(f"Saved {path}")
+
+def backoff_seconds(attempt):
+    # Full jitter keeps concurrent workers from retrying in lockstep.
+    return random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**attempt))
+
+
+# Bounds in-flight requests across every fan-out, however they are nested.
+IN_FLIGHT = threading.BoundedSemaphore(CONCURRENCY)
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections shared across requests and threads."""
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def _acquire(self, key):
+        with self.lock:
+            idle = self.idle.get(key)
+            if idle:
+                return idle.pop(), True
+        scheme, host, port = key
+        connection_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return connection_cls(host, port, timeout=self.timeout), False
+
+    def _release(self, key, connection):
+        with self.lock:
+            self.idle.setdefault(key, []).append(connection)
+
+    def request(self, url, headers, max_redirects=5, sink=None):
+        """GET url and return (status, headers, body bytes), gunzipping the body if needed.
+
+        With sink, a binary file, a successful body is written to it chunk by
+        chunk instead of being read into memory, and the body returned is None.
+        """
+        for _ in range(max_redirects + 1):
+            parts = urllib.parse.urlsplit(url)
+            key = (parts.scheme, parts.hostname, parts.port)
+            target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+            connection, reused = self._acquire(key)
+            try:
+                connection.request("GET", target, headers=headers)
+                response = connection.getresponse()
+                if sink is not None and 200 <= response.status < 300:
+                    body = None
+                    self._stream(response, sink)
+                else:
+                    body = response.read()
+            except (http.client.HTTPException, ConnectionError):
+                connection.close()
+                if reused:
+                    # The server dropped an idle keep-alive connection; retry on a fresh one.
+                    continue
+                raise
+            except Exception:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(key, connection)
+            location = response.getheader("location")
+            if response.status in REDIRECT_STATUSES and location:
+                url = urllib.parse.urljoin(url, location)
+                continue
+            if body is not None and (response.getheader("content-encoding") or "").lower() == "gzip":
+                body = gzip.decompress(body)
+            return response.status, response.headers, body
+        raise urllib.error.URLError(f"too many redirects or dropped connections for {url}")
+
+    @staticmethod
+    def _stream(response, sink):
+        # A retry on a fresh connection starts the file over.
+        sink.seek(0)
+        sink.truncate()
+        gzipped = (response.getheader("content-encoding") or "").lower() == "gzip"
+        inflate = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+        while True:
+            chunk = response.read(STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            if not inflate:
+                sink.write(chunk)
+                continue
+            # Bounded output per call: a repetitive body can inflate a hundredfold.
+            while chunk:
+                sink.write(inflate.decompress(chunk, STREAM_CHUNK_BYTES))
+                chunk = inflate.unconsumed_tail
+        if inflate:
+            sink.write(inflate.flush())
+
+    def close(self):
+        with self.lock:
+            for connections in self.idle.values():
+                for connection in connections:
+                    connection.close()
+            self.idle.clear()
+
+
+HTTP_POOL = ConnectionPool(REQUEST_TIMEOUT)
+
+
+class HTTPCache:
+    """On-disk API response cache with validators, per-family TTLs and LRU eviction."""
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = {"fresh": 0, "revalidated": 0, "fetched": 0}
+        # Set for selective refreshes: every cached response is revalidated regardless of its TTL.
+        self.revalidate = False
+        filenames = os.listdir(root) if os.path.isdir(root) else []
+        self.sizes = {
+            filename: os.path.getsize(os.path.join(root, filename))
+            for filename in filenames
+            if filename.endswith(".json")
+        }
+
+    def ttl(self, url):
+        path = api_path(url)
+        for prefix, ttl in HTTP_CACHE_TTLS.items():
+            if path.startswith(prefix):
+                return ttl
+        return None
+
+    def _path(self, url):
+        return os.path.join(self.root, f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json")
+
+    def lookup(self, url):
+        entry = load_json_file(self._path(url), None)
+        return entry if entry and entry.get("url") == url else None
+
+    def is_fresh(self, entry):
+        return not self.revalidate and time.time() - entry["stored_at"] < self.ttl(entry["url"])
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["if-none-match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["if-modified-since"] = entry["last_modified"]
+        return headers
+
+    def hit(self, entry, kind):
+        os.utime(self._path(entry["url"]))
+        with self.lock:
+            self.stats[kind] += 1
+
+    def store(self, url, headers, digest, payload, previous=None):
+        entry = {
+            "url": url,
+            "etag": headers.get("etag") or "",
+            "last_modified": headers.get("last-modified") or "",
+            "sha256": digest,
+            "stored_at": time.time(),
+            "payload": payload,
+        }
+        if previous is not None:
+            previous.update(entry)
+            entry = previous
+        path = self._path(url)
+        os.makedirs(self.root, exist_ok=True)
+        write_json_file(path, entry)
+        with self.lock:
+            self.stats["fetched" if previous is None else "revalidated"] += 1
+            self.sizes[os.path.basename(path)] = os.path.getsize(path)
+            if sum(self.sizes.values()) > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        by_age = sorted(self.sizes, key=lambda name: os.path.getmtime(os.path.join(self.root, name)))
+        total = sum(self.sizes.values())
+        for filename in by_age:
+            if total <= self.max_bytes * 0.9:
+                break
+            total -= self.sizes.pop(filename)
+            os.remove(os.path.join(self.root, filename))
+
+
+HTTP_CACHE = HTTPCache(os.path.join(CACHE_DIR, "http"), HTTP_CACHE_MAX_BYTES) if HTTP_CACHE_ENABLED else None
+
+
+class DerivedCache:
+    """Normalized results keyed by the content hash of the payload they were built from."""
+
+    def __init__(self, path):
+        self.path = path
+        stored = load_json_file(path, {})
+        self.entries = stored.get("entries", {}) if stored.get("version") == DERIVED_CACHE_VERSION else {}
+        self.used = set()
+        self.lock = threading.Lock()
+
+    def get_or_build(self, kind, digest, build):
+        if not digest:
+            return build()
+        key = f"{kind}:{digest}"
+        with self.lock:
+            self.used.add(key)
+            if key in self.entries:
+                return self.entries[key]
+        value = build()
+        with self.lock:
+            self.entries[key] = value
+        return value
+
+    def save(self, prune=True):
+        # Only keep entries touched by this run so the file tracks the live data set;
+        # partial runs touch a few entries and keep the rest.
+        entries = {key: value for key, value in self.entries.items() if key in self.used or not prune}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        write_json_file(self.path, {"version": DERIVED_CACHE_VERSION, "entries": entries})
+
+
+DERIVED_CACHE = DerivedCache(os.path.join(CACHE_DIR, "derived.json"))
+STORE = Store(STORE_PATH)
+WRITER = JsonWriter(minify=JSON_MINIFY, compress=PRECOMPRESS)
+
+
+class CheckpointJournal:
+    """Append-only JSONL log of completed fetch units, so an interrupted run can resume.
+
+    The first line identifies the run configuration; a journal written for a
+    different configuration, or older than CHECKPOINT_MAX_AGE_HOURS, is ignored.
+    With path None nothing is read or written (selective refreshes).
+    """
+
+    def __init__(self, path, signature):
+        self.path = path
+        self.signature = signature
+        self.completed = {}
+        self.lock = threading.Lock()
+        self.file = None
+        self._load()
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return
+        try:
+            header = json.loads(lines[0])
+        except (IndexError, ValueError):
+            return
+        age_hours = (time.time() - header.get("started_at", 0)) / 3600
+        if header.get("signature") != self.signature or age_hours > CHECKPOINT_MAX_AGE_HOURS:
+            return
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A crash mid-append leaves a truncated last line.
+                continue
+            self.completed[record["unit"]] = record["data"]
+
+    def _open(self):
+        if self.file:
+            return
+        resume = bool(self.completed)
+        self.file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if not resume:
+            self.file.write(json.dumps({"signature": self.signature, "started_at": time.time()}) + "\n")
+
+    def run(self, unit, fetch, keep=lambda data: True):
+        """Return the journaled result for unit, or call fetch() and journal what it returns."""
+        with self.lock:
+            if unit in self.completed:
+                return self.completed[unit]
+        data = fetch()
+        if self.path and keep(data):
+            line = json.dumps({"unit": unit, "data": data}, default=to_json) + "\n"
+            with self.lock:
+                self._open()
+                self.file.write(line)
+                self.file.flush()
+                self.completed[unit] = data
+        return data
+
+    def finish(self):
+        if self.file:
+            self.file.close()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+METRICS = RunMetrics()
+
+
+def fetch_all(fn, items):
+    """Apply fn to every item concurrently, returning results in input order."""
+    items = list(items)
+    if CONCURRENCY == 1 or len(items) < 2:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        return list(pool.map(fn, items))
+
+
+def api_path(url):
+    base = f"{API_BASE.rstrip('/')}/"
+    return url[len(base):] if url.startswith(base) else url
+
+
+def endpoint_family(url):
+    """Group URLs by endpoint, e.g. .../scorecard/get-scorecard/123?x=1 -> scorecard/get-scorecard."""
+    path = urllib.parse.urlsplit(api_path(url)).path
+    return "/".join(part for part in path.strip("/").split("/") if part and not part.isdigit())
 
 
 def build_url(path, params=None):
@@ -44,52 +616,150 @@ def build_url(path, params=None):
     return url
 
 
-def fetch_json(path, params=None, retries=3):
+def check_api_status(payload):
+    if isinstance(payload, dict) and payload.get("status") is False:
+        message = payload.get("error", {}).get("message") or "Unknown API error"
+        raise RuntimeError(message)
+
+
+def fetch_json_entry(path, params=None, retries=3, into=None):
+    """Fetch path and return (payload, sha256 of the response body).
+
+    Endpoint families listed in HTTP_CACHE_TTLS are served from the HTTP cache
+    while fresh and revalidated with conditional requests once expired. With
+    into, a file path, the body is streamed to that file undecoded and
+    uncached, for payloads that are parsed as a stream, and the payload
+    returned is the path; only a body short enough to be an API error is
+    decoded.
+    """
     url = build_url(path, params=params)
+    family = endpoint_family(url)
+    cached = None
+    if HTTP_CACHE and HTTP_CACHE.ttl(url) is not None and not into:
+        cached = HTTP_CACHE.lookup(url)
+        if cached and HTTP_CACHE.is_fresh(cached):
+            HTTP_CACHE.hit(cached, "fresh")
+            METRICS.record_cache(family, "fresh")
+            return cached["payload"], cached["sha256"]
+    headers = dict(HEADERS, **HTTP_CACHE.conditional_headers(cached)) if cached else HEADERS
+    last_error = None
     for attempt in range(1, retries + 1):
         try:
-            request = urllib.request.Request(url, headers=HEADERS)
-            with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
-                payload = json.loads(response.read().decode("utf-8"))
-            if isinstance(payload, dict) and payload.get("status") is False:
-                message = payload.get("error", {}).get("message") or "Unknown API error"
-                raise RuntimeError(message)
-            return payload
-        except Exception:
+            BREAKER.check(family)
+        except CircuitOpenError:
+            if last_error is None:
+                raise
+            # The breaker opened while this request was retrying; report what actually failed.
+            raise last_error from None
+        try:
+            waited = time.perf_counter()
+            RATE_LIMITER.acquire()
+            METRICS.add_wait("rate_limit", time.perf_counter() - waited)
+            with IN_FLIGHT, open(into, "w+b") if into else contextlib.nullcontext() as sink:
+                started = time.perf_counter()
+                status, response_headers, body = HTTP_POOL.request(url, headers, sink=sink)
+                size = sink.tell() if body is None else len(body)
+            METRICS.record_request(family, time.perf_counter() - started, size, status)
+            if status == 304 and cached:
+                HTTP_CACHE.store(url, response_headers, cached["sha256"], cached["payload"], previous=cached)
+                METRICS.record_cache(family, "revalidated")
+                return cached["payload"], cached["sha256"]
+            if status >= 400:
+                raise urllib.error.HTTPError(url, status, http.client.responses.get(status, ""), response_headers, None)
+            if into:
+                with open(into, "rb") as f:
+                    if size < RAW_ERROR_MAX_BYTES:
+                        check_api_status(json.loads(f.read()))
+                        f.seek(0)
+                    digest = hashlib.file_digest(f, "sha256").hexdigest()
+                STORE.record_response(api_path(url), family, digest, size)
+                if RECORD_DIR:
+                    fixtures.record_file(RECORD_DIR, api_path(url), into)
+                BREAKER.success(family)
+                return into, digest
+            if RECORD_DIR:
+                fixtures.record_response(RECORD_DIR, api_path(url), body)
+            started = time.perf_counter()
+            payload = json.loads(body)
+            METRICS.add_wait("parse", time.perf_counter() - started)
+            check_api_status(payload)
+            digest = hashlib.sha256(body).hexdigest()
+            STORE.record_response(api_path(url), family, digest, len(body))
+            if HTTP_CACHE and HTTP_CACHE.ttl(url) is not None:
+                HTTP_CACHE.store(url, response_headers, digest, payload)
+            BREAKER.success(family)
+            return payload, digest
+        except Exception as e:
+            kind = classify_error(e)
+            if kind not in RETRYABLE_ERRORS:
+                # The server answered, but not with data: neither a success nor an outage.
+                BREAKER.release(family)
+                METRICS.record_error(family, retried=False)
+                raise
+            last_error = e
+            BREAKER.failure(family)
+            METRICS.record_error(family, retried=attempt < retries)
             if attempt == retries:
                 raise
-            time.sleep(2**attempt)
+            delay = backoff_seconds(attempt)
+            if kind == "rate_limited":
+                retry_after = retry_after_seconds(getattr(e, "headers", None))
+                if retry_after is not None:
+                    delay = min(retry_after, RETRY_AFTER_MAX_SECONDS)
+                RATE_LIMITER.pause(delay)
+            METRICS.add_wait("backoff", delay)
+            time.sleep(delay)
+
+
+def fetch_json(path, params=None, retries=3):
+    return fetch_json_entry(path, params=params, retries=retries)[0]
 
 
-def fetch_paginated(path, max_pages):
+def fetch_paginated(path, max_pages, until=None):
+    """Items of up to max_pages pages; stops early after a page for which until(page items) is true."""
+    started = time.perf_counter()
     data = []
     next_path = path
     pages = 0
     while next_path and pages < max_pages:
         payload = fetch_json(next_path)
-        data.extend(payload.get("data", []))
+        items = payload.get("data", [])
+        data.extend(items)
         next_path = payload.get("page", {}).get("next")
         pages += 1
+        if until and until(items):
+            break
+    METRICS.record_pagination(endpoint_family(path), pages, time.perf_counter() - started)
     return data
 
 
-def safe_int(value, default=0):
-    try:
-        return int(value)
-    except (TypeError, ValueError):
-        return default
-
-
-def parse_match_year(match):
+def parse_match_datetime(match):
     start_time = match.get("match_start_time", "")
     if not start_time:
         return None
     try:
-        return datetime.fromisoformat(start_time.replace("Z", "+00:00")).year
+        return datetime.fromisoformat(start_time.replace("Z", "+00:00"))
     except ValueError:
         return None
 
 
+def played_on(match):
+    played_at = parse_match_datetime(match)
+    return played_at.date() if played_at else None
+
+
+def merge_matches(stored, fresh):
+    """The stored match list updated with fresh rows: known matches replaced in place, new ones first."""
+    fresh_by_id = {m["match_id"]: m for m in fresh}
+    stored_ids = {m["match_id"] for m in stored}
+    return [m for m in fresh if m["match_id"] not in stored_ids] + [fresh_by_id.get(m["match_id"], m) for m in stored]
+
+
+def parse_match_year(match):
+    played_at = parse_match_datetime(match)
+    return played_at.year if played_at else None
+
+
 def format_date(value):
     if not value:
         return ""
@@ -123,35 +793,31 @@ def build_match(match):
     match_id = match.get("match_id")
     match_url = f"https://cricheroes.com/scorecard/{match_id}" if match_id else ""
 
-    return {
-        "tournament": match.get("tournament_name") or "",
-        "info": info,
-        "score": score,
-        "result": summary,
-        "url": match_url,
-        "date": match_date,
-        "venue": ground_name,
-    }
+    return Match(match_id, match.get("tournament_name") or "", info, score, summary, match_url, match_date, ground_name)
+
+
+def match_outcome(match, team_ids):
+    """Classify a raw match as "win", "loss", "tie" or "no_result" for team_ids."""
+    result = (match.get("match_result") or "").lower()
+    winning_team_id = safe_int(match.get("winning_team_id"))
+    if "tie" in result:
+        return "tie"
+    if winning_team_id == 0:
+        return "no_result"
+    if winning_team_id in team_ids:
+        return "win"
+    return "loss"
 
 
 def build_team_stats(matches_raw, team_ids):
     total = len(matches_raw)
-    wins = 0
-    losses = 0
-    ties = 0
-    no_result = 0
-
+    outcomes = {"win": 0, "loss": 0, "tie": 0, "no_result": 0}
     for match in matches_raw:
-        result = (match.get("match_result") or "").lower()
-        winning_team_id = safe_int(match.get("winning_team_id"))
-        if "tie" in result:
-            ties += 1
-        elif winning_team_id == 0:
-            no_result += 1
-        elif winning_team_id in team_ids:
-            wins += 1
-        else:
-            losses += 1
+        outcomes[match_outcome(match, team_ids)] += 1
+    wins = outcomes["win"]
+    losses = outcomes["loss"]
+    ties = outcomes["tie"]
+    no_result = outcomes["no_result"]
 
     win_pct = (wins / total * 100) if total else 0.0
 
@@ -165,6 +831,163 @@ def build_team_stats(matches_raw, team_ids):
     ]
 
 
+def match_opponent(match, team_ids, aliases=()):
+    if safe_int(match.get("team_a_id")) in team_ids:
+        return (match.get("team_b") or "").strip()
+    if safe_int(match.get("team_b_id")) in team_ids:
+        return (match.get("team_a") or "").strip()
+    team_a = (match.get("team_a") or "").strip()
+    return (match.get("team_b") or "").strip() if team_a.lower() in aliases else team_a
+
+
+def aggregate_scorecards(aggregator, matches_raw, match_scorecards, team_ids, aliases=()):
+    """Fold completed matches into the aggregator; in-progress ones wait until they finish."""
+    completed = []
+    for match in matches_raw:
+        scorecard = match_scorecards.get(str(match.get("match_id")))
+        if scorecard and match_status(match) in COMPLETED_MATCH_STATUSES:
+            context = {
+                "season": parse_match_year(match),
+                "tournament": match.get("tournament_name") or "",
+                "opponent": match_opponent(match, team_ids, aliases),
+            }
+            completed.append((match["match_id"], context, scorecard))
+    return aggregator.update(completed)
+
+
+def build_tournaments(matches_raw, match_scorecards, team_ids):
+    """Aggregate each tournament's record, date range and Falcon leaders in one pass.
+
+    Falcon-of-tournament picks the highest summed impact across the
+    tournament's scorecards; ties go to whoever appeared first in matches_raw.
+    """
+    groups = {}
+    for match in matches_raw:
+        tournament = match.get("tournament_name") or ""
+        group = groups.get(tournament)
+        if group is None:
+            group = groups[tournament] = {
+                "match_ids": [],
+                "outcomes": {"win": 0, "loss": 0, "tie": 0, "no_result": 0},
+                "dates": [],
+                "bat": {},
+                "bowl": {},
+            }
+        match_id = match.get("match_id")
+        group["match_ids"].append(match_id)
+        group["outcomes"][match_outcome(match, team_ids)] += 1
+        played_at = parse_match_datetime(match)
+        if played_at:
+            group["dates"].append(played_at)
+        scorecard = match_scorecards.get(str(match_id)) or {}
+        for b in scorecard.get("falcon_batters", []):
+            totals = group["bat"].setdefault(b.name, [0, 0])
+            totals[0] += impact.batter_impact(b)
+            totals[1] += b.runs
+        for b in scorecard.get("falcon_bowlers", []):
+            totals = group["bowl"].setdefault(b.name, [0, 0])
+            totals[0] += impact.bowler_impact(b)
+            totals[1] += b.wickets
+
+    def leader(totals, unit):
+        if not totals:
+            return None
+        name, (score, value) = max(totals.items(), key=lambda item: item[1][0])
+        return {"name": name, "stat": f"{value} {unit}", "impact": round(score, 2)}
+
+    output = []
+    for tournament, group in groups.items():
+        dates = group["dates"]
+        name = tournament.strip() or "Friendlies"
+        if dates and not re.search(r"\d{4}", name):
+            name = f"{name} {max(dates).year}"
+        outcomes = group["outcomes"]
+        last_played = max(dates).timestamp() if dates else 0
+        output.append((last_played, {
+            "name": name,
+            "tournament": tournament,
+            "match_ids": group["match_ids"],
+            "matches": len(group["match_ids"]),
+            "wins": outcomes["win"],
+            "losses": outcomes["loss"],
+            "ties": outcomes["tie"],
+            "no_result": outcomes["no_result"],
+            "first_date": min(dates).strftime("%d-%b-%y") if dates else "",
+            "last_date": max(dates).strftime("%d-%b-%y") if dates else "",
+            "falcon_bat": leader(group["bat"], "runs"),
+            "falcon_bowl": leader(group["bowl"], "wkts"),
+            "impact": {
+                "batting": round(sum(score for score, _ in group["bat"].values()), 2),
+                "bowling": round(sum(score for score, _ in group["bowl"].values()), 2),
+            },
+        }))
+    return [row for _, row in sorted(output, key=lambda item: -item[0])]
+
+
+def build_indexes(matches_raw, match_scorecards, players, team_ids, aliases=(), shard_paths=None):
+    """Lookup tables so pages can find their matches without scanning matches.json; filename -> contents.
+
+    players maps each roster slug to the player id and the matches the
+    player batted or bowled in; matches maps a match id to its position in
+    matches.json and, with sharded output, its shard. Opponents, venues and
+    seasons map to match ids, newest first like matches.json, and opponents
+    also carry the head-to-head record.
+    """
+    appearances = {}
+    by_match = {}
+    opponents = {}
+    venues = {}
+    seasons = {}
+    for position, match in enumerate(matches_raw):
+        match_id = match.get("match_id")
+        by_match[str(match_id)] = {"position": position}
+        if shard_paths is not None:
+            by_match[str(match_id)]["shard"] = shard_paths.get(str(match_id))
+
+        scorecard = match_scorecards.get(str(match_id)) or {}
+        for row in scorecard.get("falcon_batters", []) + scorecard.get("falcon_bowlers", []):
+            if row.player_id:
+                played = appearances.setdefault(str(row.player_id), [])
+                if not played or played[-1] != match_id:
+                    played.append(match_id)
+
+        opponent = match_opponent(match, team_ids, aliases)
+        if opponent:
+            record = opponents.setdefault(
+                opponent, {"match_ids": [], "matches": 0, "wins": 0, "losses": 0, "ties": 0, "no_result": 0}
+            )
+            record["match_ids"].append(match_id)
+            record["matches"] += 1
+            outcome = match_outcome(match, team_ids)
+            record[{"win": "wins", "loss": "losses", "tie": "ties"}.get(outcome, outcome)] += 1
+        venue = (match.get("ground_name") or "").strip()
+        if venue:
+            venues.setdefault(venue, []).append(match_id)
+        season = parse_match_year(match)
+        if season:
+            seasons.setdefault(str(season), []).append(match_id)
+
+    return {
+        "players.json": {
+            p.slug: {"player_id": p.player_id, "match_ids": appearances.get(str(p.player_id), [])}
+            for p in players if p.player_id
+        },
+        "matches.json": by_match,
+        "opponents.json": opponents,
+        "venues.json": venues,
+        "seasons.json": seasons,
+    }
+
+
+def save_indexes(indexes, output_dir=OUTPUT_DIR):
+    written = [
+        save_json(f"{INDEX_DIR}/{filename}", data, verbose=False, output_dir=output_dir)
+        for filename, data in indexes.items()
+    ]
+    print(f"Saved {len(indexes)} lookup indexes in {os.path.join(output_dir, INDEX_DIR)}")
+    return sum(written)
+
+
 def build_leaderboard(category, items):
     output = []
     for item in items:
@@ -189,38 +1012,125 @@ def build_leaderboard(category, items):
     return output
 
 
+def merge_leaderboard(current_items, legacy_items):
+    """Current-team entries, then legacy entries for players not already listed."""
+    seen_pids = set()
+    merged = []
+    for item in current_items:
+        pid = item.get("player_id")
+        if pid:
+            seen_pids.add(pid)
+        merged.append(item)
+    for item in legacy_items:
+        if item.get("player_id") not in seen_pids:
+            merged.append(item)
+    return merged
+
+
 def make_slug(name):
     return name.strip().lower().replace(" ", "-")
 
 
+def make_file_slug(name, default):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or default
+
+
+def build_scorecard_shards(matches_raw, match_scorecards, shard_by):
+    """Split scorecards into shard files and build the manifest that points at them.
+
+    Returns (shards, manifest) where shards maps a path relative to OUTPUT_DIR
+    to its contents. Manifest rows follow matches_raw order and carry the
+    precomputed player/falcon of the match so listings need no shard at all.
+    """
+    shards = {}
+    manifest = []
+    for match in matches_raw:
+        match_id = str(match.get("match_id") or "")
+        scorecard = match_scorecards.get(match_id)
+        if not scorecard:
+            continue
+        tournament = match.get("tournament_name") or ""
+        if shard_by == "match":
+            shard_path = f"{SCORECARD_SHARD_DIR}/{match_id}.json"
+            shards[shard_path] = scorecard
+        else:
+            shard_path = f"{SCORECARD_SHARD_DIR}/{make_file_slug(tournament, 'friendlies')}.json"
+            shards.setdefault(shard_path, {})[match_id] = scorecard
+        manifest.append(
+            {
+                "match_id": match_id,
+                "tournament": tournament,
+                "date": format_date(match.get("match_start_time")),
+                "shard": shard_path,
+                "player_of_match": scorecard.get("player_of_match"),
+                "falcon_of_match": scorecard.get("falcon_of_match"),
+            }
+        )
+    return shards, manifest
+
+
+def save_scorecard_shards(shards, manifest, output_dir=OUTPUT_DIR):
+    shard_dir = os.path.join(output_dir, SCORECARD_SHARD_DIR)
+    os.makedirs(shard_dir, exist_ok=True)
+    for shard_path, data in shards.items():
+        save_json(shard_path, data, verbose=False, output_dir=output_dir)
+    save_json(f"{SCORECARD_SHARD_DIR}/manifest.json", manifest, output_dir=output_dir)
+    # Remove shards left over from a previous layout or renamed tournaments.
+    live = {os.path.basename(shard_path) for shard_path in shards} | {"manifest.json"}
+    for filename in os.listdir(shard_dir):
+        if filename.endswith(".json") and filename not in live:
+            WRITER.remove(output_dir, f"{SCORECARD_SHARD_DIR}/{filename}")
+    print(f"Saved {len(shards)} scorecard shards in {shard_dir}")
+
+
+def unique_slugs(items):
+    """{player_id: slug} with no slug shared by two players.
+
+    Namesakes keep make_slug() for the lowest player id, so an existing
+    profile URL does not move when a namesake joins; the others get their
+    player id appended.
+    """
+    slugs = {}
+    taken = set()
+    for item in sorted(items, key=lambda item: safe_int(item.get("player_id"))):
+        player_id = item.get("player_id")
+        if player_id in slugs:
+            continue
+        slug = make_slug(item.get("name") or "")
+        while slug in taken:
+            slug = f"{slug}-{player_id}"
+        slugs[player_id] = slug
+        taken.add(slug)
+    return slugs
+
+
 def build_players(items):
     output = []
+    slugs = unique_slugs(items)
     for item in items:
         player_id = item.get("player_id")
         name = item.get("name") or ""
-        output.append(
-            {
-                "player_id": player_id,
-                "name": name,
-                "slug": make_slug(name),
-                "sub_title": item.get("player_skill") or "",
-                "profile_url": f"https://cricheroes.com/player-profile/{player_id}"
-                if player_id
-                else "",
-                "profile_pic_url": item.get("profile_photo") or "",
-            }
-        )
+        output.append(Player(
+            player_id,
+            name,
+            slugs.get(player_id, make_slug(name)),
+            item.get("player_skill") or "",
+            f"https://cricheroes.com/player-profile/{player_id}" if player_id else "",
+            item.get("profile_photo") or "",
+        ))
     return output
 
 
 def fetch_player_career_stats(player_id):
-    """Fetch complete career statistics for a player from the CricHeroes API."""
+    """Fetch complete career statistics for a player; returns (statistics, payload hash)."""
     try:
-        payload = fetch_json(f"player/get-player-statistic/{player_id}", params={"pagesize": 100})
-        return payload.get("data", {}).get("statistics", {})
+        payload, digest = fetch_json_entry(f"player/get-player-statistic/{player_id}", params={"pagesize": 100})
+        return payload.get("data", {}).get("statistics", {}), digest
     except Exception as e:
+        if classify_error(e) != "no_data":
+            record_skipped(f"player_stats:{player_id}", e)
         print(f"  Warning: could not fetch stats for player {player_id}: {e}")
-        return {}
+        return {}, None
 
 
 def stats_list_to_dict(items):
@@ -230,209 +1140,266 @@ def stats_list_to_dict(items):
 
 def parse_career_batting(raw_dict):
     """Transform raw batting stats dict into our normalized format."""
-    if not raw_dict:
-        return {}
-    hs_raw = str(raw_dict.get("Highest Runs", "0"))
-    is_not_out = hs_raw.endswith("*")
-    hs_val = hs_raw.rstrip("*")
-    try:
-        hs_num = int(hs_val)
-    except ValueError:
-        hs_num = 0
-    return {
-        "matches": safe_int(raw_dict.get("Matches")),
-        "innings": safe_int(raw_dict.get("Innings")),
-        "not_outs": safe_int(raw_dict.get("Not out")),
-        "runs": safe_int(raw_dict.get("Runs")),
-        "highest_score": hs_num,
-        "highest_score_not_out": "*" if is_not_out else "",
-        "average": safe_float(raw_dict.get("Avg")),
-        "strike_rate": safe_float(raw_dict.get("SR")),
-        "thirties": safe_int(raw_dict.get("30s")),
-        "fifties": safe_int(raw_dict.get("50s")),
-        "hundreds": safe_int(raw_dict.get("100s")),
-        "fours": safe_int(raw_dict.get("4s")),
-        "sixes": safe_int(raw_dict.get("6s")),
-        "ducks": safe_int(raw_dict.get("Ducks")),
-    }
+    return CareerBatting.from_raw(raw_dict) if raw_dict else {}
 
 
 def parse_career_bowling(raw_dict):
     """Transform raw bowling stats dict into our normalized format."""
-    if not raw_dict:
-        return {}
-    return {
-        "matches": safe_int(raw_dict.get("Matches")),
-        "innings": safe_int(raw_dict.get("Innings")),
-        "overs": str(raw_dict.get("Overs", "0")),
-        "maidens": safe_int(raw_dict.get("Maidens")),
-        "wickets": safe_int(raw_dict.get("Wickets")),
-        "runs_conceded": safe_int(raw_dict.get("Runs")),
-        "best_figures": str(raw_dict.get("Best Bowling", "0/0")),
-        "three_wickets": safe_int(raw_dict.get("3 Wickets")),
-        "five_wickets": safe_int(raw_dict.get("5 Wickets")),
-        "economy": safe_float(raw_dict.get("Economy")),
-        "strike_rate": safe_float(raw_dict.get("SR")),
-        "average": safe_float(raw_dict.get("Avg")),
-        "wides": safe_int(raw_dict.get("Wides")),
-        "noballs": safe_int(raw_dict.get("NoBalls")),
-        "dot_balls": safe_int(raw_dict.get("Dot Balls")),
-        "fours_conceded": safe_int(raw_dict.get("4s")),
-        "sixes_conceded": safe_int(raw_dict.get("6s")),
-    }
+    return CareerBowling.from_raw(raw_dict) if raw_dict else {}
 
 
 def parse_career_fielding(raw_dict):
     """Transform raw fielding stats dict into our normalized format."""
-    if not raw_dict:
-        return {}
-    return {
-        "matches": safe_int(raw_dict.get("Matches")),
-        "catches": safe_int(raw_dict.get("Catches")),
-        "caught_behind": safe_int(raw_dict.get("Caught behind")),
-        "run_outs": safe_int(raw_dict.get("Run outs")),
-        "stumpings": safe_int(raw_dict.get("Stumpings")),
-        "assisted_run_outs": safe_int(raw_dict.get("Assisted Run Outs")),
-    }
+    return CareerFielding.from_raw(raw_dict) if raw_dict else {}
 
 
-def safe_float(value, default=0.0):
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return default
+def empty_player_stats(player_id, name, slug, profile_photo):
+    return {
+        "player_id": player_id, "name": name, "slug": slug,
+        "profile_photo": profile_photo,
+        "batting": {}, "bowling": {}, "fielding": {},
+    }
 
 
 def build_player_stats_from_api(player_id, name, slug, profile_photo):
     """Fetch and transform career stats for a single player."""
-    raw = fetch_player_career_stats(player_id)
+    raw, digest = fetch_player_career_stats(player_id)
     if not raw:
+        return empty_player_stats(player_id, name, slug, profile_photo)
+
+    def parse_career():
         return {
-            "player_id": player_id, "name": name, "slug": slug,
-            "profile_photo": profile_photo,
-            "batting": {}, "bowling": {}, "fielding": {},
+            "batting": parse_career_batting(stats_list_to_dict(raw.get("batting", []))),
+            "bowling": parse_career_bowling(stats_list_to_dict(raw.get("bowling", []))),
+            "fielding": parse_career_fielding(stats_list_to_dict(raw.get("fielding", []))),
         }
 
-    bat_dict = stats_list_to_dict(raw.get("batting", []))
-    bowl_dict = stats_list_to_dict(raw.get("bowling", []))
-    field_dict = stats_list_to_dict(raw.get("fielding", []))
-
+    career = DERIVED_CACHE.get_or_build("career", digest, parse_career)
     return {
         "player_id": player_id,
         "name": name,
         "slug": slug,
         "profile_photo": profile_photo,
-        "batting": parse_career_batting(bat_dict),
-        "bowling": parse_career_bowling(bowl_dict),
-        "fielding": parse_career_fielding(field_dict),
+        "batting": career["batting"],
+        "bowling": career["bowling"],
+        "fielding": career["fielding"],
     }
 
 
-def fetch_match_scorecard(match_id):
+def match_status(match):
+    status = (match.get("status") or "").strip().lower()
+    if not status and match.get("match_result"):
+        status = "past"
+    return status
+
+
+def canonical_json(data):
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def payload_digest(data):
+    """sha256 of a decoded payload, the same whether it came from the network or the cache."""
+    return hashlib.sha256(canonical_json(data)).hexdigest()
+
+
+class ScorecardCache:
+    """Content-addressed store of raw scorecard payloads, indexed by match id and status.
+
+    Also holds the ball-by-ball payloads, under their own root: those are
+    downloaded straight to a file (download_path), moved in as they came
+    (put_file) and read back as a file (path) to be parsed as a stream.
+    """
+
+    def __init__(self, root, refresh=False):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.json")
+        self.refresh = refresh
+        self.index = load_json_file(self.index_path, {})
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _entry(self, match_id, status):
+        with self.lock:
+            entry = self.index.get(str(match_id))
+        if not self.refresh and status in COMPLETED_MATCH_STATUSES and entry and entry["status"] == status:
+            return entry
+        return None
+
+    def _count(self, hit):
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, match_id, status):
+        """Return (payload, sha256) for a cached completed match, or (None, None)."""
+        entry = self._entry(match_id, status)
+        data = load_json_file(os.path.join(self.objects_dir, f"{entry['sha256']}.json"), None) if entry else None
+        self._count(data is not None)
+        return (data, entry["sha256"]) if data is not None else (None, None)
+
+    def path(self, match_id, status):
+        """Return (object file path, sha256) for a cached completed match, or (None, None)."""
+        entry = self._entry(match_id, status)
+        object_path = os.path.join(self.objects_dir, f"{entry['sha256']}.json") if entry else None
+        found = object_path is not None and os.path.exists(object_path)
+        self._count(found)
+        return (object_path, entry["sha256"]) if found else (None, None)
+
+    def put(self, match_id, status, data):
+        """Store a payload under its payload_digest(); returns the digest."""
+        blob = canonical_json(data)
+        digest = hashlib.sha256(blob).hexdigest()
+        object_path = os.path.join(self.objects_dir, f"{digest}.json")
+        with self.lock:
+            os.makedirs(self.objects_dir, exist_ok=True)
+            if not os.path.exists(object_path):
+                with open(f"{object_path}.tmp", "wb") as f:
+                    f.write(blob)
+                os.replace(f"{object_path}.tmp", object_path)
+            self.index[str(match_id)] = {"status": status, "sha256": digest}
+        return digest
+
+    def download_path(self, match_id):
+        os.makedirs(self.objects_dir, exist_ok=True)
+        return os.path.join(self.objects_dir, f"{match_id}.download")
+
+    def put_file(self, match_id, status, path, digest):
+        """Move a downloaded body, whose sha256 is digest, into the cache; returns the object file path."""
+        object_path = os.path.join(self.objects_dir, f"{digest}.json")
+        with self.lock:
+            os.replace(path, object_path)
+            self.index[str(match_id)] = {"status": status, "sha256": digest}
+        return object_path
+
+    def save(self):
+        os.makedirs(self.root, exist_ok=True)
+        write_json_file(self.index_path, self.index)
+        # Drop objects no longer referenced, e.g. superseded in-progress snapshots.
+        live = {entry["sha256"] for entry in self.index.values()}
+        for filename in os.listdir(self.objects_dir) if os.path.isdir(self.objects_dir) else []:
+            if filename.endswith(".download") or filename.endswith(".json") and filename[:-5] not in live:
+                os.remove(os.path.join(self.objects_dir, filename))
+
+
+def scorecard_rows(data):
+    """Every batting and bowling row of a scorecard payload, plus {side name: side team id}."""
+    sides = {}
+    for key in ("team_a", "team_b"):
+        side = data.get(key, {})
+        sides[side.get("name", "")] = safe_int(side.get("team_id") or side.get("id"))
+
+    # Collect all batting rows from both team scorecards.
+    # Each team's scorecard innings contains:
+    #   batting → batters from THAT team
+    #   bowling → bowlers from the OPPOSING team
+    all_batting = []
+    all_bowling = []
+    pairs = [("team_a", "team_b"), ("team_b", "team_a")]
+    for team_key, opposing_key in pairs:
+        team = data.get(team_key, {})
+        opposing = data.get(opposing_key, {})
+        team_name = team.get("name", "")
+        opposing_name = opposing.get("name", "")
+        for inning in team.get("scorecard", []):
+            for b in inning.get("batting", []):
+                innings = BattingInnings.from_raw(b, team=team_name)
+                if innings.balls > 0:
+                    all_batting.append(innings)
+            for b in inning.get("bowling", []):
+                spell = BowlingSpell.from_raw(b, team=opposing_name)
+                if spell.overs > 0:
+                    all_bowling.append(spell)
+    return {"sides": sides, "batting": all_batting, "bowling": all_bowling}
+
+
+def build_scorecard(rows, team_ids, aliases=()):
+    """Match summary from scorecard_rows(); the falcon_* rows are those of the team with team_ids.
+
+    A side is recognized by its id, or by name against aliases when the
+    payload carries no id for it.
+    """
+    own_names = {
+        name for name, side_id in rows["sides"].items()
+        if side_id in team_ids or (not side_id and name.lower() in aliases)
+    }
+    all_batting = rows["batting"]
+    all_bowling = rows["bowling"]
+
+    # Derive overall MOM
+    mom = None
+    star = impact.pick_star(all_batting, all_bowling)
+    if star:
+        kind, row = star
+        stat = impact.batting_stat(row) if kind == "batting" else impact.bowling_stat(row)
+        mom = {"name": row.name, "team": row.team, "stat": stat}
+
+    # Falcon players only — stored in full so tournament aggregates can be built from them
+    falcon_batters = [b for b in all_batting if b.team in own_names]
+    falcon_bowlers = [b for b in all_bowling if b.team in own_names]
+
+    # Falcon of the Match
+    fotm = None
+    star = impact.pick_star(falcon_batters, falcon_bowlers)
+    if star:
+        kind, row = star
+        stat = impact.batting_stat(row) if kind == "batting" else impact.bowling_stat(row)
+        fotm = {"name": row.name, "stat": stat, "type": kind}
+
+    return {
+        "top_batters": impact.top_batters(all_batting),
+        "top_bowlers": impact.top_bowlers(all_bowling),
+        "player_of_match": mom,
+        "falcon_batters": falcon_batters,
+        "falcon_bowlers": falcon_bowlers,
+        "falcon_of_match": fotm,
+    }
+
+
+def row_records(rows):
+    """scorecard_rows() output with every row a record; rows read back from a cache or the journal are dicts."""
+    return dict(
+        rows,
+        batting=[BattingInnings.coerce(b) for b in rows["batting"]],
+        bowling=[BowlingSpell.coerce(b) for b in rows["bowling"]],
+    )
+
+
+def parse_scorecard(data, team_ids, aliases=()):
+    return build_scorecard(scorecard_rows(data), team_ids, aliases)
+
+
+def fetch_match_scorecard(match_id, status="", cache=None):
+    """Fetch a scorecard and return its scorecard_rows() with the payload "sha256", or None."""
     try:
-        payload = fetch_json(f"scorecard/get-scorecard/{match_id}")
-        data = payload.get("data", {})
+        data, digest = cache.get(match_id, status) if cache else (None, None)
+        if data is None:
+            data = fetch_json(f"scorecard/get-scorecard/{match_id}").get("data", {})
+            # Keyed on the decoded payload, not the response body, so a cache hit gives the same digest.
+            if data:
+                digest = cache.put(match_id, status, data) if cache else payload_digest(data)
         if not data:
             return None
-
-        # Collect all batting rows from both team scorecards.
-        # Each team's scorecard innings contains:
-        #   batting → batters from THAT team
-        #   bowling → bowlers from the OPPOSING team
-        all_batting = []
-        all_bowling = []
-        pairs = [("team_a", "team_b"), ("team_b", "team_a")]
-        for team_key, opposing_key in pairs:
-            team = data.get(team_key, {})
-            opposing = data.get(opposing_key, {})
-            team_name = team.get("name", "")
-            opposing_name = opposing.get("name", "")
-            for inning in team.get("scorecard", []):
-                for b in inning.get("batting", []):
-                    runs = safe_int(b.get("runs"))
-                    balls = safe_int(b.get("balls"))
-                    if balls > 0:
-                        all_batting.append({
-                            "name": b.get("name", ""),
-                            "team": team_name,
-                            "runs": runs,
-                            "balls": balls,
-                            "sr": safe_float(b.get("SR")),
-                            "fours": safe_int(b.get("4s")),
-                            "sixes": safe_int(b.get("6s")),
-                            "not_out": b.get("how_to_out", "") in ("not out", ""),
-                        })
-                for b in inning.get("bowling", []):
-                    overs = safe_float(b.get("overs"))
-                    if overs > 0:
-                        all_bowling.append({
-                            "name": b.get("name", ""),
-                            "team": opposing_name,
-                            "wickets": safe_int(b.get("wickets")),
-                            "overs": overs,
-                            "runs": safe_int(b.get("runs")),
-                            "economy": safe_float(b.get("economy_rate")),
-                            "maidens": safe_int(b.get("maidens")),
-                        })
-
-        FALCON_NAMES = {"falcons", "hsc falcons", "helenelund cricket club"}
-
-        def is_falcon(team_name):
-            return team_name.lower() in FALCON_NAMES
-
-        def batter_impact(b):
-            return b["runs"] + b["sixes"] * 3 + b["fours"] + (10 if b["not_out"] else 0)
-
-        def bowler_impact(b):
-            return b["wickets"] * 20 + (b["maidens"] * 5) + max(0, (8 - b["economy"]) * 2)
-
-        top_batters = sorted(all_batting, key=lambda x: (-x["runs"], -x["sr"]))[:3]
-        top_bowlers = sorted(all_bowling, key=lambda x: (-x["wickets"], x["economy"] if x["economy"] > 0 else 99))[:3]
-
-        # Derive overall MOM
-        best_batter = max(all_batting, key=batter_impact, default=None)
-        best_bowler = max(all_bowling, key=bowler_impact, default=None)
-        mom = None
-        if best_batter and best_bowler:
-            bi, boi = batter_impact(best_batter), bowler_impact(best_bowler)
-            mom = {"name": best_batter["name"], "team": best_batter["team"], "stat": f"{best_batter['runs']} runs"} if bi >= boi else {"name": best_bowler["name"], "team": best_bowler["team"], "stat": f"{best_bowler['wickets']}/{best_bowler['runs']}"}
-        elif best_batter:
-            mom = {"name": best_batter["name"], "team": best_batter["team"], "stat": f"{best_batter['runs']} runs"}
-        elif best_bowler:
-            mom = {"name": best_bowler["name"], "team": best_bowler["team"], "stat": f"{best_bowler['wickets']}/{best_bowler['runs']}"}
-
-        # Falcon players only — stored in full so the frontend can aggregate across a tournament
-        falcon_batters = [b for b in all_batting if is_falcon(b["team"])]
-        falcon_bowlers = [b for b in all_bowling if is_falcon(b["team"])]
-
-        # Falcon of the Match
-        best_fb = max(falcon_batters, key=batter_impact, default=None)
-        best_fbow = max(falcon_bowlers, key=bowler_impact, default=None)
-        fotm = None
-        if best_fb and best_fbow:
-            bi, boi = batter_impact(best_fb), bowler_impact(best_fbow)
-            fotm = {"name": best_fb["name"], "stat": f"{best_fb['runs']} runs", "type": "batting"} if bi >= boi else {"name": best_fbow["name"], "stat": f"{best_fbow['wickets']}/{best_fbow['runs']}", "type": "bowling"}
-        elif best_fb:
-            fotm = {"name": best_fb["name"], "stat": f"{best_fb['runs']} runs", "type": "batting"}
-        elif best_fbow:
-            fotm = {"name": best_fbow["name"], "stat": f"{best_fbow['wickets']}/{best_fbow['runs']}", "type": "bowling"}
-
-        return {
-            "top_batters": top_batters,
-            "top_bowlers": top_bowlers,
-            "player_of_match": mom,
-            "falcon_batters": falcon_batters,
-            "falcon_bowlers": falcon_bowlers,
-            "falcon_of_match": fotm,
-        }
+        return row_records(
+            dict(DERIVED_CACHE.get_or_build("scorecard_rows", digest, lambda: scorecard_rows(data)), sha256=digest)
+        )
     except Exception as e:
+        if classify_error(e) != "no_data":
+            record_skipped(f"scorecard:{match_id}", e)
         print(f"  Warning: scorecard fetch failed for match {match_id}: {e}")
         return None
 
 
-def fetch_matches_safe(team_id, max_pages):
+def fetch_matches_safe(team_id, max_pages, since=None):
+    """Match list of team_id, newest first; with since, only the pages down to the first older match."""
+    def reached_since(items):
+        return any(played_on(m) and played_on(m) < since for m in items)
+
     try:
-        return fetch_paginated(f"team/get-team-match/{team_id}", max_pages)
+        return fetch_paginated(f"team/get-team-match/{team_id}", max_pages, reached_since if since else None)
     except RuntimeError as e:
         if "hasn't played any matches" in str(e):
             print(f"  No matches found for team {team_id}")
@@ -441,6 +1408,7 @@ def fetch_matches_safe(team_id, max_pages):
 
 
 def fetch_leaderboard_safe(team_id, category, max_pages=10):
+    started = time.perf_counter()
     all_items = []
     path = f"leaderboard/get-team-{category}-leaderboard/{team_id}"
     pages = 0
@@ -460,108 +1428,735 @@ def fetch_leaderboard_safe(team_id, category, max_pages=10):
         next_path = payload.get("page", {}).get("next")
         path = next_path if next_path else None
         pages += 1
+    METRICS.record_pagination(f"leaderboard/get-team-{category}-leaderboard", pages, time.perf_counter() - started)
     return all_items
 
 
-def run():
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+def load_teams():
+    """Teams to ingest: the CRICHEROES_TEAMS_CONFIG list, or the single team set by env vars.
 
-    # Players from current team
-    print(f"Fetching players from team {TEAM_ID}...")
-    players_payload = fetch_json(f"team/get-team-players/{TEAM_ID}")
-    players = build_players(players_payload.get("data", []))
-    print(f"  Found {len(players)} players")
-
-    # Matches from legacy team (filtered to LEGACY_YEAR only)
-    print(f"Fetching legacy matches from team {LEGACY_TEAM_ID} (year {LEGACY_YEAR})...")
-    legacy_matches_raw = fetch_matches_safe(LEGACY_TEAM_ID, MAX_MATCH_PAGES)
-    legacy_matches_raw = [m for m in legacy_matches_raw if parse_match_year(m) == LEGACY_YEAR]
-    print(f"  Found {len(legacy_matches_raw)} matches from {LEGACY_YEAR}")
-
-    # Matches from current team
-    print(f"Fetching matches from team {TEAM_ID}...")
-    current_matches_raw = fetch_matches_safe(TEAM_ID, MAX_MATCH_PAGES)
-    print(f"  Found {len(current_matches_raw)} matches")
-
-    # Deduplicate by match_id, preferring current team's data
-    seen_ids = set()
-    combined_raw = []
-    for m in current_matches_raw + legacy_matches_raw:
-        mid = m.get("match_id")
-        if mid and mid not in seen_ids:
-            seen_ids.add(mid)
-            combined_raw.append(m)
-
-    matches = [build_match(m) for m in combined_raw]
-    print(f"  Total combined matches: {len(matches)}")
-
-    team_stats = build_team_stats(combined_raw, {TEAM_ID, LEGACY_TEAM_ID})
-
-    # Leaderboard (kept for quick summary on homepage)
-    print("Fetching leaderboards...")
-    leaderboard = {}
-    for category in ("batting", "bowling", "fielding"):
-        legacy_items = fetch_leaderboard_safe(LEGACY_TEAM_ID, category)
-        current_items = fetch_leaderboard_safe(TEAM_ID, category)
-        seen_pids = set()
-        merged = []
-        for item in current_items:
-            pid = item.get("player_id")
-            if pid:
-                seen_pids.add(pid)
-            merged.append(item)
-        for item in legacy_items:
-            if item.get("player_id") not in seen_pids:
-                merged.append(item)
-        leaderboard[category] = build_leaderboard(category, merged)
-
-    # Fetch career stats for each roster player via the player stats API
-    print(f"Fetching career stats for {len(players)} players...")
-    player_stats = []
-    for i, p in enumerate(players):
-        pid = p.get("player_id")
-        name = p.get("name", "")
-        slug = p.get("slug", make_slug(name))
-        photo = p.get("profile_pic_url", "")
-        if pid:
-            entry = build_player_stats_from_api(pid, name, slug, photo)
-            player_stats.append(entry)
-            match_count = entry.get("batting", {}).get("matches", 0) or entry.get("bowling", {}).get("matches", 0)
-            print(f"  [{i + 1}/{len(players)}] {name}: {match_count} matches")
-        else:
-            player_stats.append({
-                "player_id": pid, "name": name, "slug": slug,
-                "profile_photo": photo,
-                "batting": {}, "bowling": {}, "fielding": {},
-            })
-        time.sleep(0.3)
-    player_stats.sort(key=lambda p: p.get("name", ""))
-
-    # Fetch per-match scorecards (top batters, bowlers, derived MOM)
-    print(f"Fetching scorecards for {len(combined_raw)} matches...")
+    Each team has a current team id, optional legacy team ids (each limited
+    to one season when "year" is given), name aliases and an output directory.
+    """
+    if TEAMS_CONFIG:
+        with open(TEAMS_CONFIG, encoding="utf-8") as f:
+            config = json.load(f)
+        entries = config["teams"] if isinstance(config, dict) else config
+    else:
+        entries = [{
+            "key": "falcons",
+            "team_id": TEAM_ID,
+            "legacy_teams": [{"team_id": LEGACY_TEAM_ID, "year": LEGACY_YEAR}],
+            "aliases": sorted(FALCON_NAMES),
+            "output_dir": OUTPUT_DIR,
+        }]
+    teams = []
+    for entry in entries:
+        team_id = int(entry["team_id"])
+        name = entry.get("name") or ""
+        key = entry.get("key") or make_file_slug(name, str(team_id))
+        legacy = [{"team_id": int(item["team_id"]), "year": item.get("year")} for item in entry.get("legacy_teams", [])]
+        aliases = {alias.strip().lower() for alias in entry.get("aliases", [])}
+        if name:
+            aliases.add(name.strip().lower())
+        ids = {team_id} | {item["team_id"] for item in legacy}
+        teams.append({
+            "key": key,
+            "team_id": team_id,
+            "legacy": legacy,
+            "ids": ids,
+            "aliases": aliases,
+            "output_dir": entry.get("output_dir") or os.path.join(OUTPUT_DIR, "teams", key),
+        })
+    keys = [team["key"] for team in teams]
+    duplicates = sorted({key for key in keys if keys.count(key) > 1})
+    if duplicates:
+        raise ValueError(f"duplicate team keys in {TEAMS_CONFIG}: {', '.join(duplicates)}")
+    return teams
+
+
+def scorecard_records(scorecard):
+    """A published scorecard with its row lists turned back into records."""
+    return dict(
+        scorecard,
+        top_batters=[BattingInnings.coerce(b) for b in scorecard.get("top_batters") or []],
+        top_bowlers=[BowlingSpell.coerce(b) for b in scorecard.get("top_bowlers") or []],
+        falcon_batters=[BattingInnings.coerce(b) for b in scorecard.get("falcon_batters") or []],
+        falcon_bowlers=[BowlingSpell.coerce(b) for b in scorecard.get("falcon_bowlers") or []],
+    )
+
+
+def team_match_scorecards(team, matches_raw):
+    """{match id: scorecard} for a team's matches, built from the rows in the store."""
+    rows_by_match = STORE.team_scorecard_rows(team["key"])
     match_scorecards = {}
-    for i, m in enumerate(combined_raw):
-        mid = m.get("match_id")
-        if not mid:
+    previous_scorecards = None
+    for m in matches_raw:
+        mid = m["match_id"]
+        if mid in rows_by_match:
+            match_scorecards[str(mid)] = build_scorecard(rows_by_match[mid], team["ids"], team["aliases"])
             continue
-        sc = fetch_match_scorecard(mid)
-        if sc:
-            match_scorecards[str(mid)] = sc
-            print(f"  [{i + 1}/{len(combined_raw)}] {m.get('tournament_name', '')} — {len(sc['top_batters'])} batters, {len(sc['top_bowlers'])} bowlers")
-        time.sleep(0.3)
-
-    save_json("players.json", players)
-    save_json("matches.json", matches)
-    save_json("team_stats.json", team_stats)
-    save_json("leaderboard.json", leaderboard)
-    save_json("player_stats.json", player_stats)
-    save_json("match_scorecards.json", match_scorecards)
+        # Never stored (e.g. the API failed on a fresh store): keep the last published version.
+        if previous_scorecards is None:
+            previous_scorecards = load_json_file(os.path.join(team["output_dir"], "match_scorecards.json"), {})
+        if str(mid) in previous_scorecards:
+            match_scorecards[str(mid)] = scorecard_records(previous_scorecards[str(mid)])
+    return match_scorecards
+
+
+def export_outputs(teams):
+    """Derive every output file of every team from the store; needs no network access."""
+    for team in teams:
+        key = team["key"]
+        output_dir = team["output_dir"]
+        combined_raw = STORE.team_matches(key)
+        players = STORE.team_players(key)
+        if not combined_raw and not players:
+            raise RuntimeError(f"Nothing stored for team {key} in {STORE_PATH}; run a fetch first")
+
+        with METRICS.stage("export"):
+            match_scorecards = team_match_scorecards(team, combined_raw)
+
+        # Per-player totals and season/tournament/opponent splits from local scorecards
+        with METRICS.stage("aggregates"):
+            aggregator = CareerAggregator(os.path.join(CACHE_DIR, "aggregates", f"{key}.json"))
+            applied = aggregate_scorecards(aggregator, combined_raw, match_scorecards, team["ids"], team["aliases"])
+            aggregator.save()
+            print(f"  Aggregated {applied} new matches for {key}{' (rebuilt)' if aggregator.rebuilt else ''}")
+
+        with METRICS.stage("export"):
+            careers = STORE.careers([p["player_id"] for p in players]) if CAREER_STATS_FROM_API else {}
+            previous_stats = None
+            player_stats = []
+            for p in players:
+                pid = p.get("player_id")
+                name = p.get("name", "")
+                entry = empty_player_stats(pid, name, p.get("slug", make_slug(name)), p.get("profile_pic_url", ""))
+                if pid and not CAREER_STATS_FROM_API:
+                    entry.update(aggregator.career(pid))
+                elif pid in careers:
+                    entry.update(careers[pid])
+                elif pid:
+                    if previous_stats is None:
+                        previous_stats = {
+                            e.get("player_id"): e for e in load_json_file(os.path.join(output_dir, "player_stats.json"), [])
+                        }
+                    entry = previous_stats.get(pid, entry)
+                player_stats.append(entry)
+            player_stats.sort(key=lambda p: p.get("name", ""))
+            leaderboard = {
+                category: build_leaderboard(category, STORE.leaderboard(key, category))
+                for category in ("batting", "bowling", "fielding")
+            }
+
+        with METRICS.stage("save"):
+            os.makedirs(output_dir, exist_ok=True)
+            save_json("players.json", players, output_dir=output_dir)
+            save_json("matches.json", [build_match(m) for m in combined_raw], output_dir=output_dir)
+            save_json("team_stats.json", build_team_stats(combined_raw, team["ids"]), output_dir=output_dir)
+            save_json("leaderboard.json", leaderboard, output_dir=output_dir)
+            save_json("player_stats.json", player_stats, output_dir=output_dir)
+            save_json("player_splits.json", aggregator.export(), output_dir=output_dir)
+            save_json(
+                "tournaments.json", build_tournaments(combined_raw, match_scorecards, team["ids"]), output_dir=output_dir
+            )
+            if "monolithic" in SCORECARD_OUTPUT:
+                save_json("match_scorecards.json", match_scorecards, output_dir=output_dir)
+            if "compact" in SCORECARD_OUTPUT:
+                save_json(
+                    "match_scorecards.compact.json", compact.encode(match_scorecards), output_dir=output_dir, minify=True
+                )
+            shard_paths = None
+            if "sharded" in SCORECARD_OUTPUT:
+                shards, manifest = build_scorecard_shards(combined_raw, match_scorecards, SCORECARD_SHARD_BY)
+                save_scorecard_shards(shards, manifest, output_dir=output_dir)
+                shard_paths = {row["match_id"]: row["shard"] for row in manifest}
+            save_indexes(
+                build_indexes(combined_raw, match_scorecards, players, team["ids"], team["aliases"], shard_paths),
+                output_dir=output_dir,
+            )
+            save_ball_by_ball(team, players, output_dir)
+    with METRICS.stage("save"):
+        WRITER.finish()
+    print(f"  Output files: {WRITER.written} written, {WRITER.unchanged} unchanged")
+    METRICS.set("outputs", {"written": WRITER.written, "unchanged": WRITER.unchanged})
+
+
+def save_ball_by_ball(team, players, output_dir=OUTPUT_DIR):
+    """Write a team's ball-by-ball phase splits and partnerships, if any of its matches were ingested.
+
+    The per-player table keeps the team's own players: those the feed puts
+    on the team's side, plus anyone on the roster.
+    """
+    analytics = STORE.team_ball_by_ball(team["key"], ball_by_ball.ANALYTICS_VERSION)
+    if not analytics:
+        return
+    roster = {str(p["player_id"]) for p in players if p.get("player_id")}
+    save_json(
+        "ball_by_ball_matches.json",
+        {str(mid): entry["innings"] for mid, entry in analytics.items()},
+        output_dir=output_dir,
+    )
+    save_json(
+        "ball_by_ball_players.json",
+        ball_by_ball.merge_players(
+            analytics.items(), include=lambda pid, entry: entry["team_id"] in team["ids"] or pid in roster
+        ),
+        output_dir=output_dir,
+    )
+
+
+def export_live_outputs(team, changed_ids):
+    """Rewrite the files of a team that a live poll can change, skipping those whose content is unchanged.
+
+    Aggregates, player splits and career stats are left to the next full run.
+    """
+    output_dir = team["output_dir"]
+    combined_raw = STORE.team_matches(team["key"])
+    match_scorecards = team_match_scorecards(team, combined_raw)
+    written = [
+        save_json("matches.json", [build_match(m) for m in combined_raw], output_dir=output_dir),
+        save_json("team_stats.json", build_team_stats(combined_raw, team["ids"]), output_dir=output_dir),
+        save_json(
+            "tournaments.json", build_tournaments(combined_raw, match_scorecards, team["ids"]), output_dir=output_dir
+        ),
+    ]
+    if "monolithic" in SCORECARD_OUTPUT:
+        written.append(save_json("match_scorecards.json", match_scorecards, output_dir=output_dir))
+    if "compact" in SCORECARD_OUTPUT:
+        written.append(
+            save_json(
+                "match_scorecards.compact.json", compact.encode(match_scorecards), output_dir=output_dir, minify=True
+            )
+        )
+    shard_paths = None
+    if "sharded" in SCORECARD_OUTPUT:
+        shards, manifest = build_scorecard_shards(combined_raw, match_scorecards, SCORECARD_SHARD_BY)
+        changed_shards = {row["shard"] for row in manifest if int(row["match_id"]) in changed_ids}
+        for shard_path in sorted(changed_shards):
+            written.append(save_json(shard_path, shards[shard_path], output_dir=output_dir))
+        written.append(save_json(f"{SCORECARD_SHARD_DIR}/manifest.json", manifest, output_dir=output_dir))
+        shard_paths = {row["match_id"]: row["shard"] for row in manifest}
+    indexes = build_indexes(
+        combined_raw, match_scorecards, STORE.team_players(team["key"]), team["ids"], team["aliases"], shard_paths
+    )
+    written.append(save_indexes(indexes, output_dir=output_dir))
+    return sum(written)
+
+
+def watch_poll(teams, tracked, scorecard_cache):
+    """One --watch cycle: refresh the first page of each match list and the scorecards of live matches.
+
+    tracked holds the matches that were live on the previous poll; each gets
+    one more fetch after it finishes so the final scorecard is stored.
+    Returns (ids of live matches, number of changed scorecards, files written).
+    """
+    first_pages = {}
+    changed_teams = set()
+    matches_by_id = {}
+    for team in teams:
+        if team["team_id"] not in first_pages:
+            first_pages[team["team_id"]] = fetch_matches_safe(team["team_id"], 1)
+        stored = STORE.team_matches(team["key"])
+        merged = merge_matches(stored, first_pages[team["team_id"]])
+        if merged != stored:
+            STORE.save_matches(team["key"], merged, parse_match_year, match_status)
+            changed_teams.add(team["key"])
+        for m in merged:
+            matches_by_id.setdefault(m["match_id"], m)
+
+    live = {mid for mid, m in matches_by_id.items() if match_status(m) in LIVE_MATCH_STATUSES}
+    polled = [matches_by_id[mid] for mid in sorted(live | (tracked & matches_by_id.keys()))]
+    digests = STORE.scorecard_digests(m["match_id"] for m in polled)
+    fetched = []
+    results = fetch_all(lambda m: fetch_match_scorecard(m["match_id"], match_status(m), scorecard_cache), polled)
+    for m, rows in zip(polled, results):
+        if rows and rows["sha256"] != digests.get(m["match_id"]):
+            fetched.append((m["match_id"], rows["sha256"], rows))
+    STORE.save_scorecards(fetched)
+    scorecard_cache.save()
+    # A poll touches only live matches; superseded snapshots are pruned by the next full run.
+    DERIVED_CACHE.save(prune=False)
+
+    changed_ids = {match_id for match_id, _, _ in fetched}
+    written = 0
+    for team in teams:
+        team_ids = {m["match_id"] for m in STORE.team_matches(team["key"])} if changed_ids else set()
+        if team["key"] in changed_teams or changed_ids & team_ids:
+            written += export_live_outputs(team, changed_ids)
+    WRITER.finish()
+    return live, len(changed_ids), written
+
+
+def next_watch_interval(interval, live, changed):
+    """Poll fast while scorecards move, slow down during lulls and back off further with nothing live."""
+    if changed:
+        return WATCH_LIVE_SECONDS
+    if live:
+        return min(interval * 1.5, WATCH_LIVE_SECONDS * 4)
+    return min(max(interval, WATCH_LIVE_SECONDS) * 2, WATCH_IDLE_SECONDS)
+
+
+def watch(teams, max_polls=0):
+    """Poll live matches until interrupted (or for max_polls cycles), updating only the outputs that change."""
+    if not any(STORE.team_matches(team["key"]) for team in teams):
+        raise RuntimeError(f"No matches stored in {STORE_PATH}; run a full fetch first")
+    scorecard_cache = ScorecardCache(os.path.join(CACHE_DIR, "scorecards"), refresh=REFRESH_SCORECARDS)
+    interval = WATCH_LIVE_SECONDS
+    # Matches stored as live may have finished while nothing was watching; fetch them once more.
+    tracked = {
+        m["match_id"] for team in teams for m in STORE.team_matches(team["key"]) if match_status(m) in LIVE_MATCH_STATUSES
+    }
+    polls = 0
+    try:
+        while True:
+            polls += 1
+            try:
+                with METRICS.stage("watch"):
+                    live, changed, written = watch_poll(teams, tracked, scorecard_cache)
+            except Exception as e:
+                print(f"  Warning: poll {polls} failed: {e}")
+                live, changed, written = tracked, 0, 0
+            interval = next_watch_interval(interval, bool(live), changed or bool(live - tracked))
+            tracked = live
+            print(
+                f"[{datetime.now():%H:%M:%S}] Poll {polls}: {len(live)} live matches, {changed} scorecards changed, "
+                f"{written} files written; next poll in {interval:.0f}s"
+            )
+            if max_polls and polls >= max_polls:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Stopped watching")
+    METRICS.set("watch", {"polls": polls})
+    print("Done!")
+
+
+# --only names of the datasets a run can refresh, and the fetch stage behind each.
+# A full run includes ball-by-ball only with CRICHEROES_BALL_BY_BALL=1.
+DATASETS = {
+    "players": "players",
+    "matches": "matches",
+    "leaderboard": "leaderboards",
+    "scorecards": "scorecards",
+    "player-stats": "player_stats",
+    "ball-by-ball": "ball_by_ball",
+}
+
+
+def dataset_list(value):
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in DATASETS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown dataset {', '.join(unknown)} (choose from {', '.join(DATASETS)})")
+    return names
+
+
+def parse_selection(args):
+    """The datasets and filters of a selective refresh, or None for a full run.
+
+    Without --only, --match-id selects scorecards, --player-id player stats
+    and --since match lists plus scorecards.
+    """
+    only = [name for names in args.only for name in names]
+    if not (only or args.since or args.match_id or args.player_id):
+        return None
+    if not only:
+        if args.since:
+            only += ["matches", "scorecards"]
+        if args.match_id:
+            only.append("scorecards")
+        if args.player_id:
+            only.append("player-stats")
+    return {
+        "stages": sorted({DATASETS[name] for name in only}),
+        "since": args.since,
+        "match_ids": args.match_id,
+        "player_ids": args.player_id,
+    }
+
+
+def unstored_datasets(team, selection):
+    """Datasets a selective run would export for team without refreshing them or having them stored.
+
+    Those outputs would be written empty over the published files, e.g. on a
+    fresh clone or after the CI cache is evicted. Scorecards and player stats
+    fall back to the published files, so they need no stored copy.
+    """
+    key = team["key"]
+    stages = selection["stages"]
+    missing = []
+    if "players" not in stages and not STORE.team_players(key):
+        missing.append("players")
+    # --since fetches only the newest pages of each match list.
+    if ("matches" not in stages or selection["since"]) and not STORE.team_matches(key):
+        missing.append("matches")
+    if "leaderboards" not in stages and not any(
+        STORE.leaderboard(key, category) for category in ("batting", "bowling", "fielding")
+    ):
+        missing.append("leaderboard")
+    return missing
+
+
+def run(selection=None):
+    """Fetch everything, or with a selection only some datasets, and export all outputs.
+
+    selection is the dict parse_selection() builds from the command line. A
+    selective run updates only the chosen datasets in the store (limited to
+    matches since a date, or to given match and player ids) and reads the
+    rest from it, so the exported files merge the refreshed data with what
+    earlier runs fetched. It refuses to start when the store lacks a dataset
+    it would read (see unstored_datasets).
+    """
+    teams = load_teams()
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    if selection:
+        for team in teams:
+            missing = unstored_datasets(team, selection)
+            if missing:
+                raise RuntimeError(
+                    f"No {', '.join(missing)} stored for team {team['key']} in {STORE_PATH}; "
+                    "run a full fetch before a selective refresh"
+                )
+        stages = set(selection["stages"])
+    else:
+        stages = {stage for stage in DATASETS.values() if BALL_BY_BALL or stage != "ball_by_ball"}
+    since = selection["since"] if selection else None
+    match_ids = set(selection["match_ids"]) if selection else set()
+    player_ids = set(selection["player_ids"]) if selection else set()
+    skipped_path = os.path.join(CACHE_DIR, "skipped.json")
+    if selection:
+        # Partial runs are short and always refetch what they select: no journal, no cached answers.
+        journal = CheckpointJournal(None, None)
+        if HTTP_CACHE:
+            HTTP_CACHE.revalidate = True
+        print(f"Selective refresh of {', '.join(sorted(stages))}" + (f" since {since}" if since else ""))
+        METRICS.set("selection", {
+            "stages": sorted(stages), "since": since.isoformat() if since else None,
+            "match_ids": sorted(match_ids), "player_ids": sorted(player_ids),
+        })
+    else:
+        journal = CheckpointJournal(
+            os.path.join(OUTPUT_DIR, ".checkpoint.jsonl"),
+            {"api_base": API_BASE, "teams": [[team["key"], team["team_id"], team["legacy"]] for team in teams]},
+        )
+        if journal.completed:
+            print(f"Resuming from checkpoint: {len(journal.completed)} units already fetched")
+        previously_skipped = load_json_file(skipped_path, [])
+        if previously_skipped:
+            print(f"Retrying {len(previously_skipped)} units skipped by the previous run")
+    METRICS.set("teams", [team["key"] for team in teams])
+    # Team ids to fetch match lists and leaderboards for, each once even when teams share a legacy id.
+    source_ids = list(dict.fromkeys(
+        team_id for team in teams for team_id in [team["team_id"]] + [legacy["team_id"] for legacy in team["legacy"]]
+    ))
+
+    # Players from each team's current roster
+    def fetch_rosters(results):
+        def roster(team):
+            players_raw = journal.run(
+                f"players:{team['team_id']}",
+                lambda: fetch_json(f"team/get-team-players/{team['team_id']}").get("data", []),
+            )
+            return build_players(players_raw)
+
+        print(f"Fetching players from {len(teams)} teams...")
+        team_players = {}
+        for team, players in zip(teams, fetch_all(roster, teams)):
+            team_players[team["key"]] = players
+            STORE.save_players(team["key"], players)
+            print(f"  Found {len(players)} players in team {team['team_id']}")
+        return team_players
+
+    # Match lists of every current and legacy team; legacy lists can be limited to one season
+    def fetch_match_lists(results):
+        print(f"Fetching matches from {len(source_ids)} teams...")
+        fetched = fetch_all(
+            lambda team_id: journal.run(
+                f"matches:{team_id}", lambda: fetch_matches_safe(team_id, MAX_MATCH_PAGES, since)
+            ),
+            source_ids,
+        )
+        match_lists = dict(zip(source_ids, fetched))
+        for team_id, matches in match_lists.items():
+            print(f"  Found {len(matches)} matches from team {team_id}")
+
+        team_matches = {}
+        for team in teams:
+            matches_raw = list(match_lists[team["team_id"]])
+            for legacy in team["legacy"]:
+                legacy_matches = [
+                    m for m in match_lists[legacy["team_id"]]
+                    if legacy["year"] is None or parse_match_year(m) == legacy["year"]
+                ]
+                if legacy["year"] is not None:
+                    print(f"  {len(legacy_matches)} matches of legacy team {legacy['team_id']} from {legacy['year']}")
+                matches_raw.extend(legacy_matches)
+
+            # Deduplicate by match_id, preferring current team's data
+            seen_ids = set()
+            combined_raw = []
+            for m in matches_raw:
+                mid = m.get("match_id")
+                if mid and mid not in seen_ids:
+                    seen_ids.add(mid)
+                    combined_raw.append(m)
+            if since:
+                combined_raw = merge_matches(STORE.team_matches(team["key"]), combined_raw)
+            team_matches[team["key"]] = combined_raw
+            STORE.save_matches(team["key"], combined_raw, parse_match_year, match_status)
+            print(f"  Total combined matches for {team['key']}: {len(combined_raw)}")
+        return team_matches
+
+    # Leaderboard (kept for quick summary on homepage), every team and category paginated concurrently
+    def fetch_leaderboards(results):
+        print("Fetching leaderboards...")
+        units = [(team_id, category) for team_id in source_ids for category in ("batting", "bowling", "fielding")]
+        fetched = fetch_all(
+            lambda unit: journal.run(
+                f"leaderboard:{unit[0]}:{unit[1]}", lambda: fetch_leaderboard_safe(unit[0], unit[1])
+            ),
+            units,
+        )
+        leaderboard_items = dict(zip(units, fetched))
+        for team in teams:
+            for category in ("batting", "bowling", "fielding"):
+                legacy_items = [
+                    item for legacy in team["legacy"] for item in leaderboard_items[legacy["team_id"], category]
+                ]
+                merged = merge_leaderboard(leaderboard_items[team["team_id"], category], legacy_items)
+                STORE.save_leaderboard(team["key"], category, merged)
+
+    # Every team's matches, each once, narrowed to the selected match ids and dates
+    def selected_matches(results):
+        unique_raw = []
+        seen_ids = set()
+        for team in teams:
+            matches = results["matches"][team["key"]] if "matches" in results else STORE.team_matches(team["key"])
+            for m in matches:
+                if m["match_id"] not in seen_ids:
+                    seen_ids.add(m["match_id"])
+                    unique_raw.append(m)
+        if match_ids:
+            for mid in sorted(match_ids - seen_ids):
+                print(f"  Warning: match {mid} is not in any team's match list; fetch the match lists first")
+            unique_raw = [m for m in unique_raw if m["match_id"] in match_ids]
+        if since:
+            unique_raw = [m for m in unique_raw if played_on(m) and played_on(m) >= since]
+        return unique_raw
+
+    # Fetch per-match scorecards (top batters, bowlers, derived MOM), each match once for all its teams
+    def fetch_scorecards(results):
+        unique_raw = selected_matches(results)
+        print(f"Fetching scorecards for {len(unique_raw)} matches...")
+        scorecard_cache = ScorecardCache(
+            os.path.join(CACHE_DIR, "scorecards"), refresh=REFRESH_SCORECARDS or bool(selection)
+        )
+
+        def match_scorecard(m):
+            mid = m["match_id"]
+            rows = journal.run(
+                f"scorecard:{mid}",
+                lambda: fetch_match_scorecard(mid, match_status(m), scorecard_cache),
+                keep=lambda rows: rows is not None,
+            )
+            return row_records(rows) if rows else rows
+
+        fetched = []
+        for i, (m, rows) in enumerate(zip(unique_raw, fetch_all(match_scorecard, unique_raw))):
+            # A scorecard that could not be fetched keeps the rows stored by an earlier run.
+            if rows:
+                fetched.append((m["match_id"], rows["sha256"], rows))
+                print(f"  [{i + 1}/{len(unique_raw)}] {m.get('tournament_name', '')} — {len(rows['batting'])} batting rows, {len(rows['bowling'])} bowling rows")
+        STORE.save_scorecards(fetched)
+        scorecard_cache.save()
+        print(f"  Scorecard cache: {scorecard_cache.hits} hits, {scorecard_cache.misses} misses")
+        return {"hits": scorecard_cache.hits, "misses": scorecard_cache.misses}
+
+    # Ball-by-ball feeds, parsed as a stream into phase splits and partnerships. Each match is
+    # stored as soon as it is analyzed, and matches already ingested in their final state are
+    # skipped, so an interrupted run picks up where it stopped.
+    def fetch_ball_by_ball(results):
+        refresh = REFRESH_SCORECARDS or bool(match_ids)
+        unique_raw = selected_matches(results)
+        ingested = STORE.ball_by_ball_entries(m["match_id"] for m in unique_raw)
+        pending = [
+            m for m in unique_raw
+            if refresh or match_status(m) not in COMPLETED_MATCH_STATUSES
+            or ingested.get(m["match_id"], (None,))[1:] != (match_status(m), ball_by_ball.ANALYTICS_VERSION)
+        ]
+        skipped = len(unique_raw) - len(pending)
+        print(f"Ingesting ball-by-ball data for {len(pending)} matches ({skipped} already ingested)...")
+        feed_cache = ScorecardCache(os.path.join(CACHE_DIR, "ball_by_ball"), refresh=refresh)
+
+        def ingest(m):
+            mid = m["match_id"]
+            status = match_status(m)
+            try:
+                path, digest = feed_cache.path(mid, status)
+                if path is None:
+                    download, digest = fetch_json_entry(
+                        BALL_BY_BALL_PATH.format(match_id=mid), into=feed_cache.download_path(mid)
+                    )
+                    path = feed_cache.put_file(mid, status, download, digest)
+                balls = ball_by_ball.iter_balls(ball_by_ball.read_chunks(path))
+                analytics = ball_by_ball.analyze(balls, safe_int(m.get("overs")) or None)
+            except Exception as e:
+                if classify_error(e) != "no_data":
+                    record_skipped(f"ball_by_ball:{mid}", e)
+                print(f"  Warning: ball-by-ball ingestion failed for match {mid}: {e}")
+                return None
+            STORE.save_ball_by_ball(mid, digest, status, ball_by_ball.ANALYTICS_VERSION, analytics)
+            return analytics
+
+        for i, (m, analytics) in enumerate(zip(pending, fetch_all(ingest, pending))):
+            if analytics is not None:
+                innings = analytics["innings"]
+                balls = sum(split["balls"] for entry in innings for split in entry["phases"].values())
+                name = m.get("tournament_name", "")
+                print(f"  [{i + 1}/{len(pending)}] {name} — {len(innings)} innings, {balls} balls")
+        feed_cache.save()
+        print(f"  Ball-by-ball cache: {feed_cache.hits} hits, {feed_cache.misses} misses")
+        return {"hits": feed_cache.hits, "misses": feed_cache.misses}
+
+    # Career stats from the player stats API, once per player across all rosters
+    def fetch_careers(results):
+        if not CAREER_STATS_FROM_API:
+            return
+        unique_players = list({
+            p["player_id"]: p
+            for team in teams
+            for p in (results["players"][team["key"]] if "players" in results else STORE.team_players(team["key"]))
+            if p.get("player_id") and (not player_ids or p["player_id"] in player_ids)
+        }.values())
+        for pid in sorted(player_ids - {p["player_id"] for p in unique_players}):
+            print(f"  Warning: player {pid} is not on any team's roster")
+        print(f"Fetching career stats for {len(unique_players)} players...")
+
+        def roster_player_stats(p):
+            pid = p["player_id"]
+            name = p.get("name", "")
+            # Failed fetches come back empty; leave them out of the journal so a resume retries them.
+            return journal.run(
+                f"player_stats:{pid}",
+                lambda: build_player_stats_from_api(pid, name, p.get("slug", make_slug(name)), p.get("profile_pic_url", "")),
+                keep=lambda entry: any(entry[key] for key in ("batting", "bowling", "fielding")),
+            )
+
+        career_stats = fetch_all(roster_player_stats, unique_players)
+        with SKIPPED_LOCK:
+            skipped = {entry["unit"] for entry in SKIPPED_UNITS}
+        for i, entry in enumerate(career_stats):
+            # Players whose fetch failed keep the career stats stored by an earlier run.
+            if f"player_stats:{entry['player_id']}" not in skipped:
+                STORE.save_career(entry["player_id"], entry)
+            match_count = entry.get("batting", {}).get("matches", 0) or entry.get("bowling", {}).get("matches", 0)
+            print(f"  [{i + 1}/{len(unique_players)}] {entry['name']}: {match_count} matches")
+
+    # Only scorecards and ball-by-ball (match lists) and career stats (rosters) wait for anything;
+    # a stage left out of a selective run reads its input from the store instead.
+    results, schedule = run_stages(
+        [
+            stage for stage in [
+                Stage("players", fetch_rosters),
+                Stage("matches", fetch_match_lists),
+                Stage("leaderboards", fetch_leaderboards),
+                Stage("scorecards", fetch_scorecards, after=["matches"] if "matches" in stages else []),
+                Stage("player_stats", fetch_careers, after=["players"] if "players" in stages else []),
+                Stage("ball_by_ball", fetch_ball_by_ball, after=["matches"] if "matches" in stages else []),
+            ]
+            if stage.name in stages
+        ],
+        METRICS,
+    )
+    # Saved once every stage is done, since scorecards and career stats both add to it.
+    DERIVED_CACHE.save(prune=not selection)
+    path = critical_path(schedule)
+    print(f"Fetch stages finished in {max(stage['end'] for stage in schedule.values()):.2f}s; critical path {' -> '.join(path)}")
+    for name, stage in sorted(schedule.items(), key=lambda item: item[1]["start"]):
+        print(f"  {name:<13} {stage['start']:7.2f}s -> {stage['end']:7.2f}s ({stage['seconds']:.2f}s)")
+    METRICS.set("schedule", {"stages": schedule, "critical_path": path})
+    caches = {name: results[name] for name in ("scorecards", "ball_by_ball") if name in results}
+    if HTTP_CACHE:
+        stats = HTTP_CACHE.stats
+        print(f"  HTTP cache: {stats['fresh']} fresh, {stats['revalidated']} revalidated, {stats['fetched']} fetched")
+        caches["http"] = dict(stats)
+    METRICS.set("caches", caches)
+
+    export_outputs(teams)
+    journal.finish()
+    if not selection:
+        # A partial run has not retried everything the last full run skipped, so it leaves the list alone.
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        write_json_file(skipped_path, SKIPPED_UNITS)
+    METRICS.set("skipped_units", SKIPPED_UNITS)
+    METRICS.set("open_circuits", BREAKER.open_families())
+    if SKIPPED_UNITS:
+        print(f"Skipped {len(SKIPPED_UNITS)} units after API failures; the next full run retries them")
     print("Done!")
 
 
-try:
-    run()
-except Exception as e:
-    print("❌ Failed to fetch CricHeroes data")
-    print(e)
-    sys.exit(1)
+def report_output_changes():
+    """Tell a GitHub Actions workflow whether any output file changed, as the step output "changed"."""
+    github_output = os.environ.get("GITHUB_OUTPUT")
+    if github_output:
+        with open(github_output, "a", encoding="utf-8") as f:
+            f.write(f"changed={'true' if WRITER.changed else 'false'}\n")
+
+
+def write_run_report(profiler=None):
+    if profiler:
+        profiler.disable()
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(METRICS_DIR, "profile.pstats"))
+    METRICS.write(os.path.join(METRICS_DIR, "run_metrics.json"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch CricHeroes data and write the JSON files in data/.")
+    parser.add_argument(
+        "--export-only", action="store_true", help="rebuild the output files from the local store without fetching"
+    )
+    parser.add_argument(
+        "--watch", action="store_true", help="poll live matches and rewrite only the outputs that change"
+    )
+    parser.add_argument("--max-polls", type=int, default=0, help="stop --watch after this many polls (0 = never)")
+    parser.add_argument(
+        "--only", type=dataset_list, action="append", default=[], metavar="DATASETS",
+        help=f"refresh only these datasets ({', '.join(DATASETS)}; comma-separated or repeated) "
+        "and merge them into the existing outputs",
+    )
+    parser.add_argument(
+        "--since", type=date.fromisoformat, metavar="YYYY-MM-DD",
+        help="only fetch match lists and scorecards of matches played on or after this date",
+    )
+    parser.add_argument("--match-id", type=int, action="append", default=[], help="refresh this match's scorecard")
+    parser.add_argument("--player-id", type=int, action="append", default=[], help="refresh this player's career stats")
+    args = parser.parse_args()
+    selection = parse_selection(args)
+    if selection and (args.export_only or args.watch):
+        parser.error("--only, --since, --match-id and --player-id cannot be combined with --export-only or --watch")
+    profiler = cProfile.Profile() if PROFILE else None
+    if profiler:
+        profiler.enable()
+    try:
+        if args.export_only:
+            export_outputs(load_teams())
+            print("Done!")
+        elif args.watch:
+            watch(load_teams(), args.max_polls)
+        else:
+            run(selection)
+    except Exception as e:
+        METRICS.set("error", str(e))
+        print("❌ Failed to fetch CricHeroes data")
+        print(e)
+        sys.exit(1)
+    finally:
+        STORE.close()
+        report_output_changes()
+        write_run_report(profiler)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,723 @@
+"""Offline API fixtures: recording, replay lookup, synthesis, scaling and generation.
+
+A fixture directory mirrors the API path space: the response to
+team/get-team-match/123?pageno=2 lives in team/get-team-match/123__pageno=2.json
+and holds the exact response body. fetch_cricheroes.py writes fixtures while
+CRICHEROES_RECORD_DIR is set, fake_server.py serves them back, and
+benchmark.py builds larger sets from a recorded (or synthesized) one.
+league() makes up a whole seeded league of match and scorecard payloads,
+for sizes no recording reaches.
+
+    python scripts/fixtures.py synthesize FIXTURE_DIR [--data data]
+    python scripts/fixtures.py scale FIXTURE_DIR OUT_DIR --factor 20
+    python scripts/fixtures.py generate FIXTURE_DIR --matches 10000 [--seed 1]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import shutil
+import threading
+import urllib.parse
+import zlib
+from datetime import datetime, timedelta
+
+DEFAULT_TEAM_ID = 12228002
+DEFAULT_LEGACY_TEAM_ID = 6984017
+DEFAULT_LEGACY_YEAR = 2025
+FALCON_NAMES = {"falcons", "hsc falcons", "helenelund cricket club"}
+SYNTHETIC_PAGE_SIZE = 10
+# Scaled copies of a match get ids in a block of their own.
+SCALE_ID_STRIDE = 100_000_000
+# Where fetch_cricheroes.py looks for ball-by-ball feeds by default (CRICHEROES_BALL_BY_BALL_PATH).
+FEED_PATH = "scorecard/get-commentary/{match_id}"
+
+
+def fixture_name(path):
+    """Relative fixture filename for an API path such as scorecard/get-scorecard/1?x=1."""
+    parts = urllib.parse.urlsplit(path)
+    name = parts.path.strip("/")
+    if parts.query:
+        name += "__" + urllib.parse.quote(parts.query, safe="=")
+    return f"{name}.json"
+
+
+def fixture_path(directory, path):
+    return os.path.join(directory, *fixture_name(path).split("/"))
+
+
+def record_response(directory, path, body):
+    """Store a raw response body as the fixture for path."""
+    target = fixture_path(directory, path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, target)
+
+
+def record_file(directory, path, source):
+    """Copy a response body already written to the file source as the fixture for path."""
+    target = fixture_path(directory, path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.{threading.get_ident()}.tmp"
+    shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+def read_fixture(directory, path):
+    """Raw body recorded for path, or None."""
+    try:
+        with open(fixture_path(directory, path), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def write_payload(directory, path, payload):
+    record_response(directory, path, json.dumps(payload).encode("utf-8"))
+
+
+def relative_path(url, prefix="/api/v1/"):
+    """API path of an absolute or relative URL, e.g. a recorded page.next link."""
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path
+    if prefix in path:
+        path = path.split(prefix, 1)[1]
+    path = path.lstrip("/")
+    return f"{path}?{parts.query}" if parts.query else path
+
+
+def collect_pages(directory, path, max_pages=1000):
+    """Follow a recorded page.next chain starting at path; returns (items, pages read)."""
+    items = []
+    pages = 0
+    while path and pages < max_pages:
+        body = read_fixture(directory, path)
+        if body is None:
+            break
+        payload = json.loads(body)
+        data = payload.get("data")
+        if not isinstance(data, list):
+            break
+        items.extend(data)
+        pages += 1
+        next_url = (payload.get("page") or {}).get("next")
+        path = relative_path(next_url) if next_url else None
+    return items, pages
+
+
+def write_pages(directory, path, items, page_size=SYNTHETIC_PAGE_SIZE):
+    """Write items as a page.next chain: path, path?pageno=2, ..."""
+    chunks = [items[i:i + page_size] for i in range(0, len(items), page_size)] or [[]]
+    for i, chunk in enumerate(chunks):
+        key = path if i == 0 else f"{path}?pageno={i + 1}"
+        next_path = f"{path}?pageno={i + 2}" if i + 1 < len(chunks) else None
+        write_payload(directory, key, {"status": True, "data": chunk, "page": {"next": next_path}})
+
+
+def stable_id(text, base=900_000_000):
+    """Deterministic made-up id for names the published data carries no id for."""
+    return base + zlib.crc32(text.encode("utf-8")) % 10_000_000
+
+
+ROLE_SUFFIX = re.compile(r"\s*\(.*\)\s*$")
+SCORE = re.compile(r"^(.+?)\s+(\d+/\d+(?: \([\d.]+ Ov\))?|Yet to bat)$")
+OVERS = re.compile(r"(\d+) Ov")
+
+
+def split_score(score):
+    match = SCORE.match(score)
+    return (match.group(1), match.group(2)) if match else (score, "")
+
+
+def synthesize(data_dir, out_dir, team_id=DEFAULT_TEAM_ID, legacy_team_id=DEFAULT_LEGACY_TEAM_ID,
+               legacy_year=DEFAULT_LEGACY_YEAR):
+    """Rebuild API-shaped fixtures from the published JSON in data_dir.
+
+    Only the fields the pipeline reads are reconstructed, so replaying the
+    result reproduces the published matches, scorecards, tournaments and
+    career stats. It stands in for a recording when none is at hand.
+    """
+    def load(name):
+        with open(os.path.join(data_dir, name), encoding="utf-8") as f:
+            return json.load(f)
+
+    matches = load("matches.json")
+    scorecards = load("match_scorecards.json")
+    players = load("players.json")
+    player_stats = load("player_stats.json")
+    leaderboard = load("leaderboard.json")
+    roster = {p["name"].lower(): p["player_id"] for p in players}
+
+    def player_id(name):
+        key = ROLE_SUFFIX.sub("", name).strip().lower()
+        return roster.get(key) or stable_id(key)
+
+    current, legacy = [], []
+    for m in matches:
+        match_id = m["match_id"]
+        team_a, summary_a = split_score(m["score"][0] if m["score"] else "")
+        team_b, summary_b = split_score(m["score"][1] if len(m["score"]) > 1 else "")
+        played = datetime.strptime(m["date"], "%d-%b-%y")
+        own_id = team_id if played.year > legacy_year else legacy_team_id
+        falcons_a = team_a.lower() in FALCON_NAMES
+        ids = {
+            team_a: own_id if falcons_a else stable_id(team_a),
+            team_b: stable_id(team_b) if falcons_a else own_id,
+        }
+        winner = m["result"].split(" won")[0] if " won" in m["result"] else ""
+        winner_id = ids.get(winner, 0)
+        if "tie" in m["result"].lower():
+            result = "Tied"
+        else:
+            result = "Resulted" if winner_id else "Abandoned"
+        overs = OVERS.search(m["info"])
+        raw = {
+            "match_id": match_id,
+            "tournament_name": m["tournament"],
+            "team_a": team_a,
+            "team_b": team_b,
+            "team_a_id": ids[team_a],
+            "team_b_id": ids[team_b],
+            "team_a_summary": summary_a,
+            "team_b_summary": summary_b,
+            "ground_name": m["venue"],
+            "match_start_time": played.strftime("%Y-%m-%dT10:00:00.000Z"),
+            "overs": int(overs.group(1)) if overs else None,
+            "match_summary": {"summary": m["result"]},
+            "match_result": result,
+            "winning_team_id": winner_id,
+            "status": "past",
+        }
+        (current if own_id == team_id else legacy).append(raw)
+
+        scorecard = scorecards.get(str(match_id))
+        if not scorecard:
+            continue
+        batting = {team_a: {}, team_b: {}}
+        bowling = {team_a: {}, team_b: {}}
+        # Falcon rows first so the de-duplicated order matches what was published.
+        for b in scorecard["falcon_batters"] + scorecard["top_batters"]:
+            batting.setdefault(b["team"], {}).setdefault(b["name"], {
+                "name": b["name"], "player_id": b.get("player_id") or player_id(b["name"]),
+                "runs": b["runs"], "balls": b["balls"], "SR": b["sr"], "4s": b["fours"], "6s": b["sixes"],
+                "how_to_out": "not out" if b["not_out"] else "b X",
+            })
+        for b in scorecard["falcon_bowlers"] + scorecard["top_bowlers"]:
+            bowling.setdefault(b["team"], {}).setdefault(b["name"], {
+                "name": b["name"], "player_id": b.get("player_id") or player_id(b["name"]),
+                "overs": b["overs"], "wickets": b["wickets"], "runs": b["runs"],
+                "economy_rate": b["economy"], "maidens": b["maidens"],
+            })
+
+        def team(name, opponent):
+            innings = {"batting": list(batting.get(name, {}).values()), "bowling": list(bowling.get(opponent, {}).values())}
+            return {"id": ids.get(name, 0), "name": name, "scorecard": [innings]}
+
+        data = {"team_a": team(team_a, team_b), "team_b": team(team_b, team_a)}
+        write_payload(out_dir, f"scorecard/get-scorecard/{match_id}", {"status": True, "data": data})
+        write_payload(out_dir, FEED_PATH.format(match_id=match_id), feed(match_id, data))
+
+    write_pages(out_dir, f"team/get-team-match/{team_id}", current)
+    write_pages(out_dir, f"team/get-team-match/{legacy_team_id}", legacy)
+    write_payload(out_dir, f"team/get-team-players/{team_id}", {"status": True, "data": [
+        {"player_id": p["player_id"], "name": p["name"], "player_skill": p["sub_title"], "profile_photo": p["profile_pic_url"]}
+        for p in players
+    ]})
+
+    stat_keys = {"batting": "total_runs", "bowling": "total_wickets", "fielding": "total_catches"}
+    for category, key in stat_keys.items():
+        items = [
+            {"name": e["player_name"], "player_id": roster.get(e["player_name"].lower()) or stable_id(e["player_name"]),
+             key: int(e["stat"].split()[0])}
+            for e in leaderboard.get(category, [])
+        ]
+        write_pages(out_dir, f"leaderboard/get-team-{category}-leaderboard/{team_id}", items)
+
+    for entry in player_stats:
+        statistics = {
+            "batting": career_list(entry["batting"], BATTING_TITLES),
+            "bowling": career_list(entry["bowling"], BOWLING_TITLES),
+            "fielding": career_list(entry["fielding"], FIELDING_TITLES),
+        }
+        if entry["batting"]:
+            batting = entry["batting"]
+            statistics["batting"].append(
+                {"title": "Highest Runs", "value": f"{batting['highest_score']}{batting['highest_score_not_out']}"}
+            )
+        if not any(statistics.values()):
+            statistics = {}
+        write_payload(out_dir, f"player/get-player-statistic/{entry['player_id']}?pagesize=100",
+                      {"status": True, "data": {"statistics": statistics}})
+
+
+BATTING_TITLES = {
+    "matches": "Matches", "innings": "Innings", "not_outs": "Not out", "runs": "Runs", "average": "Avg",
+    "strike_rate": "SR", "thirties": "30s", "fifties": "50s", "hundreds": "100s", "fours": "4s",
+    "sixes": "6s", "ducks": "Ducks",
+}
+BOWLING_TITLES = {
+    "matches": "Matches", "innings": "Innings", "overs": "Overs", "maidens": "Maidens", "wickets": "Wickets",
+    "runs_conceded": "Runs", "best_figures": "Best Bowling", "three_wickets": "3 Wickets",
+    "five_wickets": "5 Wickets", "economy": "Economy", "strike_rate": "SR", "average": "Avg",
+    "wides": "Wides", "noballs": "NoBalls", "dot_balls": "Dot Balls", "fours_conceded": "4s",
+    "sixes_conceded": "6s",
+}
+FIELDING_TITLES = {
+    "matches": "Matches", "catches": "Catches", "caught_behind": "Caught behind", "run_outs": "Run outs",
+    "stumpings": "Stumpings", "assisted_run_outs": "Assisted Run Outs",
+}
+
+
+def shot_runs(rng, runs, balls, fours, sixes):
+    """Runs off each of balls deliveries, adding up to runs, with the given boundaries where they fit."""
+    shots = [6] * sixes + [4] * fours
+    rest = runs - sum(shots)
+    others = balls - len(shots)
+    if rest < 0 or others < 0 or rest > 3 * others:
+        shots, rest, others = [], runs, balls
+    shots += [rest // others + (i < rest % others) for i in range(others)]
+    rng.shuffle(shots)
+    return shots
+
+
+# Feed dismissal types by how a scorecard row starts describing it.
+DISMISSAL_TYPES = (("run out", "run out"), ("lbw", "lbw"), ("st ", "stumped"), ("c ", "caught"), ("b ", "bowled"))
+
+
+def dismissal_type(how_out):
+    how_out = how_out.lower()
+    return next((kind for prefix, kind in DISMISSAL_TYPES if how_out.startswith(prefix)), "caught")
+
+
+def feed(match_id, scorecard):
+    """Ball-by-ball feed payload that replays the batting rows of a scorecard payload.
+
+    Each batter faces their balls in batting order, with the next batter in
+    at the other end, and is out on the last one unless not out. Bowlers
+    take the overs in turn. Every batting row's runs and balls add up
+    exactly; the bowling figures do not.
+    """
+    rng = random.Random(f"feed:{match_id}")
+    innings = []
+    for side, opponent in (("team_a", "team_b"), ("team_b", "team_a")):
+        batting_team = scorecard[side]
+        bowling_team = scorecard[opponent]
+        for inning in batting_team.get("scorecard", []):
+            batters = [b for b in inning.get("batting", []) if b.get("balls")]
+            bowlers = inning.get("bowling", []) or [{}]
+            balls = []
+            for i, batter in enumerate(batters):
+                partner = batters[i + 1] if i + 1 < len(batters) else {}
+                runs = shot_runs(rng, batter["runs"], batter["balls"], batter.get("4s", 0), batter.get("6s", 0))
+                out = batter.get("how_to_out", "not out") != "not out"
+                for j, scored in enumerate(runs):
+                    over, ball = divmod(len(balls), 6)
+                    bowler = bowlers[over % len(bowlers)]
+                    wicket = out and j == len(runs) - 1
+                    balls.append({
+                        "ball": f"{over}.{ball + 1}",
+                        "batting_team_id": batting_team.get("id"),
+                        "bowling_team_id": bowling_team.get("id"),
+                        "batsman_id": batter["player_id"],
+                        "batsman_name": batter["name"],
+                        "non_striker_id": partner.get("player_id"),
+                        "non_striker_name": partner.get("name", ""),
+                        "bowler_id": bowler.get("player_id"),
+                        "bowler_name": bowler.get("name", ""),
+                        "run": scored,
+                        "extra_run": 0,
+                        "extra_type": "",
+                        "is_out": wicket,
+                        "out_type": dismissal_type(batter["how_to_out"]) if wicket else "",
+                        "out_player_id": batter["player_id"] if wicket else None,
+                    })
+            innings.append({"team_id": batting_team.get("id"), "balls": balls})
+    return {"status": True, "data": {"match_id": match_id, "innings": innings}}
+
+
+def career_list(stats, titles):
+    return [{"title": titles[key], "value": value} for key, value in stats.items() if key in titles]
+
+
+def scale(src_dir, out_dir, factor, team_ids=(DEFAULT_TEAM_ID, DEFAULT_LEGACY_TEAM_ID), page_size=50):
+    """Copy a fixture set with every match and roster player repeated factor times.
+
+    Copy n of a match keeps its date and teams but gets match id
+    n * SCALE_ID_STRIDE + id, with the scorecard copied alongside; roster
+    copies get new ids and a numbered name. Ball-by-ball feeds are copied
+    like scorecards. Returns the number of matches.
+    """
+    if os.path.abspath(src_dir) != os.path.abspath(out_dir):
+        shutil.copytree(src_dir, out_dir, dirs_exist_ok=True)
+    total = 0
+    for team_id in team_ids:
+        path = f"team/get-team-match/{team_id}"
+        matches, pages = collect_pages(src_dir, path)
+        if not pages:
+            continue
+        copies = []
+        for n in range(factor):
+            for m in matches:
+                copy = dict(m, match_id=n * SCALE_ID_STRIDE + m["match_id"])
+                copies.append(copy)
+                if n == 0:
+                    continue
+                for path_format in ("scorecard/get-scorecard/{match_id}", FEED_PATH):
+                    body = read_fixture(src_dir, path_format.format(match_id=m["match_id"]))
+                    if body is not None:
+                        record_response(out_dir, path_format.format(match_id=copy["match_id"]), body)
+        write_pages(out_dir, path, copies, page_size)
+        total += len(copies)
+
+        players_path = f"team/get-team-players/{team_id}"
+        body = read_fixture(src_dir, players_path)
+        if body is None:
+            continue
+        payload = json.loads(body)
+        roster = payload.get("data", [])
+        scaled = list(roster)
+        for n in range(1, factor):
+            for p in roster:
+                copy = dict(p, player_id=n * SCALE_ID_STRIDE + p["player_id"], name=f"{p['name']} {n + 1}")
+                scaled.append(copy)
+                stats_path = f"player/get-player-statistic/{p['player_id']}?pagesize=100"
+                stats = read_fixture(src_dir, stats_path)
+                if stats is not None:
+                    record_response(out_dir, f"player/get-player-statistic/{copy['player_id']}?pagesize=100", stats)
+        write_payload(out_dir, players_path, dict(payload, data=scaled))
+    return total
+
+
+# A generated league: divisions of LEAGUE_DIVISION_SIZE teams, each playing a
+# single round robin per season. Ids live in blocks no recording uses.
+LEAGUE_DIVISION_SIZE = 12
+LEAGUE_ROSTER_SIZE = 15
+LEAGUE_SEASONS = 10
+LEAGUE_FIRST_SEASON = 2016
+LEAGUE_TEAM_ID_BASE = 800_000_000
+LEAGUE_PLAYER_ID_BASE = 700_000_000
+LEAGUE_MATCH_ID_BASE = 600_000_000
+NO_RESULT_RATE = 0.03
+TIE_RATE = 0.01
+FIRST_NAMES = (
+    "Aarav", "Abdul", "Adam", "Ali", "Amit", "Anders", "Arjun", "Ben", "Daniel", "Erik", "Faisal", "Gustav",
+    "Hamza", "Hassan", "Imran", "Jonas", "Karan", "Lars", "Mohammed", "Naveen", "Nikhil", "Oliver", "Omar",
+    "Pradeep", "Rahul", "Rohit", "Sami", "Sandeep", "Shahid", "Suresh", "Tariq", "Usman", "Vikram", "Zain",
+)
+LAST_NAMES = (
+    "Ahmed", "Andersson", "Bhatt", "Chaudhry", "Das", "Fernando", "Gupta", "Hussain", "Iqbal", "Johansson",
+    "Khan", "Kumar", "Larsson", "Malik", "Mehta", "Nair", "Nilsson", "Patel", "Perera", "Qureshi", "Rao",
+    "Reddy", "Shah", "Sharma", "Silva", "Singh", "Svensson", "Verma", "Yadav", "Zaman",
+)
+TOWNS = (
+    "Alby", "Bromma", "Danderyd", "Enskede", "Farsta", "Gustavsberg", "Haninge", "Huddinge", "Jarfalla",
+    "Kista", "Lidingo", "Malmo", "Nacka", "Norrkoping", "Orebro", "Sigtuna", "Solna", "Sodertalje",
+    "Sundbyberg", "Taby", "Tyreso", "Uppsala", "Vasteras", "Vallingby", "Akersberga", "Goteborg", "Lund",
+    "Linkoping", "Helsingborg", "Umea",
+)
+MASCOTS = (
+    "Eagles", "Tigers", "Lions", "Royals", "Strikers", "Warriors", "Knights", "Titans", "Panthers", "Kings",
+    "Challengers", "Gladiators", "Hawks", "Rangers", "Sharks", "Stallions", "Vikings", "Wolves", "Spartans",
+    "Super Giants", "Blasters", "Chargers", "Riders", "Thunder", "Stars",
+)
+GROUNDS = (
+    "Helenelund IP", "Kista Cricket Ground", "Spanga IP", "Norsborg Cricket Ground", "Skarpnack Oval",
+    "Gubbangen IP", "Tensta IP", "Rinkeby Cricket Ground", "Solvalla Oval", "Uppsala Cricket Ground",
+)
+SKILLS = ("Batter", "Bowler", "All-rounder", "Wicket-keeper Batter")
+DISMISSALS = ("c {fielder} b {bowler}", "b {bowler}", "lbw b {bowler}", "c & b {bowler}", "st {fielder} b {bowler}")
+
+
+def league_shape(match_count, seasons=LEAGUE_SEASONS):
+    """(divisions, matches per tournament) of the smallest league with match_count matches over seasons."""
+    per_tournament = LEAGUE_DIVISION_SIZE * (LEAGUE_DIVISION_SIZE - 1) // 2
+    return max(1, math.ceil(match_count / per_tournament / seasons)), per_tournament
+
+
+def league_teams(match_count, seed=0, team_id=DEFAULT_TEAM_ID, seasons=LEAGUE_SEASONS):
+    """Teams of a generated league, each {"id", "name", "division", "players"}; the first one is team_id."""
+    rng = random.Random(f"teams:{seed}")
+    divisions, _ = league_shape(match_count, seasons)
+    names = [f"{town} {mascot}" for town in TOWNS for mascot in MASCOTS]
+    rng.shuffle(names)
+    teams = []
+    for i in range(divisions * LEAGUE_DIVISION_SIZE):
+        name = "Falcons" if i == 0 else names[i % len(names)] + (f" {i // len(names) + 1}" if i >= len(names) else "")
+        players = [
+            {
+                "player_id": LEAGUE_PLAYER_ID_BASE + i * 100 + j,
+                "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "player_skill": rng.choice(SKILLS),
+                "profile_photo": "",
+            }
+            for j in range(LEAGUE_ROSTER_SIZE)
+        ]
+        teams.append({
+            "id": team_id if i == 0 else LEAGUE_TEAM_ID_BASE + i,
+            "name": name,
+            "division": i // LEAGUE_DIVISION_SIZE,
+            "players": players,
+        })
+    return teams
+
+
+def split_total(rng, total, weights):
+    """total split into len(weights) non-negative integers roughly in proportion to weights."""
+    scale = total / sum(weights)
+    shares = [int(weight * scale) for weight in weights]
+    for _ in range(total - sum(shares)):
+        shares[rng.randrange(len(shares))] += 1
+    return shares
+
+
+def overs_text(balls):
+    return f"{balls // 6}.{balls % 6}" if balls % 6 else str(balls // 6)
+
+
+def simulate_innings(rng, batters, bowlers, runs, wickets, balls, overs):
+    """Batting rows of batters and bowling rows of bowlers for an innings of runs/wickets in balls."""
+    came_in = batters[:min(len(batters), wickets + 2)]
+    weights = [rng.expovariate(1.0) * (1.6 if i < 4 else 1.0 if i < 7 else 0.35) + 0.05 for i in range(len(came_in))]
+    extras = rng.randint(0, runs // 12 + 1) if runs else 0
+    scored = split_total(rng, runs - extras, weights)
+    faced = [1 + share for share in split_total(rng, balls - len(came_in), [w * rng.uniform(0.7, 1.3) for w in weights])]
+
+    # Each bowler bowls whole overs up to the limit, one of them the last partial over.
+    used = bowlers[:rng.randint(5, min(7, len(bowlers)))]
+    limit = max(1, math.ceil(overs / 5))
+    bowled = [0] * len(used)
+    for _ in range(math.ceil(balls / 6)):
+        bowled[rng.choice([i for i, n in enumerate(bowled) if n < limit * 6])] += 6
+    if balls % 6:
+        bowled[rng.choice([i for i, n in enumerate(bowled) if n])] -= 6 - balls % 6
+    taken = [0] * len(used)
+
+    batting = []
+    for i, (player, r, b) in enumerate(zip(came_in, scored, faced)):
+        r = min(r, b * 6)
+        sixes = rng.randint(0, r // 15)
+        fours = rng.randint(0, (r - sixes * 6) // 6)
+        if i < wickets:
+            fielder = rng.choice(bowlers)["name"]
+            if rng.random() < 0.05:
+                how_out = f"run out ({fielder})"
+            else:
+                k = rng.choices(range(len(used)), weights=bowled)[0]
+                taken[k] += 1
+                how_out = rng.choice(DISMISSALS).format(fielder=fielder, bowler=used[k]["name"])
+        else:
+            how_out = "not out"
+        batting.append({
+            "name": player["name"], "player_id": player["player_id"], "runs": r, "balls": b,
+            "SR": round(r / b * 100, 2), "4s": fours, "6s": sixes, "how_to_out": how_out,
+        })
+
+    conceded = split_total(rng, runs - rng.randint(0, extras), [n * rng.uniform(0.6, 1.4) for n in bowled])
+    bowling = [
+        {
+            "name": player["name"], "player_id": player["player_id"], "overs": float(overs_text(n)),
+            "maidens": 1 if n >= 12 and rng.random() < 0.08 else 0, "runs": c, "wickets": w,
+            "economy_rate": round(c / (n / 6), 2),
+        }
+        for player, n, c, w in zip(used, bowled, conceded, taken)
+        if n
+    ]
+    return batting, bowling
+
+
+def simulate_match(rng, match_id, tournament, overs, played_at, ground, home, away):
+    """(raw match, scorecard payload) of one generated match between teams home and away."""
+    first, second = (home, away) if rng.random() < 0.5 else (away, home)
+    xi = {team["id"]: rng.sample(team["players"], 11) for team in (home, away)}
+    balls = overs * 6
+    innings = {}
+    winner = 0
+    if rng.random() < NO_RESULT_RATE:
+        result, summary = "Abandoned", "Match abandoned without a ball bowled"
+    else:
+        runs = max(30, int(rng.gauss(7.2 * overs, 1.6 * overs)))
+        wickets = min(10, max(1, int(rng.gauss(6.5, 2.2))))
+        innings[first["id"]] = (runs, wickets, balls if wickets < 10 else rng.randint(balls * 2 // 3, balls))
+        roll = rng.random()
+        if roll < TIE_RATE:
+            innings[second["id"]] = (runs, rng.randint(3, 9), balls)
+            result, summary = "Tied", "Match tied"
+        elif roll < 0.5:
+            chased = min(9, max(0, int(rng.gauss(5, 2))))
+            innings[second["id"]] = (runs + 1 + rng.randint(0, 5), chased, rng.randint(balls // 2, balls - 1))
+            winner = second["id"]
+            result, summary = "Resulted", f"{second['name']} won by {10 - chased} wickets"
+        else:
+            lost = rng.randint(runs // 2, runs - 1)
+            all_out = rng.random() < 0.5
+            chased = 10 if all_out else rng.randint(3, 9)
+            innings[second["id"]] = (lost, chased, rng.randint(balls // 2, balls) if all_out else balls)
+            winner = first["id"]
+            result, summary = "Resulted", f"{first['name']} won by {runs - lost} runs"
+
+    sides = {}
+    summaries = {}
+    for team, opponent in ((home, away), (away, home)):
+        scorecard = []
+        summaries[team["id"]] = "Yet to bat"
+        if team["id"] in innings:
+            runs, wickets, faced = innings[team["id"]]
+            bowlers = list(reversed(xi[opponent["id"]]))
+            batting, bowling = simulate_innings(rng, xi[team["id"]], bowlers, runs, wickets, faced, overs)
+            scorecard.append({"batting": batting, "bowling": bowling})
+            summaries[team["id"]] = f"{runs}/{wickets} ({overs_text(faced)} Ov)"
+        sides[team["id"]] = {"id": team["id"], "name": team["name"], "scorecard": scorecard}
+    match = {
+        "match_id": match_id,
+        "tournament_name": tournament,
+        "team_a": home["name"],
+        "team_b": away["name"],
+        "team_a_id": home["id"],
+        "team_b_id": away["id"],
+        "team_a_summary": summaries[home["id"]],
+        "team_b_summary": summaries[away["id"]],
+        "ground_name": ground,
+        "match_start_time": played_at.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "overs": overs,
+        "match_summary": {"summary": summary},
+        "match_result": result,
+        "winning_team_id": winner,
+        "status": "past",
+    }
+    return match, {"team_a": sides[home["id"]], "team_b": sides[away["id"]]}
+
+
+def league(match_count, seed=0, team_id=DEFAULT_TEAM_ID, seasons=LEAGUE_SEASONS, teams=None):
+    """Yield (raw match, scorecard payload) for match_count generated matches, oldest first.
+
+    The same seed always gives the same league. Matches are generated one
+    at a time, so a caller that does not keep them can stream any size.
+    """
+    teams = teams or league_teams(match_count, seed, team_id, seasons)
+    rng = random.Random(f"matches:{seed}")
+    divisions, per_tournament = league_shape(match_count, seasons)
+    pairs = [(a, b) for a in range(LEAGUE_DIVISION_SIZE) for b in range(a + 1, LEAGUE_DIVISION_SIZE)]
+    generated = 0
+    for season in range(LEAGUE_FIRST_SEASON, LEAGUE_FIRST_SEASON + seasons):
+        for division in range(divisions):
+            tournament = f"Division {division + 1} {season}"
+            overs = 20 if division % 2 == 0 else 15
+            members = teams[division * LEAGUE_DIVISION_SIZE:(division + 1) * LEAGUE_DIVISION_SIZE]
+            rng.shuffle(pairs)
+            for i, (a, b) in enumerate(pairs):
+                if generated == match_count:
+                    return
+                played_at = datetime(season, 5, 1, 10) + timedelta(days=i * 140 // per_tournament, hours=4 * (i % 2))
+                yield simulate_match(
+                    rng, LEAGUE_MATCH_ID_BASE + generated, tournament, overs, played_at, rng.choice(GROUNDS),
+                    members[a], members[b],
+                )
+                generated += 1
+
+
+def generate(out_dir, match_count, seed=0, team_id=DEFAULT_TEAM_ID, legacy_team_id=DEFAULT_LEGACY_TEAM_ID,
+             page_size=50, feeds=False):
+    """Write a generated league as a fixture set that fake_server.py can serve; returns the number of matches.
+
+    Every team gets its match list and roster; team_id, the team the
+    pipeline follows, also gets leaderboards and career stats made from its
+    generated scorecards, and legacy_team_id an empty match list. With feeds,
+    every match also gets a ball-by-ball feed (about 70 KB each).
+    """
+    teams = league_teams(match_count, seed, team_id)
+    own = {p["player_id"] for p in teams[0]["players"]}
+    match_lists = {team["id"]: [] for team in teams}
+    totals = {pid: {"matches": set(), "runs": 0, "innings": 0, "not_outs": 0, "balls": 0, "wickets": 0,
+                    "bowled": 0, "conceded": 0} for pid in own}
+    count = 0
+    for match, scorecard in league(match_count, seed, team_id, teams=teams):
+        write_payload(out_dir, f"scorecard/get-scorecard/{match['match_id']}", {"status": True, "data": scorecard})
+        if feeds:
+            write_payload(out_dir, FEED_PATH.format(match_id=match["match_id"]), feed(match["match_id"], scorecard))
+        match_lists[match["team_a_id"]].append(match)
+        match_lists[match["team_b_id"]].append(match)
+        for side in (scorecard["team_a"], scorecard["team_b"]):
+            for inning in side["scorecard"]:
+                for b in inning["batting"]:
+                    if b["player_id"] in totals:
+                        t = totals[b["player_id"]]
+                        t["matches"].add(match["match_id"])
+                        t["innings"] += 1
+                        t["runs"] += b["runs"]
+                        t["balls"] += b["balls"]
+                        t["not_outs"] += b["how_to_out"] == "not out"
+                for b in inning["bowling"]:
+                    if b["player_id"] in totals:
+                        t = totals[b["player_id"]]
+                        t["matches"].add(match["match_id"])
+                        t["wickets"] += b["wickets"]
+                        t["bowled"] += int(b["overs"]) * 6 + round(b["overs"] % 1 * 10)
+                        t["conceded"] += b["runs"]
+        count += 1
+
+    for team in teams:
+        write_pages(out_dir, f"team/get-team-match/{team['id']}", match_lists[team["id"]][::-1], page_size)
+        write_payload(out_dir, f"team/get-team-players/{team['id']}", {"status": True, "data": team["players"]})
+    write_pages(out_dir, f"team/get-team-match/{legacy_team_id}", [])
+
+    names = {p["player_id"]: p["name"] for p in teams[0]["players"]}
+    for category, key, stat in (("batting", "total_runs", "runs"), ("bowling", "total_wickets", "wickets")):
+        ranked = sorted(own, key=lambda pid: -totals[pid][stat])
+        items = [{"name": names[pid], "player_id": pid, key: totals[pid][stat]} for pid in ranked]
+        write_pages(out_dir, f"leaderboard/get-team-{category}-leaderboard/{team_id}", items)
+    write_pages(out_dir, f"leaderboard/get-team-fielding-leaderboard/{team_id}", [])
+    for pid, t in totals.items():
+        outs = t["innings"] - t["not_outs"]
+        statistics = {
+            "batting": [
+                {"title": "Matches", "value": len(t["matches"])}, {"title": "Innings", "value": t["innings"]},
+                {"title": "Not out", "value": t["not_outs"]}, {"title": "Runs", "value": t["runs"]},
+                {"title": "Avg", "value": round(t["runs"] / outs, 2) if outs else 0},
+                {"title": "SR", "value": round(t["runs"] / t["balls"] * 100, 2) if t["balls"] else 0},
+            ],
+            "bowling": [
+                {"title": "Matches", "value": len(t["matches"])}, {"title": "Overs", "value": overs_text(t["bowled"])},
+                {"title": "Wickets", "value": t["wickets"]}, {"title": "Runs", "value": t["conceded"]},
+                {"title": "Economy", "value": round(t["conceded"] / t["bowled"] * 6, 2) if t["bowled"] else 0},
+            ],
+            "fielding": [],
+        }
+        write_payload(out_dir, f"player/get-player-statistic/{pid}?pagesize=100",
+                      {"status": True, "data": {"statistics": statistics}})
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    synth = commands.add_parser("synthesize", help="build fixtures from the published JSON")
+    synth.add_argument("out_dir")
+    synth.add_argument("--data", default="data")
+    scaled = commands.add_parser("scale", help="repeat every match and player of a fixture set")
+    scaled.add_argument("src_dir")
+    scaled.add_argument("out_dir")
+    scaled.add_argument("--factor", type=int, required=True)
+    generated = commands.add_parser("generate", help="write a seeded, generated league")
+    generated.add_argument("out_dir")
+    generated.add_argument("--matches", type=int, default=1000)
+    generated.add_argument("--seed", type=int, default=0)
+    generated.add_argument("--feeds", action="store_true", help="also write ball-by-ball feeds")
+    args = parser.parse_args()
+    if args.command == "synthesize":
+        synthesize(args.data, args.out_dir)
+        print(f"Wrote fixtures to {args.out_dir}")
+    elif args.command == "generate":
+        total = generate(args.out_dir, args.matches, args.seed, feeds=args.feeds)
+        print(f"Wrote {total} generated matches to {args.out_dir}")
+    else:
+        total = scale(args.src_dir, args.out_dir, args.factor)
+        print(f"Wrote {total} matches to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
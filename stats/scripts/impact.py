@@ -0,0 +1,178 @@
+"""Impact scoring shared by per-match awards and tournament aggregates.
+
+Rows are the BattingInnings and BowlingSpell records built in fetch_cricheroes.scorecard_rows.
+ImpactBatch scores the rows of many matches at once, to rank players across
+whole tournaments or seasons; it uses NumPy when installed and plain loops
+over the same columns otherwise, with identical results.
+"""
+
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def batter_impact(b):
+    return b.runs + b.sixes * 3 + b.fours + (10 if b.not_out else 0)
+
+
+def bowler_impact(b):
+    return b.wickets * 20 + (b.maidens * 5) + max(0, (8 - b.economy) * 2)
+
+
+def top_batters(rows, n=3):
+    return sorted(rows, key=lambda x: (-x.runs, -x.sr))[:n]
+
+
+def top_bowlers(rows, n=3):
+    return sorted(rows, key=lambda x: (-x.wickets, x.economy if x.economy > 0 else 99))[:n]
+
+
+def batting_stat(b):
+    return f"{b.runs} runs"
+
+
+def bowling_stat(b):
+    return f"{b.wickets}/{b.runs}"
+
+
+def pick_star(batting_rows, bowling_rows):
+    """Return ("batting", row) or ("bowling", row) for the highest-impact performer.
+
+    Ties go to the batter. Returns None when there are no rows at all.
+    """
+    best_batter = max(batting_rows, key=batter_impact, default=None)
+    best_bowler = max(bowling_rows, key=bowler_impact, default=None)
+    if best_batter and best_bowler:
+        if batter_impact(best_batter) >= bowler_impact(best_bowler):
+            return "batting", best_batter
+        return "bowling", best_bowler
+    if best_batter:
+        return "batting", best_batter
+    if best_bowler:
+        return "bowling", best_bowler
+    return None
+
+
+class ImpactBatch:
+    """Rows of many matches kept as columns, so impact can be scored and summed in one pass.
+
+    add() files a match's rows under a group (a tournament, a season, ...);
+    leaders() returns the top players of every group by summed impact. A
+    player is identified by player id, or by name when the row has none.
+    """
+
+    BATTING = ("group", "player", "runs", "fours", "sixes", "not_out")
+    BOWLING = ("group", "player", "wickets", "maidens", "economy")
+
+    def __init__(self, vectorized=None):
+        self.vectorized = numpy is not None if vectorized is None else vectorized and numpy is not None
+        self.groups = {}
+        self.players = {}
+        self.names = []
+        self.batting = {column: array("d" if column == "economy" else "q") for column in self.BATTING}
+        self.bowling = {column: array("d" if column == "economy" else "q") for column in self.BOWLING}
+
+    def _player(self, row):
+        key = row.player_id or f"name:{row.name}"
+        index = self.players.get(key)
+        if index is None:
+            index = self.players[key] = len(self.names)
+            self.names.append((row.player_id, row.name))
+        return index
+
+    def add(self, group, batting_rows, bowling_rows):
+        group_index = self.groups.setdefault(group, len(self.groups))
+        columns = self.batting
+        for b in batting_rows:
+            columns["group"].append(group_index)
+            columns["player"].append(self._player(b))
+            columns["runs"].append(b.runs)
+            columns["fours"].append(b.fours)
+            columns["sixes"].append(b.sixes)
+            columns["not_out"].append(1 if b.not_out else 0)
+        columns = self.bowling
+        for b in bowling_rows:
+            columns["group"].append(group_index)
+            columns["player"].append(self._player(b))
+            columns["wickets"].append(b.wickets)
+            columns["maidens"].append(b.maidens)
+            columns["economy"].append(b.economy)
+
+    def ranked(self, n=None):
+        """(group index, player index, batting impact, bowling impact) for the top n players of each group.
+
+        Sorted by group, then by total impact, best first; equal totals go to
+        the player seen first. n=None keeps every player.
+        """
+        if not self.batting["group"] and not self.bowling["group"]:
+            return []
+        if self.vectorized:
+            return self._ranked_numpy(n)
+        sums = {}
+        bat = self.batting
+        for g, p, runs, fours, sixes, not_out in zip(*(bat[c] for c in self.BATTING)):
+            entry = sums.setdefault((g, p), [0.0, 0.0])
+            entry[0] += runs + sixes * 3 + fours + (10 if not_out else 0)
+        bowl = self.bowling
+        for g, p, wickets, maidens, economy in zip(*(bowl[c] for c in self.BOWLING)):
+            entry = sums.setdefault((g, p), [0.0, 0.0])
+            entry[1] += wickets * 20 + maidens * 5 + max(0, (8 - economy) * 2)
+        ranked = sorted(
+            ((g, p, bat_score, bowl_score) for (g, p), (bat_score, bowl_score) in sums.items()),
+            key=lambda t: (t[0], -(t[2] + t[3]), t[1]),
+        )
+        if n is None:
+            return ranked
+        kept = []
+        for entry in ranked:
+            if kept and kept[-1][0] == entry[0]:
+                rank += 1
+            else:
+                rank = 0
+            if rank < n:
+                kept.append(entry)
+        return kept
+
+    def _ranked_numpy(self, n):
+        def column(columns, name):
+            return numpy.frombuffer(columns[name], dtype=numpy.float64 if name == "economy" else numpy.int64)
+
+        bat = {name: column(self.batting, name) for name in self.BATTING}
+        bowl = {name: column(self.bowling, name) for name in self.BOWLING}
+        bat_score = (bat["runs"] + bat["sixes"] * 3 + bat["fours"] + bat["not_out"] * 10).astype(numpy.float64)
+        bowl_score = bowl["wickets"] * 20 + bowl["maidens"] * 5 + numpy.maximum(0, (8 - bowl["economy"]) * 2)
+        # One key per (group, player), summed with bincount in row order like the loop above.
+        stride = len(self.names)
+        keys = numpy.concatenate([bat["group"] * stride + bat["player"], bowl["group"] * stride + bowl["player"]])
+        unique, inverse = numpy.unique(keys, return_inverse=True)
+        split = len(bat_score)
+        bat_total = numpy.bincount(inverse[:split], weights=bat_score, minlength=len(unique))
+        bowl_total = numpy.bincount(inverse[split:], weights=bowl_score, minlength=len(unique))
+        groups = unique // stride
+        players = unique % stride
+        order = numpy.lexsort((players, -(bat_total + bowl_total), groups))
+        if n is not None:
+            sorted_groups = groups[order]
+            rank = numpy.arange(len(order)) - numpy.searchsorted(sorted_groups, sorted_groups)
+            order = order[rank < n]
+        return list(zip(
+            groups[order].tolist(), players[order].tolist(), bat_total[order].tolist(), bowl_total[order].tolist()
+        ))
+
+    def leaders(self, n=3):
+        """{group: [{"player_id", "name", "batting", "bowling", "impact"}]}, best first, n per group."""
+        labels = list(self.groups)
+        output = {label: [] for label in labels}
+        for g, p, bat_score, bowl_score in self.ranked(n):
+            player_id, name = self.names[p]
+            output[labels[g]].append({
+                "player_id": player_id,
+                "name": name,
+                "batting": round(bat_score, 2),
+                "bowling": round(bowl_score, 2),
+                "impact": round(bat_score + bowl_score, 2),
+            })
+        return output
@@ -0,0 +1,140 @@
+"""Run instrumentation: per-endpoint request stats, waits and stage timings.
+
+Everything is collected in one process-wide RunMetrics and written to
+run_metrics.json at the end of a run, so the scheduled job leaves a
+machine-readable trace of where its wall time went. Waits (rate limiting,
+backoff, parsing) are summed across worker threads, so with concurrency
+they can exceed the wall-clock total.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted list; 0.0 when empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class RunMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.endpoints = {}
+        self.waits = {}
+        self.stages = {}
+        self.paginators = {}
+        self.extra = {}
+
+    def _endpoint(self, family):
+        endpoint = self.endpoints.get(family)
+        if endpoint is None:
+            endpoint = self.endpoints[family] = {
+                "requests": 0,
+                "errors": 0,
+                "retries": 0,
+                "bytes": 0,
+                "latencies": [],
+                "statuses": {},
+                "cache": {},
+            }
+        return endpoint
+
+    def record_request(self, family, seconds, size, status):
+        with self.lock:
+            endpoint = self._endpoint(family)
+            endpoint["requests"] += 1
+            endpoint["bytes"] += size
+            endpoint["latencies"].append(seconds)
+            endpoint["statuses"][str(status)] = endpoint["statuses"].get(str(status), 0) + 1
+
+    def record_error(self, family, retried):
+        with self.lock:
+            endpoint = self._endpoint(family)
+            endpoint["errors"] += 1
+            if retried:
+                endpoint["retries"] += 1
+
+    def record_cache(self, family, outcome):
+        with self.lock:
+            cache = self._endpoint(family)["cache"]
+            cache[outcome] = cache.get(outcome, 0) + 1
+
+    def add_wait(self, kind, seconds):
+        with self.lock:
+            self.waits[kind] = self.waits.get(kind, 0.0) + seconds
+
+    def record_pagination(self, path_family, pages, seconds):
+        with self.lock:
+            paginator = self.paginators.setdefault(path_family, {"calls": 0, "pages": 0, "seconds": 0.0})
+            paginator["calls"] += 1
+            paginator["pages"] += pages
+            paginator["seconds"] += seconds
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def set(self, key, value):
+        with self.lock:
+            self.extra[key] = value
+
+    def to_dict(self):
+        with self.lock:
+            endpoints = {}
+            for family, endpoint in sorted(self.endpoints.items()):
+                latencies = endpoint["latencies"]
+                endpoints[family] = {
+                    "requests": endpoint["requests"],
+                    "errors": endpoint["errors"],
+                    "retries": endpoint["retries"],
+                    "bytes": endpoint["bytes"],
+                    "statuses": endpoint["statuses"],
+                    "cache": endpoint["cache"],
+                    "latency_ms": {
+                        "mean": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+                        "p50": round(percentile(latencies, 50) * 1000, 1),
+                        "p90": round(percentile(latencies, 90) * 1000, 1),
+                        "p99": round(percentile(latencies, 99) * 1000, 1),
+                        "max": round(max(latencies, default=0.0) * 1000, 1),
+                    },
+                }
+            return {
+                "started_at": self.started_at,
+                "wall_seconds": round(time.perf_counter() - self.started, 3),
+                "totals": {
+                    "requests": sum(e["requests"] for e in endpoints.values()),
+                    "errors": sum(e["errors"] for e in endpoints.values()),
+                    "retries": sum(e["retries"] for e in endpoints.values()),
+                    "bytes": sum(e["bytes"] for e in endpoints.values()),
+                },
+                "endpoints": endpoints,
+                "waits_seconds": {kind: round(seconds, 3) for kind, seconds in sorted(self.waits.items())},
+                "stages_seconds": {name: round(seconds, 3) for name, seconds in self.stages.items()},
+                "paginators": {
+                    name: dict(paginator, seconds=round(paginator["seconds"], 3))
+                    for name, paginator in sorted(self.paginators.items())
+                },
+                **self.extra,
+            }
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        print(f"Saved {path}")
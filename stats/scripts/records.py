@@ -0,0 +1,273 @@
+"""Slotted records for the normalized entities the pipeline builds in bulk.
+
+Scorecard rows and career stats used to be one dict per record. Records
+keep the same fields in __slots__ instead, which takes a fraction of the
+memory once a league's archive is in play. Each record is built in a
+single pass over a FIELDS table of (field, source key, coerce, default).
+Hot paths (impact scoring, aggregation, the store) use attributes;
+everything else can keep reading records like the dicts they replace
+(row["runs"], row.get("player_id")). Rows that arrive as dicts, from a cache
+or a published file, are turned into records with coerce(). to_dict() gives
+the old dict with keys in the old order, and to_json() is the default= hook
+that lets json serialize records to byte-identical output.
+"""
+
+from dataclasses import dataclass
+
+
+def safe_int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def safe_float(value, default=0.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def safe_bool(value):
+    """True for true, 1 and their string forms; "0", "false" and other strings are False."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes")
+    return value is True or safe_int(value) == 1
+
+
+def identity(value):
+    return value
+
+
+def text(value):
+    return str(value)
+
+
+def highest_score(value):
+    return safe_int(str(value).rstrip("*"))
+
+
+def highest_score_not_out(value):
+    return "*" if str(value).endswith("*") else ""
+
+
+class Record:
+    """Base of the slotted records: subclasses are @dataclass(slots=True, eq=False) and may list FIELDS.
+
+    from_raw() builds a record from an API dict in one pass over FIELDS,
+    whose order must match the dataclass fields. Records compare equal to
+    records and dicts with the same values, and hash by their values.
+    """
+
+    __slots__ = ()
+    # (field, source key or None for a value passed to from_raw, coerce, default when the key is missing)
+    FIELDS = ()
+
+    @classmethod
+    def from_raw(cls, raw, **context):
+        get = raw.get
+        values = []
+        for name, key, coerce, default in cls.FIELDS:
+            if key is None:
+                values.append(context.get(name))
+            elif coerce is identity:
+                values.append(get(key, default))
+            else:
+                values.append(coerce(get(key, default)))
+        return cls(*values)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    # Dict-style reads, so code written against the old dicts takes records unchanged.
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    @classmethod
+    def coerce(cls, value):
+        """value if it already is a cls, else a cls from its dict form (missing fields become None)."""
+        if isinstance(value, cls):
+            return value
+        return cls(*[value.get(name) for name in cls.__slots__])
+
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    def __hash__(self):
+        return hash((type(self), *(getattr(self, name) for name in self.__slots__)))
+
+
+@dataclass(slots=True, eq=False)
+class BattingInnings(Record):
+    name: str
+    player_id: int | None
+    team: str | None
+    runs: int
+    balls: int
+    sr: float
+    fours: int
+    sixes: int
+    not_out: bool
+    FIELDS = (
+        ("name", "name", identity, ""),
+        ("player_id", "player_id", identity, None),
+        ("team", None, None, None),
+        ("runs", "runs", safe_int, None),
+        ("balls", "balls", safe_int, None),
+        ("sr", "SR", safe_float, None),
+        ("fours", "4s", safe_int, None),
+        ("sixes", "6s", safe_int, None),
+        ("not_out", "how_to_out", lambda how_out: how_out in ("not out", ""), ""),
+    )
+
+
+@dataclass(slots=True, eq=False)
+class BowlingSpell(Record):
+    name: str
+    player_id: int | None
+    team: str | None
+    wickets: int
+    overs: float
+    runs: int
+    economy: float
+    maidens: int
+    FIELDS = (
+        ("name", "name", identity, ""),
+        ("player_id", "player_id", identity, None),
+        ("team", None, None, None),
+        ("wickets", "wickets", safe_int, None),
+        ("overs", "overs", safe_float, None),
+        ("runs", "runs", safe_int, None),
+        ("economy", "economy_rate", safe_float, None),
+        ("maidens", "maidens", safe_int, None),
+    )
+
+
+@dataclass(slots=True, eq=False)
+class CareerBatting(Record):
+    matches: int
+    innings: int
+    not_outs: int
+    runs: int
+    highest_score: int
+    highest_score_not_out: str
+    average: float
+    strike_rate: float
+    thirties: int
+    fifties: int
+    hundreds: int
+    fours: int
+    sixes: int
+    ducks: int
+    FIELDS = (
+        ("matches", "Matches", safe_int, None),
+        ("innings", "Innings", safe_int, None),
+        ("not_outs", "Not out", safe_int, None),
+        ("runs", "Runs", safe_int, None),
+        ("highest_score", "Highest Runs", highest_score, "0"),
+        ("highest_score_not_out", "Highest Runs", highest_score_not_out, "0"),
+        ("average", "Avg", safe_float, None),
+        ("strike_rate", "SR", safe_float, None),
+        ("thirties", "30s", safe_int, None),
+        ("fifties", "50s", safe_int, None),
+        ("hundreds", "100s", safe_int, None),
+        ("fours", "4s", safe_int, None),
+        ("sixes", "6s", safe_int, None),
+        ("ducks", "Ducks", safe_int, None),
+    )
+
+
+@dataclass(slots=True, eq=False)
+class CareerBowling(Record):
+    matches: int
+    innings: int
+    overs: str
+    maidens: int
+    wickets: int
+    runs_conceded: int
+    best_figures: str
+    three_wickets: int
+    five_wickets: int
+    economy: float
+    strike_rate: float
+    average: float
+    wides: int
+    noballs: int
+    dot_balls: int
+    fours_conceded: int
+    sixes_conceded: int
+    FIELDS = (
+        ("matches", "Matches", safe_int, None),
+        ("innings", "Innings", safe_int, None),
+        ("overs", "Overs", text, "0"),
+        ("maidens", "Maidens", safe_int, None),
+        ("wickets", "Wickets", safe_int, None),
+        ("runs_conceded", "Runs", safe_int, None),
+        ("best_figures", "Best Bowling", text, "0/0"),
+        ("three_wickets", "3 Wickets", safe_int, None),
+        ("five_wickets", "5 Wickets", safe_int, None),
+        ("economy", "Economy", safe_float, None),
+        ("strike_rate", "SR", safe_float, None),
+        ("average", "Avg", safe_float, None),
+        ("wides", "Wides", safe_int, None),
+        ("noballs", "NoBalls", safe_int, None),
+        ("dot_balls", "Dot Balls", safe_int, None),
+        ("fours_conceded", "4s", safe_int, None),
+        ("sixes_conceded", "6s", safe_int, None),
+    )
+
+
+@dataclass(slots=True, eq=False)
+class CareerFielding(Record):
+    matches: int
+    catches: int
+    caught_behind: int
+    run_outs: int
+    stumpings: int
+    assisted_run_outs: int
+    FIELDS = (
+        ("matches", "Matches", safe_int, None),
+        ("catches", "Catches", safe_int, None),
+        ("caught_behind", "Caught behind", safe_int, None),
+        ("run_outs", "Run outs", safe_int, None),
+        ("stumpings", "Stumpings", safe_int, None),
+        ("assisted_run_outs", "Assisted Run Outs", safe_int, None),
+    )
+
+
+@dataclass(slots=True, eq=False)
+class Player(Record):
+    player_id: int | None
+    name: str
+    slug: str
+    sub_title: str
+    profile_url: str
+    profile_pic_url: str
+
+
+@dataclass(slots=True, eq=False)
+class Match(Record):
+    match_id: int
+    tournament: str
+    info: str
+    score: list
+    result: str
+    url: str
+    date: str
+    venue: str
+
+
+def to_json(value):
+    """json default= hook: serialize records as their dicts."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,90 @@
+"""Dependency-aware runner for the stages of a fetch run.
+
+Stages that do not depend on each other (rosters, match lists, leaderboards)
+run concurrently; a stage starts as soon as every stage it runs after has
+finished. Each stage receives the results of all finished stages, and the
+schedule records when each one ran so the critical path of a run shows up
+in run_metrics.json.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class Stage:
+    def __init__(self, name, fn, after=()):
+        self.name = name
+        self.fn = fn
+        self.after = tuple(after)
+
+
+def run_stages(stages, metrics=None):
+    """Run stages in dependency order, concurrently where possible; returns (results, schedule).
+
+    Each stage is called as fn(results) with the results of the stages
+    finished so far. When a stage raises, stages already running finish,
+    stages waiting on it never start, and the first error is re-raised.
+    """
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        unknown = [name for name in stage.after if name not in by_name]
+        if unknown:
+            raise ValueError(f"stage {stage.name} runs after unknown stages: {', '.join(unknown)}")
+    started = time.perf_counter()
+    results = {}
+    schedule = {}
+    lock = threading.Lock()
+
+    def call(stage):
+        begin = time.perf_counter()
+        try:
+            if metrics:
+                with metrics.stage(stage.name):
+                    return stage.fn(dict(results))
+            return stage.fn(dict(results))
+        finally:
+            end = time.perf_counter()
+            with lock:
+                schedule[stage.name] = {
+                    "after": list(stage.after),
+                    "start": round(begin - started, 3),
+                    "end": round(end - started, 3),
+                    "seconds": round(end - begin, 3),
+                }
+
+    pending = list(stages)
+    running = {}
+    error = None
+    with ThreadPoolExecutor(max_workers=max(1, len(stages))) as pool:
+        while pending or running:
+            if error is None:
+                for stage in [s for s in pending if all(name in results for name in s.after)]:
+                    pending.remove(stage)
+                    running[pool.submit(call, stage)] = stage
+            if not running:
+                if error is None:
+                    raise ValueError(f"stages with circular dependencies: {', '.join(s.name for s in pending)}")
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    results[stage.name] = future.result()
+                except Exception as e:
+                    error = error or e
+    if error is not None:
+        raise error
+    return results, schedule
+
+
+def critical_path(schedule):
+    """Stage names on the chain that determined the finish time, first to last."""
+    if not schedule:
+        return []
+    name = max(schedule, key=lambda n: schedule[n]["end"])
+    path = [name]
+    while schedule[name]["after"]:
+        name = max(schedule[name]["after"], key=lambda n: schedule[n]["end"])
+        path.append(name)
+    return path[::-1]
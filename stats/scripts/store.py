@@ -0,0 +1,416 @@
+"""SQLite store of raw API responses and the normalized tables the outputs are exported from.
+
+Fetching writes into the store and every JSON file in data/ is derived from
+it, so re-deriving an output or adding a stat needs no network access:
+
+    python scripts/fetch_cricheroes.py --export-only
+
+Rows that could not be refreshed (the API was failing) keep their last
+stored version. The connection is opened on first use and shared by the
+worker threads under a lock. raw_responses only records what was fetched
+and when; the bodies themselves live in the HTTP and scorecard caches.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from records import BattingInnings, BowlingSpell, Player, to_json
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS raw_responses (
+    path TEXT PRIMARY KEY,
+    family TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS raw_responses_family ON raw_responses (family);
+
+CREATE TABLE IF NOT EXISTS matches (
+    match_id INTEGER PRIMARY KEY,
+    tournament TEXT NOT NULL,
+    season INTEGER,
+    played_at TEXT,
+    status TEXT NOT NULL,
+    team_a_id INTEGER,
+    team_a TEXT,
+    team_b_id INTEGER,
+    team_b TEXT,
+    winning_team_id INTEGER,
+    venue TEXT,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS matches_tournament ON matches (tournament);
+CREATE INDEX IF NOT EXISTS matches_season ON matches (season);
+
+CREATE TABLE IF NOT EXISTS team_matches (
+    team_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    match_id INTEGER NOT NULL,
+    PRIMARY KEY (team_key, position)
+);
+CREATE INDEX IF NOT EXISTS team_matches_match ON team_matches (match_id);
+
+CREATE TABLE IF NOT EXISTS scorecards (
+    match_id INTEGER PRIMARY KEY,
+    sha256 TEXT,
+    fetched_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS batting_innings (
+    match_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    team_id INTEGER,
+    team TEXT NOT NULL,
+    player_id INTEGER,
+    name TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    balls INTEGER NOT NULL,
+    sr REAL NOT NULL,
+    fours INTEGER NOT NULL,
+    sixes INTEGER NOT NULL,
+    not_out INTEGER NOT NULL,
+    PRIMARY KEY (match_id, position)
+);
+CREATE INDEX IF NOT EXISTS batting_innings_player ON batting_innings (player_id);
+
+CREATE TABLE IF NOT EXISTS bowling_spells (
+    match_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    team_id INTEGER,
+    team TEXT NOT NULL,
+    player_id INTEGER,
+    name TEXT NOT NULL,
+    wickets INTEGER NOT NULL,
+    overs REAL NOT NULL,
+    runs INTEGER NOT NULL,
+    economy REAL NOT NULL,
+    maidens INTEGER NOT NULL,
+    PRIMARY KEY (match_id, position)
+);
+CREATE INDEX IF NOT EXISTS bowling_spells_player ON bowling_spells (player_id);
+
+CREATE TABLE IF NOT EXISTS players (
+    team_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    player_id INTEGER,
+    name TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    sub_title TEXT NOT NULL,
+    profile_url TEXT NOT NULL,
+    profile_pic_url TEXT NOT NULL,
+    PRIMARY KEY (team_key, position)
+);
+CREATE INDEX IF NOT EXISTS players_player ON players (player_id);
+
+CREATE TABLE IF NOT EXISTS career_stats (
+    player_id INTEGER PRIMARY KEY,
+    batting TEXT NOT NULL,
+    bowling TEXT NOT NULL,
+    fielding TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS leaderboard (
+    team_key TEXT NOT NULL,
+    category TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    player_id INTEGER,
+    name TEXT NOT NULL,
+    raw TEXT NOT NULL,
+    PRIMARY KEY (team_key, category, position)
+);
+CREATE INDEX IF NOT EXISTS leaderboard_player ON leaderboard (player_id);
+
+CREATE TABLE IF NOT EXISTS ball_by_ball (
+    match_id INTEGER PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    status TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    analytics TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+# Scripts that bring a store from version n to n + 1; SCHEMA then adds anything new.
+MIGRATIONS = {
+    # raw_responses drops the response bodies and keeps their size.
+    1: """
+BEGIN;
+DROP INDEX IF EXISTS raw_responses_family;
+ALTER TABLE raw_responses RENAME TO raw_responses_v1;
+CREATE TABLE raw_responses (
+    path TEXT PRIMARY KEY,
+    family TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+INSERT INTO raw_responses SELECT path, family, sha256, length(body), fetched_at FROM raw_responses_v1;
+DROP TABLE raw_responses_v1;
+COMMIT;
+""",
+}
+
+BATTING_COLUMNS = BattingInnings.__slots__
+BOWLING_COLUMNS = BowlingSpell.__slots__
+PLAYER_COLUMNS = Player.__slots__
+
+
+class Store:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.db = None
+        self.responses = []
+        self.responses_lock = threading.Lock()
+
+    def _connect(self):
+        if self.db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            version = db.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                tables = [row[0] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+                steps = range(version, SCHEMA_VERSION)
+                if tables and version < SCHEMA_VERSION and all(step in MIGRATIONS for step in steps):
+                    for step in steps:
+                        db.executescript(MIGRATIONS[step])
+                    db.execute("VACUUM")
+                else:
+                    # No way to migrate (a newer or unknown layout); everything in the store can be fetched again.
+                    for table in tables:
+                        db.execute(f"DROP TABLE {table}")
+                db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            db.executescript(SCHEMA)
+            self.db = db
+        return self.db
+
+    def execute(self, sql, params=()):
+        with self.lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    def write(self, statements):
+        """Run (sql, params) pairs in one transaction; params may be a list of rows for executemany.
+
+        Response metadata recorded since the last write goes into the same transaction.
+        """
+        with self.responses_lock:
+            responses, self.responses = self.responses, []
+        if responses:
+            statements = [("INSERT OR REPLACE INTO raw_responses VALUES (?, ?, ?, ?, ?)", responses), *statements]
+        if not statements:
+            return
+        with self.lock:
+            db = self._connect()
+            with db:
+                for sql, params in statements:
+                    if params and isinstance(params, list):
+                        db.executemany(sql, params)
+                    elif not isinstance(params, list):
+                        db.execute(sql, params)
+
+    def close(self):
+        self.write([])
+        with self.lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
+
+    def record_response(self, path, family, digest, size):
+        """Note a fetched response; it is written with the next write(), typically the stage's own save."""
+        with self.responses_lock:
+            self.responses.append((path, family, digest, size, time.time()))
+
+    def save_matches(self, team_key, matches, season, status):
+        """Upsert raw matches and make them team_key's match list, in order.
+
+        season and status are functions of a raw match, so the store does not
+        have to know how the payload encodes them.
+        """
+        rows = []
+        for m in matches:
+            rows.append((
+                m["match_id"], m.get("tournament_name") or "", season(m), m.get("match_start_time"), status(m),
+                m.get("team_a_id"), m.get("team_a"), m.get("team_b_id"), m.get("team_b"),
+                m.get("winning_team_id"), m.get("ground_name"), json.dumps(m),
+            ))
+        self.write([
+            ("INSERT OR REPLACE INTO matches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows),
+            ("DELETE FROM team_matches WHERE team_key = ?", (team_key,)),
+            (
+                "INSERT INTO team_matches (team_key, position, match_id) VALUES (?, ?, ?)",
+                [(team_key, i, m["match_id"]) for i, m in enumerate(matches)],
+            ),
+        ])
+
+    def team_matches(self, team_key):
+        rows = self.execute(
+            "SELECT m.raw FROM team_matches t JOIN matches m USING (match_id) WHERE t.team_key = ? ORDER BY t.position",
+            (team_key,),
+        )
+        return [json.loads(raw) for (raw,) in rows]
+
+    def save_scorecards(self, scorecards):
+        """Replace the innings rows of each (match_id, payload sha256, scorecard rows), in one transaction."""
+        statements = []
+        for match_id, digest, rows in scorecards:
+            sides = rows["sides"]
+            statements += [
+                ("DELETE FROM batting_innings WHERE match_id = ?", (match_id,)),
+                ("DELETE FROM bowling_spells WHERE match_id = ?", (match_id,)),
+                ("INSERT OR REPLACE INTO scorecards VALUES (?, ?, ?)", (match_id, digest, time.time())),
+                (
+                    f"INSERT INTO batting_innings (match_id, position, team_id, {', '.join(BATTING_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * (len(BATTING_COLUMNS) + 3))})",
+                    [
+                        (match_id, i, sides.get(b.team), *(getattr(b, column) for column in BATTING_COLUMNS))
+                        for i, b in enumerate(rows["batting"])
+                    ],
+                ),
+                (
+                    f"INSERT INTO bowling_spells (match_id, position, team_id, {', '.join(BOWLING_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * (len(BOWLING_COLUMNS) + 3))})",
+                    [
+                        (match_id, i, sides.get(b.team), *(getattr(b, column) for column in BOWLING_COLUMNS))
+                        for i, b in enumerate(rows["bowling"])
+                    ],
+                ),
+            ]
+        self.write(statements)
+
+    def scorecard_digests(self, match_ids):
+        """{match_id: payload sha256} for the given matches that have a stored scorecard."""
+        match_ids = list(match_ids)
+        found = {}
+        for start in range(0, len(match_ids), 500):
+            chunk = match_ids[start:start + 500]
+            rows = self.execute(
+                f"SELECT match_id, sha256 FROM scorecards WHERE match_id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            found.update(rows)
+        return found
+
+    def team_scorecard_rows(self, team_key):
+        """{match_id: {"sides", "batting", "bowling"}} for every stored scorecard of a team's matches."""
+        scorecards = {}
+        for (match_id,) in self.execute(
+            "SELECT s.match_id FROM team_matches t JOIN scorecards s USING (match_id) WHERE t.team_key = ?",
+            (team_key,),
+        ):
+            scorecards[match_id] = {"sides": {}, "batting": [], "bowling": []}
+        for table, record, key in (
+            ("batting_innings", BattingInnings, "batting"),
+            ("bowling_spells", BowlingSpell, "bowling"),
+        ):
+            columns = record.__slots__
+            rows = self.execute(
+                f"SELECT r.match_id, r.team_id, {', '.join('r.' + column for column in columns)} FROM {table} r "
+                f"JOIN team_matches t USING (match_id) WHERE t.team_key = ? ORDER BY r.match_id, r.position",
+                (team_key,),
+            )
+            for match_id, team_id, *values in rows:
+                row = record(*values)
+                if key == "batting":
+                    row.not_out = bool(row.not_out)
+                scorecard = scorecards[match_id]
+                scorecard["sides"][row.team] = team_id
+                scorecard[key].append(row)
+        return scorecards
+
+    def save_players(self, team_key, players):
+        self.write([
+            ("DELETE FROM players WHERE team_key = ?", (team_key,)),
+            (
+                f"INSERT INTO players (team_key, position, {', '.join(PLAYER_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * (len(PLAYER_COLUMNS) + 2))})",
+                [(team_key, i, *(p[column] for column in PLAYER_COLUMNS)) for i, p in enumerate(players)],
+            ),
+        ])
+
+    def team_players(self, team_key):
+        rows = self.execute(
+            f"SELECT {', '.join(PLAYER_COLUMNS)} FROM players WHERE team_key = ? ORDER BY position", (team_key,)
+        )
+        return [Player(*row) for row in rows]
+
+    def save_career(self, player_id, career):
+        self.write([(
+            "INSERT OR REPLACE INTO career_stats VALUES (?, ?, ?, ?, ?)",
+            (
+                player_id, json.dumps(career["batting"], default=to_json),
+                json.dumps(career["bowling"], default=to_json), json.dumps(career["fielding"], default=to_json),
+                time.time(),
+            ),
+        )])
+
+    def careers(self, player_ids):
+        """{player_id: {"batting", "bowling", "fielding"}} for the players with stored career stats."""
+        found = {}
+        player_ids = [pid for pid in player_ids if pid]
+        for start in range(0, len(player_ids), 500):
+            chunk = player_ids[start:start + 500]
+            rows = self.execute(
+                "SELECT player_id, batting, bowling, fielding FROM career_stats "
+                f"WHERE player_id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            for player_id, batting, bowling, fielding in rows:
+                found[player_id] = {
+                    "batting": json.loads(batting), "bowling": json.loads(bowling), "fielding": json.loads(fielding),
+                }
+        return found
+
+    def save_leaderboard(self, team_key, category, items):
+        self.write([
+            ("DELETE FROM leaderboard WHERE team_key = ? AND category = ?", (team_key, category)),
+            (
+                "INSERT INTO leaderboard (team_key, category, position, player_id, name, raw) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (team_key, category, i, item.get("player_id"), item.get("name") or "", json.dumps(item))
+                    for i, item in enumerate(items)
+                ],
+            ),
+        ])
+
+    def leaderboard(self, team_key, category):
+        rows = self.execute(
+            "SELECT raw FROM leaderboard WHERE team_key = ? AND category = ? ORDER BY position", (team_key, category)
+        )
+        return [json.loads(raw) for (raw,) in rows]
+
+    def save_ball_by_ball(self, match_id, digest, status, version, analytics):
+        self.write([(
+            "INSERT OR REPLACE INTO ball_by_ball VALUES (?, ?, ?, ?, ?, ?)",
+            (match_id, digest, status, version, json.dumps(analytics), time.time()),
+        )])
+
+    def ball_by_ball_entries(self, match_ids):
+        """{match_id: (payload sha256, match status, analytics version)} for the given matches already ingested."""
+        match_ids = list(match_ids)
+        found = {}
+        for start in range(0, len(match_ids), 500):
+            chunk = match_ids[start:start + 500]
+            rows = self.execute(
+                "SELECT match_id, sha256, status, version FROM ball_by_ball "
+                f"WHERE match_id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            found.update((match_id, tuple(entry)) for match_id, *entry in rows)
+        return found
+
+    def team_ball_by_ball(self, team_key, version):
+        """{match_id: analytics} for a team's ingested matches whose analytics have the given version."""
+        rows = self.execute(
+            "SELECT b.match_id, b.analytics FROM team_matches t JOIN ball_by_ball b USING (match_id) "
+            "WHERE t.team_key = ? AND b.version = ? ORDER BY t.position",
+            (team_key, version),
+        )
+        return {match_id: json.loads(analytics) for match_id, analytics in rows}
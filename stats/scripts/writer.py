@@ -0,0 +1,136 @@
+"""Deterministic writer for the published JSON files.
+
+Output is canonical: keys are sorted, so the bytes depend only on the data
+and not on the order the API happened to send fields in. A file whose
+content hash is unchanged is not rewritten, which keeps the nightly job from
+committing when nothing moved. Each output directory gets a checksums.json
+with the sha256 and size of every file, for cache-busting, and optionally
+precompressed .gz siblings.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+
+from records import to_json
+
+CHECKSUMS_FILE = "checksums.json"
+
+
+class JsonWriter:
+    def __init__(self, sort_keys=True, minify=False, compress=()):
+        self.sort_keys = sort_keys
+        self.minify = minify
+        ignored = [kind for kind in compress if kind != "gz"]
+        if ignored:
+            print(f"  Warning: only gz precompression is supported; ignoring {', '.join(ignored)}")
+        self.compress = ["gz"] if "gz" in compress else []
+        self.checksums = {}
+        self.dirty = set()
+        self.written = 0
+        self.unchanged = 0
+        self.checksums_written = 0
+
+    def dumps(self, data, minify=None):
+        if self.minify if minify is None else minify:
+            text = json.dumps(data, sort_keys=self.sort_keys, separators=(",", ":"), default=to_json)
+        else:
+            text = json.dumps(data, sort_keys=self.sort_keys, indent=2, default=to_json)
+        return text.encode("utf-8")
+
+    def _checksums(self, output_dir):
+        if output_dir not in self.checksums:
+            try:
+                with open(os.path.join(output_dir, CHECKSUMS_FILE), encoding="utf-8") as f:
+                    self.checksums[output_dir] = json.load(f)
+            except (OSError, ValueError):
+                self.checksums[output_dir] = {}
+        return self.checksums[output_dir]
+
+    def save(self, output_dir, filename, data, minify=None):
+        """Write data to output_dir/filename unless it already holds the same content; returns whether it wrote."""
+        content = self.dumps(data, minify)
+        digest = hashlib.sha256(content).hexdigest()
+        path = os.path.join(output_dir, filename)
+        checksums = self._checksums(output_dir)
+        entry = checksums.get(filename)
+        siblings = [f"{path}.{kind}" for kind in self.compress]
+        if entry is None and os.path.exists(path):
+            with open(path, "rb") as f:
+                if hashlib.sha256(f.read()).hexdigest() == digest:
+                    entry = {"sha256": digest, "bytes": len(content)}
+        if (
+            entry and entry["sha256"] == digest and os.path.exists(path)
+            and all(os.path.exists(sibling) for sibling in siblings)
+        ):
+            self._remove_stale_siblings(path)
+            entry = {key: value for key, value in entry.items() if key[:-len("_bytes")] not in ("gz", "br")
+                     or key[:-len("_bytes")] in self.compress}
+            if checksums.get(filename) != entry:
+                checksums[filename] = entry
+                self.dirty.add(output_dir)
+            self.unchanged += 1
+            return False
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._replace(path, content)
+        entry = {"sha256": digest, "bytes": len(content)}
+        for kind in self.compress:
+            # mtime=0 keeps the gzip header, and so the .gz bytes, stable across runs.
+            packed = gzip.compress(content, 9, mtime=0)
+            self._replace(f"{path}.{kind}", packed)
+            entry[f"{kind}_bytes"] = len(packed)
+        self._remove_stale_siblings(path)
+        checksums[filename] = entry
+        self.dirty.add(output_dir)
+        self.written += 1
+        return True
+
+    def _remove_stale_siblings(self, path):
+        # Compressed siblings of a kind no longer written; .br ones can predate dropping brotli support.
+        for kind in {"gz", "br"} - set(self.compress):
+            if os.path.exists(f"{path}.{kind}"):
+                os.remove(f"{path}.{kind}")
+
+    def remove(self, output_dir, filename):
+        """Delete an output file, its compressed siblings and its checksum entry."""
+        path = os.path.join(output_dir, filename)
+        for candidate in [path] + [f"{path}.{kind}" for kind in ("gz", "br")]:
+            if os.path.exists(candidate):
+                os.remove(candidate)
+        if self._checksums(output_dir).pop(filename, None) is not None:
+            self.dirty.add(output_dir)
+
+    def finish(self):
+        """Write checksums.json for every output directory whose files changed, unless its content is the same."""
+        for output_dir in sorted(self.dirty):
+            checksums = {
+                filename: entry for filename, entry in self._checksums(output_dir).items()
+                if os.path.exists(os.path.join(output_dir, filename))
+            }
+            self.checksums[output_dir] = checksums
+            content = json.dumps(checksums, sort_keys=True, indent=2).encode("utf-8")
+            path = os.path.join(output_dir, CHECKSUMS_FILE)
+            try:
+                with open(path, "rb") as f:
+                    if f.read() == content:
+                        continue
+            except OSError:
+                pass
+            self._replace(path, content)
+            self.checksums_written += 1
+        self.dirty.clear()
+
+    @property
+    def changed(self):
+        """Whether any file, checksums.json included, was written or removed."""
+        return bool(self.written or self.checksums_written)
+
+    @staticmethod
+    def _replace(path, content):
+        # Write beside the target and rename, so readers never see a half-written file.
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
@@ -0,0 +1,74 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SCRIPT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts")
+DATA_DIR = os.path.join(SCRIPT_DIR, "..", "data")
+sys.path.insert(0, SCRIPT_DIR)
+
+import fake_server  # noqa: E402
+import fixtures  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def fixture_dir(tmp_path_factory):
+    """API fixtures synthesized once from the published JSON in data/."""
+    out_dir = str(tmp_path_factory.mktemp("fixtures"))
+    fixtures.synthesize(DATA_DIR, out_dir)
+    return out_dir
+
+
+@pytest.fixture
+def serve():
+    """Start a fake API for a fixture directory; returns (fake, API base URL). Stopped after the test."""
+    servers = []
+
+    def start(fixture_dir, **options):
+        fake = fake_server.FakeCricHeroes(fixture_dir, **options)
+        server, api_base = fake_server.start(fake)
+        servers.append(server)
+        return fake, api_base
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def fetch(tmp_path):
+    """Run fetch_cricheroes.py in a scratch directory; returns (stdout, run metrics).
+
+    Settings are passed as keyword arguments named after the environment
+    variable without its CRICHEROES_ prefix, e.g. http_cache=0.
+    """
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+
+    def environment(api_base, **settings):
+        env = {name: value for name, value in os.environ.items() if not name.startswith("CRICHEROES_")}
+        env.update(
+            CRICHEROES_API_BASE=api_base,
+            CRICHEROES_REQUESTS_PER_SECOND="200",
+            CRICHEROES_RETRY_BASE_SECONDS="0.01",
+            CRICHEROES_WATCH_LIVE_SECONDS="0.01",
+        )
+        env.update({f"CRICHEROES_{name.upper()}": str(value) for name, value in settings.items()})
+        return env
+
+    def run(api_base, *args, check=True, **settings):
+        result = subprocess.run(
+            [sys.executable, os.path.join(SCRIPT_DIR, "fetch_cricheroes.py"), *args],
+            cwd=work_dir, env=environment(api_base, **settings), capture_output=True, text=True,
+        )
+        if check and result.returncode:
+            raise AssertionError(f"fetch_cricheroes.py {' '.join(args)} failed:\n{result.stdout}{result.stderr}")
+        with open(work_dir / "metrics" / "run_metrics.json", encoding="utf-8") as f:
+            return result.stdout, json.load(f)
+
+    run.work_dir = work_dir
+    run.environment = environment
+    return run
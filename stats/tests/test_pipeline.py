@@ -0,0 +1,189 @@
+"""End-to-end runs of fetch_cricheroes.py against fake_server.py."""
+
+import glob
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+SCORECARDS = "scorecard/get-scorecard"
+FEEDS = "scorecard/get-commentary"
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def match_count(fixture_dir):
+    return len(glob.glob(os.path.join(fixture_dir, "scorecard", "get-scorecard", "*.json")))
+
+
+def derived_entries(work_dir):
+    return load(os.path.join(work_dir, ".cache", "derived.json"))["entries"]
+
+
+def test_second_run_serves_scorecards_from_cache(fixture_dir, serve, fetch):
+    fake, api_base = serve(fixture_dir)
+    matches = match_count(fixture_dir)
+    _, cold = fetch(api_base)
+    assert cold["caches"]["scorecards"] == {"hits": 0, "misses": matches}
+    assert cold["endpoints"][SCORECARDS]["requests"] == matches
+    outputs = load(fetch.work_dir / "data" / "match_scorecards.json")
+    cold_entries = derived_entries(fetch.work_dir)
+
+    requests = fake.stats()["requests"]
+    _, warm = fetch(api_base)
+    assert warm["caches"]["scorecards"] == {"hits": matches, "misses": 0}
+    assert SCORECARDS not in warm["endpoints"]
+    assert fake.stats()["requests"] - requests == warm["totals"]["requests"]
+    assert warm["outputs"]["written"] == 0
+    assert load(fetch.work_dir / "data" / "match_scorecards.json") == outputs
+
+    # Cached and fetched scorecards share a digest, so rows built on the first run are reused, not rebuilt.
+    index = load(fetch.work_dir / ".cache" / "scorecards" / "index.json")
+    assert {f"scorecard_rows:{entry['sha256']}" for entry in index.values()} == {
+        key for key in cold_entries if key.startswith("scorecard_rows:")
+    }
+    # Scorecard rows and career stats both keep their derived entries.
+    assert derived_entries(fetch.work_dir) == cold_entries
+    assert {key.split(":")[0] for key in cold_entries} >= {"scorecard_rows", "career"}
+
+
+def test_interrupted_run_resumes_from_checkpoint(fixture_dir, serve, fetch):
+    _, api_base = serve(fixture_dir, latency_ms=20)
+    journal = fetch.work_dir / "data" / ".checkpoint.jsonl"
+    settings = {"http_cache": 0, "refresh_scorecards": 1, "concurrency": 1}
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(__file__), "..", "scripts", "fetch_cricheroes.py")],
+        cwd=fetch.work_dir, env=fetch.environment(api_base, **settings),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline and process.poll() is None:
+            if journal.exists() and journal.read_text(encoding="utf-8").count('"unit": "scorecard:') >= 5:
+                break
+            time.sleep(0.01)
+    finally:
+        process.kill()
+        process.wait()
+    lines = [json.loads(line) for line in journal.read_text(encoding="utf-8").splitlines()[1:] if line.endswith("}")]
+    journaled = {line["unit"] for line in lines if line["unit"].startswith("scorecard:")}
+    assert journaled
+
+    stdout, resumed = fetch(api_base, **settings)
+    assert f"Resuming from checkpoint: {len(lines)} units already fetched" in stdout
+    assert resumed["endpoints"][SCORECARDS]["requests"] == match_count(fixture_dir) - len(journaled)
+    assert not journal.exists()
+    scorecards = load(fetch.work_dir / "data" / "match_scorecards.json")
+    assert {f"scorecard:{mid}" for mid in scorecards} >= journaled
+    assert len(scorecards) == match_count(fixture_dir)
+
+
+def test_watch_keeps_derived_cache(fixture_dir, serve, fetch):
+    _, api_base = serve(fixture_dir)
+    fetch(api_base)
+    before = derived_entries(fetch.work_dir)
+    assert before
+
+    _, report = fetch(api_base, "--watch", "--max-polls", "1")
+    assert report["watch"]["polls"] == 1
+    assert derived_entries(fetch.work_dir) == before
+
+
+def test_match_id_refresh_merges_into_outputs(fixture_dir, serve, fetch, tmp_path):
+    fixtures = str(tmp_path / "fixtures")
+    shutil.copytree(fixture_dir, fixtures)
+    _, api_base = serve(fixtures)
+    fetch(api_base)
+    before = load(fetch.work_dir / "data" / "match_scorecards.json")
+    match_id = sorted(before)[0]
+
+    path = os.path.join(fixtures, "scorecard", "get-scorecard", f"{match_id}.json")
+    payload = load(path)
+    for side in ("team_a", "team_b"):
+        for inning in payload["data"][side]["scorecard"]:
+            for batter in inning["batting"]:
+                batter["runs"] += 100
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+
+    stdout, report = fetch(api_base, "--match-id", match_id)
+    assert "Selective refresh of scorecards" in stdout
+    assert report["endpoints"][SCORECARDS]["requests"] == 1
+    after = load(fetch.work_dir / "data" / "match_scorecards.json")
+    assert after.keys() == before.keys()
+    assert [b["runs"] for b in after[match_id]["falcon_batters"]] == [
+        b["runs"] + 100 for b in before[match_id]["falcon_batters"]
+    ]
+    assert {mid: card for mid, card in after.items() if mid != match_id} == {
+        mid: card for mid, card in before.items() if mid != match_id
+    }
+
+
+def test_ball_by_ball_stage_ingests_each_match_once(fixture_dir, serve, fetch):
+    _, api_base = serve(fixture_dir)
+    feeds = len(glob.glob(os.path.join(fixture_dir, "scorecard", "get-commentary", "*.json")))
+    assert feeds == match_count(fixture_dir)
+
+    stdout, cold = fetch(api_base, ball_by_ball=1)
+    assert f"Ingesting ball-by-ball data for {feeds} matches (0 already ingested)" in stdout
+    assert cold["endpoints"][FEEDS]["requests"] == feeds
+    assert cold["caches"]["ball_by_ball"] == {"hits": 0, "misses": feeds}
+    assert not cold["skipped_units"]
+    innings = load(fetch.work_dir / "data" / "ball_by_ball_matches.json")
+    scorecards = load(fetch.work_dir / "data" / "match_scorecards.json")
+    assert innings.keys() == scorecards.keys()
+    for entry in innings.values():
+        assert entry and {"innings", "team_id", "phases", "partnerships"} <= entry[0].keys()
+
+    # The feeds replay the scorecards' batting rows, so every innings adds up to the same runs and balls.
+    for match_id, entry in innings.items():
+        payload = load(os.path.join(fixture_dir, "scorecard", "get-scorecard", f"{match_id}.json"))["data"]
+        expected = [
+            (payload[side]["id"], sum(b["runs"] for b in inning["batting"]), sum(b["balls"] for b in inning["batting"]))
+            for side in ("team_a", "team_b") for inning in payload[side]["scorecard"]
+            if any(b["balls"] for b in inning["batting"])
+        ]
+        assert [
+            (i["team_id"], sum(p["runs"] for p in i["phases"].values()), sum(p["balls"] for p in i["phases"].values()))
+            for i in entry
+        ] == expected
+    players = load(fetch.work_dir / "data" / "ball_by_ball_players.json")
+    roster = {p["player_id"] for p in load(fetch.work_dir / "data" / "players.json")}
+    assert roster & {p["player_id"] for p in players if p["batting"] or p["bowling"]}
+
+    stdout, warm = fetch(api_base, ball_by_ball=1)
+    assert f"Ingesting ball-by-ball data for 0 matches ({feeds} already ingested)" in stdout
+    assert FEEDS not in warm["endpoints"]
+    assert load(fetch.work_dir / "data" / "ball_by_ball_players.json") == players
+
+
+def test_selective_refresh_needs_a_stored_full_run(fixture_dir, serve, fetch):
+    _, api_base = serve(fixture_dir)
+    data_dir = fetch.work_dir / "data"
+    shutil.copytree(os.path.join(os.path.dirname(__file__), "..", "data"), data_dir)
+    published = {path.name: path.read_bytes() for path in data_dir.iterdir()}
+
+    for args in (["--only", "players"], ["--since", "2025-01-01"]):
+        _, report = fetch(api_base, *args, check=False)
+        assert "run a full fetch before a selective refresh" in report["error"]
+        assert "matches" in report["error"] and "leaderboard" in report["error"]
+        assert {path.name: path.read_bytes() for path in data_dir.iterdir()} == published
+
+
+def test_open_circuit_skips_untried_units_only(fixture_dir, serve, fetch):
+    fake, api_base = serve(fixture_dir, fail=["get-scorecard=503"])
+    _, report = fetch(api_base, concurrency=1, breaker_threshold=5, http_cache=0)
+    skipped = report["skipped_units"]
+    assert all(entry["unit"].startswith("scorecard:") for entry in skipped)
+    assert len(skipped) == match_count(fixture_dir)
+    assert {entry["reason"] for entry in skipped} == {"server", "circuit_open"}
+    assert all("503" in entry["error"] for entry in skipped if entry["reason"] == "server")
+    # The circuit opened after the threshold, so no unit skipped as circuit_open reached the server.
+    assert fake.stats()["injected"] == {"503": 5}
+    assert report["open_circuits"] == [SCORECARDS]
+    assert load(fetch.work_dir / ".cache" / "skipped.json") == skipped